@@ -1,41 +1,195 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 from dotenv import load_dotenv
+import atexit
 import os
+import threading
 
-load_dotenv()
+from app.compression import Compress
+from app.config import config
+from app.profiling import Profiler
+from app.ratelimit import RateLimiter
+from app.routing import RoutingSession, init_replicas
 
-db = SQLAlchemy()
-migrate = Migrate()
+# Sessions live for one request, so committed objects are not expired: serializing
+# what was just written must not cost a refresh SELECT per object
+db = SQLAlchemy(session_options={'class_': RoutingSession, 'expire_on_commit': False})
+compress = Compress()
+limiter = RateLimiter()
+profiler = Profiler()
 
-def create_app(config_name='development'):
+def create_app(config_name=None, deferred=False):
+    """Create the application with the named profile from ``app.config``.
+    
+    ``config_name`` defaults to the ``FLASK_CONFIG`` environment variable,
+    then ``'development'``. With ``deferred=True`` only the configuration and
+    the database are set up; extensions and blueprints are registered by
+    ``setup_app`` just before the first request is handled. Workers, CLI commands and service-level
+    tests that never serve HTTP skip that cost (and the Alembic import).
+    """
+    # Tests configure themselves through the environment, never from a local .env
+    if config_name != 'testing':
+        load_dotenv()
+    config_name = config_name or os.getenv('FLASK_CONFIG', 'development')
+    
     app = Flask(__name__)
     
     # Configuration
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///app.db')
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.from_object(config[config_name])
+    config[config_name].init_app(app)
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     
-    # MySQL specific configuration
-    if 'mysql' in app.config['SQLALCHEMY_DATABASE_URI']:
-        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-            'pool_size': 10,
-            'pool_recycle': 120,
-            'pool_pre_ping': True
-        }
+    # Read replicas: comma-separated URIs, used for GET traffic
+    app.config['SQLALCHEMY_REPLICA_URIS'] = [
+        uri.strip() for uri in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if uri.strip()
+    ]
+    app.config['REPLICA_LAG_TOLERANCE'] = float(os.getenv('REPLICA_LAG_TOLERANCE', 1.0))
+    
+    # Response compression
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', 6))
+    
+    # Group commit for comment inserts (see CommentBatchWriter for durability notes)
+    app.config['COMMENT_GROUP_COMMIT'] = os.getenv('COMMENT_GROUP_COMMIT', 'false').lower() == 'true'
+    app.config['COMMENT_GROUP_COMMIT_WINDOW_MS'] = float(os.getenv('COMMENT_GROUP_COMMIT_WINDOW_MS', 5))
+    app.config['COMMENT_GROUP_COMMIT_MAX_BATCH'] = int(os.getenv('COMMENT_GROUP_COMMIT_MAX_BATCH', 100))
+    
+    # Token-bucket rate limiting per client and route; limits are "<requests>/<seconds|minute|hour>"
+    app.config['RATELIMIT_ENABLED'] = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATELIMIT_DEFAULT'] = os.getenv('RATELIMIT_DEFAULT', '1000/minute')
+    app.config['RATELIMIT_ROUTE_LIMITS'] = _parse_pairs(os.getenv('RATELIMIT_ROUTE_LIMITS', 'comments.create_comment=120/minute'))
+    app.config['RATELIMIT_STORAGE_URL'] = os.getenv('RATELIMIT_STORAGE_URL') or None
+    
+    # On-demand profiling: requests with X-Profile-Token, or a sampled fraction of all requests
+    app.config['PROFILE_ADMIN_TOKEN'] = os.getenv('PROFILE_ADMIN_TOKEN') or None
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    app.config['PROFILE_MODE'] = os.getenv('PROFILE_MODE', 'cprofile')
+    if os.getenv('PROFILE_DIR'):
+        app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR')
+    
+    # Stored POST responses for Idempotency-Key retries expire after this many hours
+    app.config['IDEMPOTENCY_TTL_HOURS'] = float(os.getenv('IDEMPOTENCY_TTL_HOURS', 24))
+    # A request that dies mid-flight holds its key this long before a retry may take over
+    app.config['IDEMPOTENCY_LOCK_SECONDS'] = float(os.getenv('IDEMPOTENCY_LOCK_SECONDS', 60))
+    
+    # Dashboard aggregates are cached this many seconds (and dropped on writes)
+    app.config['STATS_CACHE_TTL'] = float(os.getenv('STATS_CACHE_TTL', 10))
+    
+    # The change feed only returns changes this many seconds old, so writes that commit late are not skipped
+    app.config['CHANGE_FEED_SAFETY_LAG_SECONDS'] = float(os.getenv('CHANGE_FEED_SAFETY_LAG_SECONDS', 5))
+    
+    # Soft-deleted rows stay restorable for the grace period, then `flask purge-deleted` removes them
+    app.config['PURGE_GRACE_PERIOD_HOURS'] = float(os.getenv('PURGE_GRACE_PERIOD_HOURS', 24))
+    app.config['PURGE_BATCH_SIZE'] = int(os.getenv('PURGE_BATCH_SIZE', 1000))
+    
+    # `flask archive-comments` moves comments of tasks completed this long ago to comments_archive
+    app.config['ARCHIVE_AFTER_DAYS'] = float(os.getenv('ARCHIVE_AFTER_DAYS', 90))
+    app.config['ARCHIVE_BATCH_SIZE'] = int(os.getenv('ARCHIVE_BATCH_SIZE', 1000))
+    
+    # Background jobs: `flask worker` runs them on a pool of threads or processes
+    app.config['CONFIG_NAME'] = config_name
+    app.config['JOB_WORKER_CONCURRENCY'] = int(os.getenv('JOB_WORKER_CONCURRENCY', 4))
+    app.config['JOB_WORKER_MODE'] = os.getenv('JOB_WORKER_MODE', 'thread')
+    app.config['JOB_POLL_INTERVAL'] = float(os.getenv('JOB_POLL_INTERVAL', 1.0))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    app.config['JOB_RETRY_BACKOFF'] = float(os.getenv('JOB_RETRY_BACKOFF', 30))
+    app.config['JOB_LEASE_SECONDS'] = float(os.getenv('JOB_LEASE_SECONDS', 600))
+    app.config['JOB_EXPORT_DIR'] = os.getenv('JOB_EXPORT_DIR') or os.path.join(app.instance_path, 'exports')
+    
+    # Comment edit history: every Nth revision is a full snapshot, the rest are deltas
+    app.config['COMMENT_REVISION_SNAPSHOT_INTERVAL'] = int(os.getenv('COMMENT_REVISION_SNAPSHOT_INTERVAL', 10))
+    
+    # Workspaces: "<api key>=<workspace>" pairs (X-API-Key selects the workspace), per-workspace
+    # concurrency and rate budgets, and "<workspace>=<uri>" pairs for workspaces with a database of their own
+    app.config['API_KEYS'] = _parse_pairs(os.getenv('API_KEYS', ''))
+    app.config['WORKSPACE_MAX_CONCURRENCY'] = int(os.getenv('WORKSPACE_MAX_CONCURRENCY', 0))
+    app.config['WORKSPACE_QUEUE_TIMEOUT'] = float(os.getenv('WORKSPACE_QUEUE_TIMEOUT', 1.0))
+    app.config['RATELIMIT_WORKSPACE_DEFAULT'] = os.getenv('RATELIMIT_WORKSPACE_DEFAULT') or None
+    app.config['RATELIMIT_WORKSPACE_LIMITS'] = _parse_pairs(os.getenv('RATELIMIT_WORKSPACE_LIMITS', ''))
+    app.config['WORKSPACE_DATABASE_URLS'] = _parse_pairs(os.getenv('WORKSPACE_DATABASE_URLS', ''))
     
-    # Initialize extensions
+    # Count SQLAlchemy compiled-cache hits and misses (GET /api/stats/query-cache)
+    app.config['QUERY_CACHE_STATS'] = os.getenv('QUERY_CACHE_STATS', 'false').lower() == 'true'
+    
+    # Initialize the database; everything else only matters once requests arrive
     db.init_app(app)
-    migrate.init_app(app, db)
-    CORS(app)
+    init_replicas(app)
+    
+    # Also registers the session hooks that scope queries to a workspace
+    from app.tenancy import init_workspace_binds
+    init_workspace_binds(app)
+    
+    from app.querycache import init_query_cache_stats
+    init_query_cache_stats(app)
+    
+    from app.commands import register_commands
+    register_commands(app)
+    
+    if deferred:
+        app.wsgi_app = _DeferredSetup(app, app.wsgi_app)
+    else:
+        setup_app(app)
+    
+    return app
+
+def _parse_pairs(value):
+    """Parse ``"key=value,key=value"`` settings into a dict."""
+    return dict(item.strip().split('=', 1) for item in value.split(',') if item.strip())
+
+def setup_app(app):
+    """Register extensions and blueprints on an application from ``create_app``."""
+    from flask_migrate import Migrate
+    
+    # First, so its hooks wrap all the others
+    profiler.init_app(app)
+    Migrate(app, db)
+    CORS(app, expose_headers=['ETag', 'RateLimit-Limit', 'RateLimit-Remaining', 'RateLimit-Reset', 'Retry-After',
+                              'X-Profile', 'Idempotent-Replayed', 'X-Last-Write'])
+    compress.init_app(app)
+    # Before the limiter, which budgets per workspace
+    from app.tenancy import init_tenancy
+    init_tenancy(app)
+    limiter.init_app(app)
+    
+    if app.config['COMMENT_GROUP_COMMIT']:
+        from app.services.comment_writer import CommentBatchWriter
+        writer = CommentBatchWriter(
+            app,
+            window_ms=app.config['COMMENT_GROUP_COMMIT_WINDOW_MS'],
+            max_batch=app.config['COMMENT_GROUP_COMMIT_MAX_BATCH']
+        )
+        app.extensions['comment_writer'] = writer
+        atexit.register(writer.stop)
     
     # Register blueprints
     from app.routes.task_routes import task_bp
     from app.routes.comment_routes import comment_bp
+    from app.routes.activity_routes import activity_bp
+    from app.routes.change_routes import change_bp
+    from app.routes.stats_routes import stats_bp
+    from app.routes.job_routes import job_bp
     
     app.register_blueprint(task_bp, url_prefix='/api/tasks')
     app.register_blueprint(comment_bp, url_prefix='/api/comments')
+    app.register_blueprint(activity_bp, url_prefix='/api/activity')
+    app.register_blueprint(change_bp, url_prefix='/api/changes')
+    app.register_blueprint(stats_bp, url_prefix='/api/stats')
+    app.register_blueprint(job_bp, url_prefix='/api/jobs')
+
+class _DeferredSetup:
+    """WSGI middleware that runs ``setup_app`` once, before the first request."""
     
-    return app
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self.done = False
+        self._lock = threading.Lock()
+    
+    def __call__(self, environ, start_response):
+        if not self.done:
+            with self._lock:
+                if not self.done:
+                    setup_app(self.app)
+                    self.done = True
+        return self.wsgi_app(environ, start_response)
@@ -0,0 +1,102 @@
+from datetime import timedelta
+import click
+
+WORKSPACE_HELP = ('Only process this workspace. Required for workspaces with a database of their own; '
+                  'without it the primary database is processed for all workspaces.')
+
+def register_commands(app):
+    """Register maintenance CLI commands on the application."""
+    
+    @app.cli.command('init-db')
+    def init_db():
+        """Create any missing tables, also in the databases of dedicated workspaces."""
+        from app import db, models  # noqa: F401 - importing models registers their tables
+        
+        db.create_all()
+        for engine in app.extensions['workspace_engines'].values():
+            db.metadata.create_all(engine)
+        click.echo('Database tables created')
+    
+    @app.cli.command('purge-deleted')
+    @click.option('--grace-hours', type=float, default=None,
+                  help='Only purge rows deleted at least this many hours ago.')
+    @click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+    @click.option('--workspace', default=None, help=WORKSPACE_HELP)
+    def purge_deleted(grace_hours, batch_size, max_batches, workspace):
+        """Permanently remove soft-deleted tasks and comments, and expired idempotency keys."""
+        from app import db
+        from app.services.idempotency_service import IdempotencyService
+        from app.services.purge_service import PurgeService
+        
+        if workspace is not None:
+            db.session.info['workspace_id'] = workspace
+        if grace_hours is None:
+            grace_hours = app.config['PURGE_GRACE_PERIOD_HOURS']
+        if batch_size is None:
+            batch_size = app.config['PURGE_BATCH_SIZE']
+        
+        purged = PurgeService.purge_deleted(timedelta(hours=grace_hours), batch_size, max_batches)
+        click.echo(f"Purged {purged['tasks']} tasks and {purged['comments']} comments")
+        
+        expired = IdempotencyService.purge_expired(batch_size)
+        click.echo(f"Purged {expired} expired idempotency keys")
+    
+    @app.cli.command('archive-comments')
+    @click.option('--after-days', type=float, default=None,
+                  help='Archive comments of tasks completed at least this many days ago.')
+    @click.option('--batch-size', type=int, default=None, help='Comments moved per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+    @click.option('--workspace', default=None, help=WORKSPACE_HELP)
+    def archive_comments(after_days, batch_size, max_batches, workspace):
+        """Move comments of long-completed tasks into the comments_archive table."""
+        from app import db
+        from app.services.archive_service import ArchiveService
+        
+        if workspace is not None:
+            db.session.info['workspace_id'] = workspace
+        if after_days is None:
+            after_days = app.config['ARCHIVE_AFTER_DAYS']
+        if batch_size is None:
+            batch_size = app.config['ARCHIVE_BATCH_SIZE']
+        
+        archived = ArchiveService.archive_completed(timedelta(days=after_days), batch_size, max_batches)
+        click.echo(f"Archived {archived['comments']} comments from {archived['tasks']} tasks")
+    
+    @app.cli.command('worker')
+    @click.option('--concurrency', type=int, default=None, help='Jobs run at the same time.')
+    @click.option('--mode', type=click.Choice(['thread', 'process']), default=None,
+                  help='Run jobs on a thread pool or a process pool.')
+    @click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+    def worker(concurrency, mode, burst):
+        """Run queued background jobs."""
+        from app.worker import Worker
+        
+        runner = Worker(
+            app,
+            concurrency=concurrency or app.config['JOB_WORKER_CONCURRENCY'],
+            mode=mode or app.config['JOB_WORKER_MODE'],
+            poll_interval=app.config['JOB_POLL_INTERVAL']
+        )
+        click.echo(f'Worker {runner.name} running jobs on {runner.concurrency} {runner.mode}s')
+        try:
+            ran = runner.run(burst=burst)
+        except KeyboardInterrupt:
+            runner.stop()
+            ran = None
+        if ran is not None:
+            click.echo(f'Ran {ran} jobs')
+    
+    @app.cli.command('enqueue')
+    @click.argument('kind')
+    @click.option('--payload', default='{}', help='Job payload as a JSON object.')
+    def enqueue(kind, payload):
+        """Queue a background job, e.g. flask enqueue export-task --payload '{"task_id": 1}'."""
+        import json
+        from app.services.job_service import JobService
+        
+        try:
+            job = JobService.enqueue(kind, json.loads(payload), app.config['JOB_MAX_ATTEMPTS'])
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        click.echo(f'Queued job {job.id}')
@@ -0,0 +1,186 @@
+"""Response compression with Accept-Encoding negotiation.
+
+Large JSON payloads (comment threads in particular) compress very well, so
+responses above ``COMPRESS_MIN_SIZE`` bytes are encoded with the best codec the
+client accepts. Compressed bodies are kept in a small LRU keyed by a digest of
+the uncompressed payload, which means a hot response is only compressed once
+no matter how many clients fetch it.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    # mtime=0 keeps the output deterministic for identical payloads
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _deflate(body: bytes, level: int) -> bytes:
+    return zlib.compress(body, level)
+
+
+def _brotli(body: bytes, level: int) -> bytes:
+    # Brotli quality runs 0-11; map the zlib-style 1-9 level onto it
+    return brotli.compress(body, quality=min(11, max(0, level + 2)))
+
+
+CODECS = {'gzip': _gzip, 'deflate': _deflate}
+if brotli is not None:
+    CODECS['br'] = _brotli
+
+# Server-side preference when the client weights encodings equally
+PREFERRED_ORDER = ('br', 'gzip', 'deflate')
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Parse an Accept-Encoding header into a ``{coding: qvalue}`` mapping."""
+    accepted = {}
+    for part in header.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header: str):
+    """Return the best supported encoding for an Accept-Encoding header, or None."""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for coding in PREFERRED_ORDER:
+        if coding not in CODECS:
+            continue
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies keyed by payload digest."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes):
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Compress:
+    """Flask extension that compresses eligible responses in ``after_request``."""
+
+    def __init__(self, app=None):
+        self.cache = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_MIMETYPES', ['application/json', 'text/html', 'text/plain'])
+        app.config.setdefault('COMPRESS_CACHE_ENTRIES', 256)
+        app.config.setdefault('COMPRESS_CACHE_MAX_BYTES', 16 * 1024 * 1024)
+
+        self.cache = CompressedBodyCache(
+            max_entries=app.config['COMPRESS_CACHE_ENTRIES'],
+            max_bytes=app.config['COMPRESS_CACHE_MAX_BYTES']
+        )
+        app.extensions['compress'] = self
+
+        if app.config['COMPRESS_ENABLED']:
+            app.after_request(self.after_request)
+
+    def compress(self, body: bytes, encoding: str, level: int) -> bytes:
+        """Compress ``body`` with ``encoding``, reusing a cached result when possible."""
+        key = (encoding, level, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = CODECS[encoding](body, level)
+            self.cache.put(key, compressed)
+        return compressed
+
+    def after_request(self, response):
+        config = current_app.config
+        response.vary.add('Accept-Encoding')
+
+        if (response.direct_passthrough
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in config['COMPRESS_MIMETYPES']):
+            return response
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        compressed = self.compress(body, encoding, config['COMPRESS_LEVEL'])
+        if len(compressed) >= len(body):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(compressed))
+        return response
@@ -0,0 +1,83 @@
+"""Configuration profiles selected by ``create_app(config_name)``.
+
+Class attributes are static defaults; ``init_app`` applies the settings that
+depend on the environment or on the database URI, after ``.env`` is loaded.
+"""
+import os
+from sqlalchemy.pool import StaticPool
+
+
+class Config:
+    """Settings shared by every profile."""
+    DEBUG = False
+    TESTING = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///app.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ECHO = False
+
+    @classmethod
+    def init_app(cls, app):
+        app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', cls.SQLALCHEMY_DATABASE_URI)
+
+        # MySQL specific configuration
+        if 'mysql' in app.config['SQLALCHEMY_DATABASE_URI']:
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+                'pool_size': 10,
+                'pool_recycle': 120,
+                'pool_pre_ping': True
+            }
+
+
+class DevelopmentConfig(Config):
+    """Local development: debug mode, readable JSON, optional SQL logging."""
+    DEBUG = True
+
+    @classmethod
+    def init_app(cls, app):
+        super().init_app(app)
+        app.config['SQLALCHEMY_ECHO'] = os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true'
+
+
+class TestingConfig(Config):
+    """Test runs: a private in-memory database unless DATABASE_URL says otherwise."""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+    @classmethod
+    def init_app(cls, app):
+        super().init_app(app)
+        if app.config['SQLALCHEMY_DATABASE_URI'] in ('sqlite://', 'sqlite:///:memory:'):
+            # One shared connection, otherwise every pooled connection would
+            # see its own empty in-memory database
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+                'poolclass': StaticPool,
+                'connect_args': {'check_same_thread': False}
+            }
+
+
+class ProductionConfig(Config):
+    """Deployed servers: no debug or SQL echo, a sized pool, lean JSON."""
+
+    @classmethod
+    def init_app(cls, app):
+        super().init_app(app)
+        if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+                'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+                'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+                'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 280)),
+                'pool_pre_ping': True
+            }
+
+        # Responses are read by programs: skip key sorting and indentation
+        app.json.sort_keys = False
+        app.json.compact = True
+
+
+config = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+    'default': DevelopmentConfig
+}
@@ -0,0 +1,102 @@
+"""Background job handlers, run by ``flask worker`` (see ``app.worker``).
+
+A handler takes the job's payload and a ``Progress`` and returns a
+JSON-serializable result. It runs in its own application context and uses
+the service layer like a request would; raising marks the attempt failed.
+Handlers may be retried, so they should be safe to run again: a handler
+can resume from ``progress.done``, the last progress it reported. The
+worker renews the job's lease while its handler runs; a report made after
+the job was claimed again raises ``LeaseLostError`` and ends the attempt.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from flask import current_app
+
+from app.services.job_service import JobService
+
+HANDLERS: Dict[str, Callable] = {}
+
+# Kinds clients may queue through POST /api/jobs; the rest are CLI-only maintenance
+PUBLIC_KINDS = set()
+
+
+def handler(kind: str, public: bool = False):
+    """Register a function as the handler for jobs of ``kind``."""
+    def register(func):
+        HANDLERS[kind] = func
+        if public:
+            PUBLIC_KINDS.add(kind)
+        return func
+    return register
+
+
+class Progress:
+    """Progress reporter handed to a handler; raises ``LeaseLostError`` once the job was claimed again."""
+
+    def __init__(self, job_id: int, worker: str, attempt: int, done: int = 0, total: Optional[int] = None):
+        self.job_id = job_id
+        self.worker = worker
+        self.attempt = attempt
+        self.done = done
+        self.total = total
+
+    def __call__(self, done: int, total: Optional[int] = None):
+        self.done = done
+        if total is not None:
+            self.total = total
+        JobService.report_progress(self.job_id, self.worker, self.attempt, done, total)
+
+
+@handler('purge-deleted')
+def purge_deleted(payload: dict, progress: Progress) -> dict:
+    from app.services.purge_service import PurgeService
+
+    grace_hours = payload.get('grace_hours', current_app.config['PURGE_GRACE_PERIOD_HOURS'])
+    batch_size = payload.get('batch_size', current_app.config['PURGE_BATCH_SIZE'])
+    return PurgeService.purge_deleted(timedelta(hours=grace_hours), batch_size, on_batch=progress)
+
+
+@handler('archive-comments')
+def archive_comments(payload: dict, progress: Progress) -> dict:
+    from app.services.archive_service import ArchiveService
+
+    after_days = payload.get('after_days', current_app.config['ARCHIVE_AFTER_DAYS'])
+    batch_size = payload.get('batch_size', current_app.config['ARCHIVE_BATCH_SIZE'])
+    return ArchiveService.archive_completed(timedelta(days=after_days), batch_size, on_batch=progress)
+
+
+@handler('export-task', public=True)
+def export_task(payload: dict, progress: Progress) -> dict:
+    """Write a task and all its comments to a JSON file in ``JOB_EXPORT_DIR/<workspace>``."""
+    from app.services.comment_service import CommentService
+    from app.services.task_service import TaskService
+
+    task = TaskService.get_task_by_id(payload['task_id'])
+    if task is None:
+        raise ValueError(f"Task with ID {payload['task_id']} not found")
+    comments = CommentService.get_comments_by_task(task.id)
+    progress(0, len(comments))
+
+    # Task ids are only unique within a database, and workspaces may have their own
+    directory = os.path.join(current_app.config['JOB_EXPORT_DIR'], task.workspace_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"task-{task.id}.{datetime.utcnow():%Y%m%d%H%M%S}.json")
+    with open(path, 'w') as f:
+        json.dump({'task': task.to_dict(), 'comments': [comment.to_dict() for comment in comments]}, f)
+    progress(len(comments))
+    return {'path': path, 'comments': len(comments)}
+
+
+@handler('import-comments', public=True)
+def import_comments(payload: dict, progress: Progress) -> dict:
+    """Create ``payload['comments']`` on ``payload['task_id']``, resuming after a retry."""
+    from app.services.comment_service import CommentService
+
+    comments = payload['comments']
+    for index in range(progress.done, len(comments)):
+        CommentService.create_comment(dict(comments[index], task_id=payload['task_id']))
+        progress(index + 1, len(comments))
+    return {'imported': len(comments)}
@@ -1,4 +1,11 @@
 from .task import Task
 from .comment import Comment
+from .event import Event
+from .idempotency_key import IdempotencyKey
+from .archived_comment import ArchivedComment
+from .job import Job
+from .comment_revision import CommentRevision
+from .workspace import DEFAULT_WORKSPACE, WorkspaceScoped
 
-__all__ = ['Task', 'Comment']
+__all__ = ['Task', 'Comment', 'Event', 'IdempotencyKey', 'ArchivedComment', 'Job', 'CommentRevision',
+           'DEFAULT_WORKSPACE', 'WorkspaceScoped']
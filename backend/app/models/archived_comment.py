@@ -0,0 +1,39 @@
+from datetime import datetime
+from app import db
+from app.models.comment import Comment
+from app.models.workspace import WorkspaceScoped
+
+class ArchivedComment(WorkspaceScoped, db.Model):
+    """A comment moved out of ``comments`` by ``ArchiveService``.
+    
+    Same columns as ``Comment`` plus ``archived_at``, so rows are copied with
+    a single INSERT .. SELECT. Archived comments are read-only; they keep
+    their ids and serialize exactly like live ones. ``task_id`` has no
+    foreign key, so the archive can live on cheaper storage later.
+    """
+    
+    __tablename__ = 'comments_archive'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    content = db.Column(db.Text, nullable=False)
+    author_name = db.Column(db.String(100), nullable=False)
+    author_email = db.Column(db.String(120))
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    version = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime)
+    task_id = db.Column(db.Integer, nullable=False)
+    parent_id = db.Column(db.Integer)
+    path = db.Column(db.String(255))
+    depth = db.Column(db.Integer, nullable=False, default=0)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_comments_archive_task_id_created_at', 'task_id', 'created_at'),
+    )
+    
+    # Same wire format as a live comment
+    to_dict = Comment.to_dict
+    
+    def __repr__(self):
+        return f'<ArchivedComment {self.id}: {self.content[:50]}...>'
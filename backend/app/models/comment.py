@@ -1,7 +1,10 @@
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import set_committed_value
 from app import db
+from app.models.workspace import WorkspaceScoped
 
-class Comment(db.Model):
+class Comment(WorkspaceScoped, db.Model):
     """Comment model representing a comment on a task."""
     
     __tablename__ = 'comments'
@@ -13,9 +16,35 @@ class Comment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Optimistic concurrency: UPDATEs are guarded by WHERE version = <loaded version>
+    version = db.Column(db.Integer, nullable=False)
+    
+    # Soft delete: tombstoned comments are hidden until purged
+    deleted_at = db.Column(db.DateTime, index=True)
+    
     # Foreign key to task
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
     
+    # Threading: a materialized path of fixed-width ancestor ids ("0000000003.0000000007.")
+    # sorts a task's comments in display order and makes every subtree a contiguous range
+    parent_id = db.Column(db.Integer, db.ForeignKey('comments.id'))
+    path = db.Column(db.String(255))
+    depth = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Per-task indexes need no workspace column: a task belongs to one workspace
+    __table_args__ = (
+        db.Index('ix_comments_task_id_path', 'task_id', 'path'),
+        db.Index('ix_comments_workspace_id_updated_at_id', 'workspace_id', 'updated_at', 'id'),
+        # Newest-first comments per task (listing and ?include=comments)
+        db.Index('ix_comments_task_id_created_at', 'task_id', 'created_at'),
+        # Never reuse ids: archived comments keep theirs in comments_archive
+        {'sqlite_autoincrement': True},
+    )
+    __mapper_args__ = {'version_id_col': version, 'eager_defaults': True}
+    
+    PATH_SEGMENT_WIDTH = 10
+    MAX_DEPTH = 255 // (PATH_SEGMENT_WIDTH + 1) - 1
+    
     def __repr__(self):
         return f'<Comment {self.id}: {self.content[:50]}...>'
     
@@ -27,8 +56,11 @@ class Comment(db.Model):
             'author_name': self.author_name,
             'author_email': self.author_email,
             'task_id': self.task_id,
+            'parent_id': self.parent_id,
+            'depth': self.depth,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version
         }
     
     @staticmethod
@@ -38,9 +70,14 @@ class Comment(db.Model):
             content=data.get('content'),
             author_name=data.get('author_name'),
             author_email=data.get('author_email'),
-            task_id=data.get('task_id')
+            task_id=data.get('task_id'),
+            parent_id=data.get('parent_id')
         )
     
+    @classmethod
+    def path_segment(cls, comment_id: int) -> str:
+        return f'{comment_id:0{cls.PATH_SEGMENT_WIDTH}d}.'
+    
     def update_from_dict(self, data):
         """Update comment from dictionary."""
         if 'content' in data:
@@ -50,3 +87,16 @@ class Comment(db.Model):
         if 'author_email' in data:
             self.author_email = data['author_email']
         self.updated_at = datetime.utcnow()
+
+@event.listens_for(Comment, 'after_insert')
+def _complete_path(mapper, connection, target):
+    """Append the new comment's own id to its path once the id is known.
+    
+    Before insert, ``path`` holds the parent's path (or nothing for a root
+    comment); this runs inside the same flush, so every code path that
+    inserts comments gets a consistent path.
+    """
+    path = (target.path or '') + Comment.path_segment(target.id)
+    table = Comment.__table__
+    connection.execute(table.update().where(table.c.id == target.id).values(path=path))
+    set_committed_value(target, 'path', path)
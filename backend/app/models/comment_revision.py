@@ -0,0 +1,41 @@
+from datetime import datetime
+from app import db
+
+class CommentRevision(db.Model):
+    """One version of a comment's content, stored compactly.
+    
+    ``data`` is zlib-compressed: either the full content (``snapshot``) or
+    a delta against the previous revision (``delta``), see
+    ``RevisionService``. Revision 1 is the content before the first edit
+    and the newest revision always equals the live comment, so comments
+    that were never edited cost nothing. Like ``Event.task_id``,
+    ``comment_id`` is not a foreign key; ``PurgeService`` removes
+    revisions together with their comment.
+    """
+    
+    __tablename__ = 'comment_revisions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    comment_id = db.Column(db.Integer, nullable=False)
+    revision = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # snapshot, delta
+    data = db.Column(db.LargeBinary, nullable=False)
+    content_length = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('comment_id', 'revision', name='uq_comment_revisions_comment_id_revision'),
+    )
+    
+    def __repr__(self):
+        return f'<CommentRevision {self.comment_id}@{self.revision} {self.kind}>'
+    
+    def to_dict(self):
+        """Convert revision metadata to dictionary for JSON serialization."""
+        return {
+            'revision': self.revision,
+            'kind': self.kind,
+            'content_length': self.content_length,
+            'stored_bytes': len(self.data),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
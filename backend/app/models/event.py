@@ -0,0 +1,56 @@
+from datetime import datetime
+from app import db
+from app.models.workspace import WorkspaceScoped
+
+class Event(WorkspaceScoped, db.Model):
+    """Append-only record of a task or comment change, for the activity feed.
+    
+    Events are written in the same transaction as the change they describe
+    and are never updated. ``task_id`` is deliberately not a foreign key so
+    the history survives purging the task itself.
+    """
+    
+    __tablename__ = 'events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    entity_type = db.Column(db.String(20), nullable=False)  # task, comment
+    action = db.Column(db.String(20), nullable=False)  # created, updated, deleted, restored
+    entity_id = db.Column(db.Integer, nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    actor = db.Column(db.String(100))
+    summary = db.Column(db.String(200))
+    
+    # The feed is read newest-first by id within a workspace; per-task feeds use (task_id, id)
+    __table_args__ = (
+        db.Index('ix_events_workspace_id_id', 'workspace_id', 'id'),
+        db.Index('ix_events_task_id_id', 'task_id', 'id'),
+    )
+    
+    SUMMARY_LENGTH = 200
+    
+    def __repr__(self):
+        return f'<Event {self.id}: {self.entity_type}.{self.action} {self.entity_id}>'
+    
+    def to_dict(self):
+        """Convert event to dictionary for JSON serialization."""
+        return {
+            'id': self.id,
+            'type': f'{self.entity_type}.{self.action}',
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'task_id': self.task_id,
+            'actor': self.actor,
+            'summary': self.summary,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    @classmethod
+    def for_entity(cls, action: str, entity) -> 'Event':
+        """Describe ``action`` on a flushed task or comment."""
+        if entity.__tablename__ == 'tasks':
+            return cls(entity_type='task', action=action, entity_id=entity.id, task_id=entity.id,
+                       summary=entity.title[:cls.SUMMARY_LENGTH], workspace_id=entity.workspace_id)
+        return cls(entity_type='comment', action=action, entity_id=entity.id, task_id=entity.task_id,
+                   actor=entity.author_name, summary=entity.content[:cls.SUMMARY_LENGTH],
+                   workspace_id=entity.workspace_id)
@@ -0,0 +1,23 @@
+from app import db
+
+class IdempotencyKey(db.Model):
+    """Stored outcome of a POST made with an ``Idempotency-Key`` header.
+    
+    ``key_hash`` digests the client, route and key, so lookups are a
+    primary-key probe on a fixed-width column. A row without a
+    ``status_code`` belongs to a request that is still running, or that
+    died before it finished once ``locked_until`` has passed.
+    """
+    
+    __tablename__ = 'idempotency_keys'
+    
+    key_hash = db.Column(db.String(64), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.SmallInteger)
+    body = db.Column(db.Text)
+    etag = db.Column(db.String(64))
+    locked_until = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key_hash[:12]} {self.status_code}>'
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime
+from app import db
+from app.models.workspace import WorkspaceScoped
+
+class Job(WorkspaceScoped, db.Model):
+    """A unit of background work, queued in the database and run by ``flask worker``.
+    
+    ``kind`` names a handler registered in ``app.jobs``; ``payload`` and
+    ``result`` are JSON. A job moves from queued to running to succeeded or
+    failed; a failed attempt goes back to queued with a later ``run_after``
+    until ``max_attempts`` is used up. ``heartbeat_at`` is refreshed by the
+    worker while the job runs, so a job whose worker died can be claimed
+    again once its lease runs out; ``worker`` and ``attempts`` identify the
+    attempt that holds it. Jobs queued through the API run inside their
+    workspace; maintenance jobs queued from the CLI have no workspace and
+    see every row.
+    """
+    
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    worker = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    workspace_id = db.Column(db.String(50))
+    
+    # Workers poll for the oldest runnable job in a status
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+    
+    ERROR_LENGTH = 2000
+    
+    def __repr__(self):
+        return f'<Job {self.id}: {self.kind} {self.status}>'
+    
+    def payload_dict(self) -> dict:
+        return json.loads(self.payload)
+    
+    def to_dict(self):
+        """Convert job to dictionary for JSON serialization."""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'progress': {'done': self.progress_done, 'total': self.progress_total},
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -1,7 +1,10 @@
 from datetime import datetime
+from sqlalchemy import func, select
 from app import db
+from app.models.comment import Comment
+from app.models.workspace import WorkspaceScoped
 
-class Task(db.Model):
+class Task(WorkspaceScoped, db.Model):
     """Task model representing a task that can have comments."""
     
     __tablename__ = 'tasks'
@@ -14,9 +17,42 @@ class Task(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Optimistic concurrency: UPDATEs are guarded by WHERE version = <loaded version>
+    version = db.Column(db.Integer, nullable=False)
+    
+    # Soft delete: tombstoned tasks (and their comments) are hidden until purged
+    deleted_at = db.Column(db.DateTime, index=True)
+    
     # Relationship with comments
     comments = db.relationship('Comment', backref='task', lazy=True, cascade='all, delete-orphan')
     
+    # Visible comments moved to comments_archive by ArchiveService; also tells
+    # readers whether the archive needs to be consulted at all
+    archived_comments_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Visible comments, counted by a correlated subquery in the task's own SELECT
+    # instead of lazy-loading every comment, plus the archived ones. Deferred:
+    # only queries that serialize tasks undefer it. Comment writes never change
+    # the task row, so flushing a task does not expire it.
+    comments_count = db.column_property(
+        select(func.count(Comment.id))
+        .where(Comment.task_id == id, Comment.deleted_at.is_(None))
+        .correlate_except(Comment)
+        .scalar_subquery() + archived_comments_count,
+        deferred=True,
+        expire_on_flush=False
+    )
+    
+    # Hot paths lead with the workspace: the change feed scans (updated_at, id)
+    # and the listing reads live tasks newest first
+    __table_args__ = (
+        db.Index('ix_tasks_workspace_id_updated_at_id', 'workspace_id', 'updated_at', 'id'),
+        db.Index('ix_tasks_workspace_id_deleted_at_created_at', 'workspace_id', 'deleted_at', 'created_at'),
+    )
+    # eager_defaults fetches server-generated values with INSERT/UPDATE .. RETURNING
+    # where the backend supports it, instead of a refresh SELECT on first access
+    __mapper_args__ = {'version_id_col': version, 'eager_defaults': True}
+    
     def __repr__(self):
         return f'<Task {self.id}: {self.title}>'
     
@@ -30,7 +66,8 @@ class Task(db.Model):
             'priority': self.priority,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'comments_count': len(self.comments) if self.comments else 0
+            'version': self.version,
+            'comments_count': self.comments_count
         }
     
     @staticmethod
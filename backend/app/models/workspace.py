@@ -0,0 +1,13 @@
+from app import db
+
+DEFAULT_WORKSPACE = 'default'
+
+class WorkspaceScoped:
+    """Mixin for rows that belong to one workspace (tenant).
+
+    Sessions serving a workspace only load, update and delete its rows and
+    stamp new ones with it (see ``app.tenancy``); rows written without a
+    workspace, e.g. by ``init_db.py`` or CLI commands, land in the default one.
+    """
+
+    workspace_id = db.Column(db.String(50), nullable=False, default=DEFAULT_WORKSPACE)
@@ -0,0 +1,137 @@
+"""On-demand per-request profiling.
+
+A request is profiled when it carries ``X-Profile-Token`` equal to
+``PROFILE_ADMIN_TOKEN``, or when it is picked by ``PROFILE_SAMPLE_RATE``
+(a fraction of all requests). The profile covers the view, the other
+before/after request hooks and serialization. It is written to
+``PROFILE_DIR`` as ``<endpoint>.<timestamp>.<pid>.<ext>``:
+
+* ``PROFILE_MODE=cprofile`` (default) writes ``.pstats`` files for
+  ``python -m pstats`` or snakeviz;
+* ``PROFILE_MODE=sample`` samples the request thread's stack every
+  ``PROFILE_SAMPLE_INTERVAL_MS`` and writes ``.collapsed`` stacks for
+  flamegraph.pl or speedscope. It is cheaper than tracing every call.
+
+With neither a token nor a sample rate configured no hooks are registered,
+so the profiler costs nothing.
+"""
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, g, request
+
+
+class StackSampler:
+    """Background thread that samples one thread's stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.items():
+                f.write(f'{stack} {count}\n')
+
+
+class Profiler:
+    """Flask extension that profiles selected requests and dumps the results."""
+
+    TOKEN_HEADER = 'X-Profile-Token'
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PROFILE_ADMIN_TOKEN', None)
+        app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+        app.config.setdefault('PROFILE_MODE', 'cprofile')
+        app.config.setdefault('PROFILE_SAMPLE_INTERVAL_MS', 1.0)
+        app.config.setdefault('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+
+        if app.config['PROFILE_MODE'] not in ('cprofile', 'sample'):
+            raise ValueError(f"PROFILE_MODE must be 'cprofile' or 'sample', not {app.config['PROFILE_MODE']!r}")
+
+        if not app.config['PROFILE_ADMIN_TOKEN'] and not app.config['PROFILE_SAMPLE_RATE']:
+            return
+        app.extensions['profiler'] = self
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    @staticmethod
+    def selected(req, config) -> bool:
+        token = config['PROFILE_ADMIN_TOKEN']
+        supplied = req.headers.get(Profiler.TOKEN_HEADER)
+        if token and supplied and hmac.compare_digest(supplied, token):
+            return True
+        rate = config['PROFILE_SAMPLE_RATE']
+        return rate > 0 and random.random() < rate
+
+    def before_request(self):
+        config = current_app.config
+        if not self.selected(request, config):
+            return None
+
+        if config['PROFILE_MODE'] == 'sample':
+            profiler = StackSampler(threading.get_ident(), config['PROFILE_SAMPLE_INTERVAL_MS'] / 1000.0)
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g._profiler = profiler
+        return None
+
+    @staticmethod
+    def after_request(response):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return response
+
+        if isinstance(profiler, StackSampler):
+            profiler.stop()
+            extension = 'collapsed'
+        else:
+            profiler.disable()
+            extension = 'pstats'
+
+        directory = current_app.config['PROFILE_DIR']
+        os.makedirs(directory, exist_ok=True)
+        endpoint = request.endpoint or 'unmatched'
+        filename = f'{endpoint}.{int(time.time() * 1000)}.{os.getpid()}.{extension}'
+        path = os.path.join(directory, filename)
+        if isinstance(profiler, StackSampler):
+            profiler.dump(path)
+        else:
+            profiler.dump_stats(path)
+
+        response.headers['X-Profile'] = filename
+        return response
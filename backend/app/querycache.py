@@ -0,0 +1,75 @@
+"""Hit-rate counters for SQLAlchemy's compiled statement cache.
+
+Every engine keeps an LRU of compiled SQL keyed by statement structure
+(``query_cache_size`` entries, 500 by default). With ``QUERY_CACHE_STATS``
+enabled, each statement executed on the application's engines (primary,
+binds, replicas and workspace databases) is counted by its ``ExecutionContext.cache_hit``:
+
+* ``hits`` reused compiled SQL;
+* ``misses`` were compiled and stored; a steady stream of them means the
+  cache is too small or statements embed literal values;
+* ``uncached`` could not be cached at all (plain SQL strings, or a
+  construct without a cache key).
+
+Disabled by default, so no listener is installed.
+"""
+import threading
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+from app import db
+
+
+class QueryCacheStats:
+    """Thread-safe counters fed by a ``before_cursor_execute`` listener."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def listen(self, engine):
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        cache_hit = getattr(context, 'cache_hit', None)
+        if cache_hit is CACHE_HIT:
+            outcome = 'hits'
+        elif cache_hit is CACHE_MISS:
+            outcome = 'misses'
+        else:
+            outcome = 'uncached'
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hits, misses, uncached = self.counts['hits'], self.counts['misses'], self.counts['uncached']
+        cacheable = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'uncached': uncached,
+            'hit_rate': round(hits / cacheable, 4) if cacheable else None
+        }
+
+
+def init_query_cache_stats(app):
+    """Count compiled-cache outcomes on all of the app's engines if enabled."""
+    app.config.setdefault('QUERY_CACHE_STATS', False)
+    if not app.config['QUERY_CACHE_STATS']:
+        return
+
+    stats = QueryCacheStats()
+    with app.app_context():
+        engines = list(db.engines.values())
+    engines += app.extensions.get('replica_engines', [])
+    engines += app.extensions.get('workspace_engines', {}).values()
+    for engine in engines:
+        stats.listen(engine)
+    app.extensions['query_cache_stats'] = stats
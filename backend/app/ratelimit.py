@@ -0,0 +1,213 @@
+"""Per-client, per-route rate limiting with token buckets.
+
+Every (client, endpoint) pair gets a bucket holding up to ``limit`` tokens
+that refills at ``limit / period`` tokens per second; a request spends one
+token or is rejected with ``429`` and ``Retry-After``. Successful responses
+carry ``RateLimit-Limit``, ``RateLimit-Remaining`` and ``RateLimit-Reset``.
+
+With ``RATELIMIT_WORKSPACE_DEFAULT`` (or a per-workspace entry in
+``RATELIMIT_WORKSPACE_LIMITS``) each workspace also has one bucket shared
+by all of its clients, so a single tenant cannot take the whole capacity.
+
+A client is its API key once ``app.tenancy`` has verified it, else its
+remote address. The default in-process store shards buckets over
+independently locked LRU dicts, so concurrent requests rarely contend on
+the same lock and a flood of new clients costs O(1) per request. Set
+``RATELIMIT_STORAGE_URL`` to a ``redis://`` URL to share buckets between
+worker processes (requires the optional ``redis`` package).
+"""
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from flask import current_app, g, jsonify, request
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_LIMIT_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d+(?:\.\d+)?|second|minute|hour|day)\s*$')
+
+
+class Limit(NamedTuple):
+    capacity: int
+    rate: float  # tokens per second
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Limit':
+        """Parse ``"100/60"`` (requests per seconds) or ``"100/minute"``."""
+        match = _LIMIT_PATTERN.match(spec)
+        if not match:
+            raise ValueError(f"Invalid rate limit {spec!r}; expected e.g. '100/60' or '100/minute'")
+        capacity, period = match.groups()
+        seconds = _PERIODS[period] if period in _PERIODS else float(period)
+        return cls(int(capacity), int(capacity) / seconds)
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset_after: float  # seconds until the bucket is full again
+    retry_after: float  # seconds until the next request would be allowed
+
+
+def _decide(tokens: float, limit: Limit, allowed: bool) -> Decision:
+    deficit = 0.0 if allowed else 1.0 - tokens
+    return Decision(allowed, int(tokens), (limit.capacity - tokens) / limit.rate, deficit / limit.rate)
+
+
+class MemoryStore:
+    """In-process token buckets sharded across independently locked LRU dicts.
+
+    Each shard keeps at most ``max_keys_per_shard`` buckets; a new key evicts
+    the least recently used one, so memory and the cost per call stay
+    bounded however many clients appear.
+    """
+
+    def __init__(self, shards: int = 64, max_keys_per_shard: int = 10000, clock=time.monotonic):
+        self._shards = [(OrderedDict(), threading.Lock()) for _ in range(shards)]
+        self._max_keys = max_keys_per_shard
+        self._clock = clock
+
+    def consume(self, key: str, limit: Limit) -> Decision:
+        buckets, lock = self._shards[hash(key) % len(self._shards)]
+        now = self._clock()
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self._max_keys:
+                    buckets.popitem(last=False)
+                tokens = limit.capacity
+            else:
+                buckets.move_to_end(key)
+                tokens = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.rate)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+        return _decide(tokens, limit, allowed)
+
+
+class RedisStore:
+    """Token buckets shared by all workers, updated atomically with a Lua script."""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = redis.call('TIME')
+    now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str, prefix: str = 'ratelimit:'):
+        if redis is None:
+            raise RuntimeError("RATELIMIT_STORAGE_URL requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+        self._prefix = prefix
+
+    def consume(self, key: str, limit: Limit) -> Decision:
+        allowed, tokens = self._script(keys=[self._prefix + key], args=[limit.capacity, limit.rate])
+        return _decide(float(tokens), limit, bool(allowed))
+
+
+class RateLimiter:
+    """Flask extension enforcing token-bucket limits in ``before_request``."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_DEFAULT', '1000/minute')
+        app.config.setdefault('RATELIMIT_ROUTE_LIMITS', {})
+        app.config.setdefault('RATELIMIT_STORAGE_URL', None)
+        app.config.setdefault('RATELIMIT_WORKSPACE_DEFAULT', None)
+        app.config.setdefault('RATELIMIT_WORKSPACE_LIMITS', {})
+
+        # Parse limits once at startup; requests only do dict lookups
+        state = {
+            'default': Limit.parse(app.config['RATELIMIT_DEFAULT']),
+            'routes': {endpoint: Limit.parse(spec)
+                       for endpoint, spec in app.config['RATELIMIT_ROUTE_LIMITS'].items()},
+            'store': (RedisStore(app.config['RATELIMIT_STORAGE_URL'])
+                      if app.config['RATELIMIT_STORAGE_URL'] else MemoryStore()),
+            'workspace_default': (Limit.parse(app.config['RATELIMIT_WORKSPACE_DEFAULT'])
+                                  if app.config['RATELIMIT_WORKSPACE_DEFAULT'] else None),
+            'workspaces': {workspace: Limit.parse(spec)
+                           for workspace, spec in app.config['RATELIMIT_WORKSPACE_LIMITS'].items()}
+        }
+        app.extensions['ratelimit'] = state
+
+        if app.config['RATELIMIT_ENABLED']:
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+
+    @staticmethod
+    def client_id(req) -> str:
+        """The API key verified by ``app.tenancy``, else the remote address.
+        
+        Unverified keys are never used: a client could rotate them to get a
+        fresh bucket on every request.
+        """
+        return g.get('api_key') or req.remote_addr or 'anonymous'
+
+    def before_request(self):
+        req = request._get_current_object()
+        endpoint = req.endpoint
+        if endpoint is None or req.method == 'OPTIONS':
+            return None
+
+        state = current_app.extensions['ratelimit']
+        limit = state['routes'].get(endpoint, state['default'])
+        decision = state['store'].consume(f'{self.client_id(req)}|{endpoint}', limit)
+        g.ratelimit = (limit, decision)
+
+        if not decision.allowed:
+            return self.too_many_requests('Rate limit exceeded', decision)
+
+        # Set by app.tenancy, whose hook runs first
+        workspace = g.get('workspace_id')
+        workspace_limit = state['workspaces'].get(workspace, state['workspace_default'])
+        if workspace is not None and workspace_limit is not None:
+            workspace_decision = state['store'].consume(f'workspace:{workspace}', workspace_limit)
+            if not workspace_decision.allowed:
+                return self.too_many_requests(f"Rate limit exceeded for workspace '{workspace}'", workspace_decision)
+        return None
+
+    @staticmethod
+    def too_many_requests(message: str, decision: Decision):
+        response = jsonify({'error': message})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(1, math.ceil(decision.retry_after)))
+        return response
+
+    @staticmethod
+    def after_request(response):
+        ratelimit = g.pop('ratelimit', None)
+        if ratelimit is not None:
+            limit, decision = ratelimit
+            # Headers.add appends without scanning for existing values like __setitem__ does
+            headers = response.headers
+            headers.add('RateLimit-Limit', str(limit.capacity))
+            headers.add('RateLimit-Remaining', str(decision.remaining))
+            headers.add('RateLimit-Reset', str(math.ceil(decision.reset_after)))
+        return response
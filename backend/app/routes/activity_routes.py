@@ -0,0 +1,26 @@
+from flask import Blueprint, request, jsonify
+from app.services.activity_service import ActivityService
+
+activity_bp = Blueprint('activity', __name__)
+
+@activity_bp.route('/', methods=['GET'])
+def get_activity():
+    """Get recent task and comment changes across all tasks, newest first."""
+    try:
+        before = request.args.get('before', type=int)
+        task_id = request.args.get('task_id', type=int)
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        if limit < 1:
+            return jsonify({'error': 'limit must be positive'}), 400
+        
+        # Fetch one extra row to learn whether another page exists
+        events = ActivityService.get_activity(before=before, task_id=task_id, limit=limit + 1)
+        page = events[:limit]
+        return jsonify({
+            'events': [event.to_dict() for event in page],
+            'count': len(page),
+            'next_cursor': page[-1].id if len(events) > limit else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, request, jsonify
+from app.services.change_service import ChangeCursor, ChangeService
+
+change_bp = Blueprint('changes', __name__)
+
+@change_bp.route('/', methods=['GET'])
+def get_changes():
+    """Get tasks and comments changed since a cursor, including deletions."""
+    try:
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        if limit < 1:
+            return jsonify({'error': 'limit must be positive'}), 400
+        
+        since = request.args.get('since')
+        try:
+            cursor = ChangeCursor.decode(since) if since else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Tombstones of changes the client has not seen may already have been
+        # purged if it was last caught up longer ago than the grace period
+        grace = timedelta(hours=current_app.config['PURGE_GRACE_PERIOD_HOURS'])
+        if cursor is not None and cursor.synced_at < datetime.utcnow() - grace:
+            return jsonify({'error': 'Cursor is older than the purge grace period; do a full sync'}), 410
+        
+        lag = timedelta(seconds=current_app.config['CHANGE_FEED_SAFETY_LAG_SECONDS'])
+        changes, next_cursor = ChangeService.get_changes(cursor, limit=limit, lag=lag)
+        return jsonify({
+            'changes': changes,
+            'count': len(changes),
+            'next_cursor': next_cursor.encode() if next_cursor else None,
+            'has_more': len(changes) == limit
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
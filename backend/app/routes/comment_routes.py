@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from app.services.comment_service import CommentService
+from app.services.revision_service import RevisionService
 from app.services.task_service import TaskService
+from app.services.exceptions import ConflictError, PreconditionFailedError
+from app.routes.helpers import idempotent, if_match_versions, patched_response, versioned_response
 
 comment_bp = Blueprint('comments', __name__)
 
@@ -27,6 +30,7 @@ def get_comments():
         return jsonify({'error': str(e)}), 500
 
 @comment_bp.route('/', methods=['POST'])
+@idempotent
 def create_comment():
     """Create a new comment for a task."""
     try:
@@ -34,11 +38,8 @@ def create_comment():
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
         
-        # Validate data
-        validated_data = CommentService.validate_comment_data(data)
-        
-        comment = CommentService.create_comment(validated_data)
-        return jsonify(comment.to_dict()), 201
+        comment = CommentService.create_comment(data)
+        return versioned_response(comment, 201)
         
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -53,28 +54,52 @@ def get_comment(comment_id):
         if not comment:
             return jsonify({'error': f'Comment with ID {comment_id} not found'}), 404
         
-        return jsonify(comment.to_dict()), 200
+        return versioned_response(comment)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @comment_bp.route('/<int:comment_id>', methods=['PUT'])
 def update_comment(comment_id):
-    """Update an existing comment."""
+    """Update an existing comment, honouring If-Match for optimistic concurrency."""
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
         
-        # Validate data
-        validated_data = CommentService.validate_comment_data(data, is_update=True)
-        
-        comment = CommentService.update_comment(comment_id, validated_data)
+        comment = CommentService.update_comment(comment_id, data, expected_versions=if_match_versions())
         if not comment:
             return jsonify({'error': f'Comment with ID {comment_id} not found'}), 404
         
-        return jsonify(comment.to_dict()), 200
+        return versioned_response(comment)
+        
+    except PreconditionFailedError as e:
+        return jsonify({'error': str(e)}), 412
+    except ConflictError as e:
+        return jsonify({'error': str(e)}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@comment_bp.route('/<int:comment_id>', methods=['PATCH'])
+def patch_comment(comment_id):
+    """Change only the fields that differ and report them; a no-op writes nothing."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        result = CommentService.patch_comment(comment_id, data, expected_versions=if_match_versions())
+        if not result:
+            return jsonify({'error': f'Comment with ID {comment_id} not found'}), 404
+        
+        return patched_response(*result)
         
+    except PreconditionFailedError as e:
+        return jsonify({'error': str(e)}), 412
+    except ConflictError as e:
+        return jsonify({'error': str(e)}), 409
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -93,6 +118,21 @@ def delete_comment(comment_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@comment_bp.route('/<int:comment_id>/restore', methods=['POST'])
+def restore_comment(comment_id):
+    """Restore a deleted comment before it is purged."""
+    try:
+        comment = CommentService.restore_comment(comment_id)
+        if not comment:
+            return jsonify({'error': f'Deleted comment with ID {comment_id} not found'}), 404
+        
+        return versioned_response(comment)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @comment_bp.route('/task/<int:task_id>', methods=['GET'])
 def get_task_comments(task_id):
     """Get all comments for a specific task (alternative endpoint)."""
@@ -112,3 +152,73 @@ def get_task_comments(task_id):
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+def _thread_response(task_id, root=None):
+    """Build a paginated thread response from the request's query parameters."""
+    max_depth = request.args.get('max_depth', type=int)
+    after = request.args.get('after')
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    if limit < 1 or (max_depth is not None and max_depth < 0):
+        return jsonify({'error': 'limit must be positive and max_depth non-negative'}), 400
+    
+    # Fetch one extra row to learn whether another page exists
+    comments = CommentService.get_thread(task_id, root=root, max_depth=max_depth, after=after, limit=limit + 1)
+    page = comments[:limit]
+    return jsonify({
+        'task_id': task_id,
+        'root_id': root.id if root else None,
+        'comments': [comment.to_dict() for comment in page],
+        'count': len(page),
+        'next_cursor': page[-1].path if len(comments) > limit else None
+    }), 200
+
+@comment_bp.route('/task/<int:task_id>/thread', methods=['GET'])
+def get_task_thread(task_id):
+    """Get a task's threaded comments in display order, paginated."""
+    try:
+        task = TaskService.get_task_by_id(task_id)
+        if not task:
+            return jsonify({'error': f'Task with ID {task_id} not found'}), 404
+        
+        return _thread_response(task_id)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@comment_bp.route('/<int:comment_id>/thread', methods=['GET'])
+def get_comment_thread(comment_id):
+    """Get a comment and its replies in display order, paginated."""
+    try:
+        comment = CommentService.get_comment_by_id(comment_id)
+        if not comment:
+            return jsonify({'error': f'Comment with ID {comment_id} not found'}), 404
+        
+        return _thread_response(comment.task_id, root=comment)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@comment_bp.route('/<int:comment_id>/history', methods=['GET'])
+def get_comment_history(comment_id):
+    """List a comment's content revisions, or rebuild one with ?revision=N."""
+    try:
+        comment = CommentService.get_comment_by_id(comment_id)
+        if not comment:
+            return jsonify({'error': f'Comment with ID {comment_id} not found'}), 404
+        
+        revision = request.args.get('revision', type=int)
+        if revision is not None:
+            content = RevisionService.get_content(comment_id, revision)
+            if content is None:
+                return jsonify({'error': f'Comment {comment_id} has no revision {revision}'}), 404
+            return jsonify({'comment_id': comment_id, 'revision': revision, 'content': content}), 200
+        
+        revisions = RevisionService.get_revisions(comment_id)
+        return jsonify({
+            'comment_id': comment_id,
+            'revisions': [row.to_dict() for row in revisions],
+            'count': len(revisions)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
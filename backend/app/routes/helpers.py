@@ -0,0 +1,83 @@
+from datetime import timedelta
+from functools import wraps
+from typing import Optional, Set
+from flask import current_app, g, make_response, request, jsonify
+from app.services.idempotency_service import IdempotencyService
+
+def if_match_versions() -> Optional[Set[int]]:
+    """Return the versions listed in If-Match, or None if any version is acceptable."""
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    
+    versions = set()
+    for tag in if_match.as_set():
+        if tag.isdigit():
+            versions.add(int(tag))
+    return versions
+
+def versioned_response(obj, status: int = 200):
+    """Serialize a versioned model and expose its version as the ETag."""
+    response = jsonify(obj.to_dict())
+    response.status_code = status
+    response.set_etag(str(obj.version))
+    return response
+
+def patched_response(obj, changed_fields):
+    """Like ``versioned_response``, also listing the fields a PATCH changed."""
+    data = obj.to_dict()
+    data['changed_fields'] = changed_fields
+    response = jsonify(data)
+    response.set_etag(str(obj.version))
+    return response
+
+def idempotent(view):
+    """Replay the stored response when a POST is retried with the same Idempotency-Key.
+    
+    Keys are scoped to the workspace, the client (its verified X-API-Key,
+    else remote address) and the route. Reusing a key for a different body is rejected with 422, and a
+    retry that arrives while the original is still running gets 409, until
+    ``IDEMPOTENCY_LOCK_SECONDS`` pass and the retry may run the request
+    itself. Responses below 500 are stored; server errors release the key so the
+    client can retry.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), 400
+        
+        client = g.get('api_key') or request.remote_addr or ''
+        key_hash = IdempotencyService.digest(g.get('workspace_id', ''), client, request.method, request.path, key)
+        request_hash = IdempotencyService.digest(request.get_data(as_text=True))
+        ttl = timedelta(hours=current_app.config['IDEMPOTENCY_TTL_HOURS'])
+        lock = timedelta(seconds=current_app.config['IDEMPOTENCY_LOCK_SECONDS'])
+        
+        record, created = IdempotencyService.begin(key_hash, request_hash, ttl, lock)
+        if not created:
+            if record is not None and record.request_hash != request_hash:
+                return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+            if record is None or record.status_code is None:
+                return jsonify({'error': 'A request with this Idempotency-Key is still in progress'}), 409
+            response = current_app.response_class(record.body, status=record.status_code, mimetype='application/json')
+            if record.etag:
+                response.set_etag(record.etag)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            IdempotencyService.abandon(record)
+            raise
+        
+        if response.status_code >= 500:
+            IdempotencyService.abandon(record)
+        else:
+            etag, _ = response.get_etag()
+            IdempotencyService.complete(record, response.status_code, response.get_data(as_text=True), etag)
+        return response
+    
+    return wrapper
@@ -0,0 +1,41 @@
+from flask import Blueprint, current_app, request, jsonify, url_for
+from app.jobs import PUBLIC_KINDS
+from app.services.job_service import JobService
+
+job_bp = Blueprint('jobs', __name__)
+
+@job_bp.route('/', methods=['POST'])
+def create_job():
+    """Queue a background job; poll its Location for status."""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not data.get('kind'):
+            return jsonify({'error': 'kind is required'}), 400
+        if data['kind'] not in PUBLIC_KINDS:
+            return jsonify({'error': f"Job kind must be one of: {', '.join(sorted(PUBLIC_KINDS))}"}), 400
+        payload = data.get('payload', {})
+        if not isinstance(payload, dict):
+            return jsonify({'error': 'payload must be an object'}), 400
+        
+        job = JobService.enqueue(data['kind'], payload, current_app.config['JOB_MAX_ATTEMPTS'])
+        response = jsonify(job.to_dict())
+        response.headers['Location'] = url_for('jobs.get_job', job_id=job.id)
+        return response, 202
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status, progress and result."""
+    try:
+        job = JobService.get_job(job_id)
+        if not job:
+            return jsonify({'error': f'Job with ID {job_id} not found'}), 404
+        
+        return jsonify(job.to_dict()), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,21 @@
+from flask import Blueprint, current_app, jsonify
+from app.services.stats_service import StatsService
+
+stats_bp = Blueprint('stats', __name__)
+
+@stats_bp.route('/', methods=['GET'])
+def get_stats():
+    """Get dashboard aggregates across all tasks and comments."""
+    try:
+        return jsonify(StatsService.get_stats()), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@stats_bp.route('/query-cache', methods=['GET'])
+def get_query_cache_stats():
+    """Get this process's SQLAlchemy compiled-cache hit rate (QUERY_CACHE_STATS=true)."""
+    stats = current_app.extensions.get('query_cache_stats')
+    if stats is None:
+        return jsonify({'error': 'Query cache statistics are disabled; set QUERY_CACHE_STATS=true'}), 404
+    return jsonify(stats.snapshot()), 200
@@ -1,23 +1,53 @@
 from flask import Blueprint, request, jsonify
 from app.services.task_service import TaskService
 from app.services.comment_service import CommentService
+from app.services.stats_service import StatsService
+from app.services.exceptions import ConflictError, PreconditionFailedError
+from app.routes.helpers import idempotent, if_match_versions, patched_response, versioned_response
 
 task_bp = Blueprint('tasks', __name__)
 
+INCLUDES = {'comments'}
+MAX_INCLUDED_COMMENTS = 50
+
+def _serialize_tasks(tasks):
+    """Serialize tasks, embedding relations requested with ?include=comments&comments_limit=N.
+    
+    Raises ValueError for unknown relations or a bad limit.
+    """
+    includes = {name.strip() for name in request.args.get('include', '').split(',') if name.strip()}
+    unknown = includes - INCLUDES
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(sorted(unknown))}")
+    
+    data = [task.to_dict() for task in tasks]
+    if 'comments' in includes:
+        limit = request.args.get('comments_limit', 3, type=int)
+        if not 1 <= limit <= MAX_INCLUDED_COMMENTS:
+            raise ValueError(f'comments_limit must be between 1 and {MAX_INCLUDED_COMMENTS}')
+        
+        latest = CommentService.get_latest_by_tasks([task.id for task in tasks], limit)
+        for item in data:
+            item['comments'] = [comment.to_dict() for comment in latest[item['id']]]
+    return data
+
 @task_bp.route('/', methods=['GET'])
 def get_tasks():
-    """Get all tasks."""
+    """Get all tasks, optionally with their latest comments (?include=comments)."""
     try:
         tasks = TaskService.get_all_tasks()
         return jsonify({
-            'tasks': [task.to_dict() for task in tasks],
+            'tasks': _serialize_tasks(tasks),
             'count': len(tasks)
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @task_bp.route('/', methods=['POST'])
+@idempotent
 def create_task():
     """Create a new task."""
     try:
@@ -25,11 +55,8 @@ def create_task():
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
         
-        if not data.get('title'):
-            return jsonify({'error': 'Title is required'}), 400
-        
         task = TaskService.create_task(data)
-        return jsonify(task.to_dict()), 201
+        return versioned_response(task, 201)
         
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -38,37 +65,73 @@ def create_task():
 
 @task_bp.route('/<int:task_id>', methods=['GET'])
 def get_task(task_id):
-    """Get a specific task by ID."""
+    """Get a specific task by ID, optionally with its latest comments (?include=comments)."""
     try:
         task = TaskService.get_task_by_id(task_id)
         if not task:
             return jsonify({'error': f'Task with ID {task_id} not found'}), 404
         
-        return jsonify(task.to_dict()), 200
+        if 'include' not in request.args:
+            return versioned_response(task)
+        
+        response = jsonify(_serialize_tasks([task])[0])
+        response.set_etag(str(task.version))
+        return response
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @task_bp.route('/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
-    """Update an existing task."""
+    """Update an existing task, honouring If-Match for optimistic concurrency."""
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data provided'}), 400
         
-        task = TaskService.update_task(task_id, data)
+        task = TaskService.update_task(task_id, data, expected_versions=if_match_versions())
         if not task:
             return jsonify({'error': f'Task with ID {task_id} not found'}), 404
         
-        return jsonify(task.to_dict()), 200
+        return versioned_response(task)
+        
+    except PreconditionFailedError as e:
+        return jsonify({'error': str(e)}), 412
+    except ConflictError as e:
+        return jsonify({'error': str(e)}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@task_bp.route('/<int:task_id>', methods=['PATCH'])
+def patch_task(task_id):
+    """Change only the fields that differ and report them; a no-op writes nothing."""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+        
+        result = TaskService.patch_task(task_id, data, expected_versions=if_match_versions())
+        if not result:
+            return jsonify({'error': f'Task with ID {task_id} not found'}), 404
+        
+        return patched_response(*result)
         
+    except PreconditionFailedError as e:
+        return jsonify({'error': str(e)}), 412
+    except ConflictError as e:
+        return jsonify({'error': str(e)}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @task_bp.route('/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
-    """Delete a task and all its comments."""
+    """Soft-delete a task and all its comments."""
     try:
         success = TaskService.delete_task(task_id)
         if not success:
@@ -79,6 +142,19 @@ def delete_task(task_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@task_bp.route('/<int:task_id>/restore', methods=['POST'])
+def restore_task(task_id):
+    """Restore a deleted task before it is purged."""
+    try:
+        task = TaskService.restore_task(task_id)
+        if not task:
+            return jsonify({'error': f'Deleted task with ID {task_id} not found'}), 404
+        
+        return versioned_response(task)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @task_bp.route('/<int:task_id>/comments', methods=['GET'])
 def get_task_comments(task_id):
     """Get all comments for a specific task."""
@@ -96,3 +172,16 @@ def get_task_comments(task_id):
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@task_bp.route('/<int:task_id>/stats', methods=['GET'])
+def get_task_stats(task_id):
+    """Get comment statistics for a task."""
+    try:
+        stats = StatsService.get_task_stats(task_id)
+        if stats is None:
+            return jsonify({'error': f'Task with ID {task_id} not found'}), 404
+        
+        return jsonify(stats), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,118 @@
+"""Read-replica routing for the Flask-SQLAlchemy session.
+
+Engines for the URIs in ``SQLALCHEMY_REPLICA_URIS`` are created at startup
+(with the same ``SQLALCHEMY_ENGINE_OPTIONS`` as the primary). They are kept
+out of ``SQLALCHEMY_BINDS`` on purpose: binds own a metadata of their own,
+whereas replicas serve the default metadata's tables. ``RoutingSession``
+sends queries issued while handling a GET/HEAD request to one replica and
+everything else to the primary, with two read-your-writes exceptions:
+
+* once a session has flushed anything, it stays on the primary;
+* a client that wrote within ``REPLICA_LAG_TOLERANCE`` seconds reads from the
+  primary, so it never sees a replica that has not caught up with its own
+  write. The time of its last write is kept in the signed Flask session
+  cookie and also returned in an ``X-Last-Write`` response header. Clients
+  that do not send cookies back, like the cross-origin React app, echo the
+  header on their next requests instead.
+
+Sessions serving a workspace with a database of its own (see
+``app.tenancy``) use that database for everything but the shared tables
+and never read from a replica.
+"""
+import random
+import time
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request, session as client_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+READ_METHODS = ('GET', 'HEAD')
+LAST_WRITE_KEY = '_last_write_at'
+LAST_WRITE_HEADER = 'X-Last-Write'
+# Kept in the primary database for every workspace: workers poll one job queue
+SHARED_TABLES = frozenset({'jobs'})
+
+
+class RoutingSession(Session):
+    """Session that routes request-scoped reads to a replica when it is safe."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # A session bound to a connection (e.g. joined to an outer test
+        # transaction) uses it for everything
+        if bind is None and self.bind is not None:
+            bind = self.bind
+        if bind is None:
+            engine = self._workspace_engine(mapper, clause) or self._replica_engine(mapper)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _workspace_engine(self, mapper, clause):
+        workspace = self.info.get('workspace_id')
+        engines = current_app.extensions.get('workspace_engines')
+        if workspace is None or not engines or workspace not in engines:
+            return None
+        table = sa.inspect(mapper).local_table if mapper is not None else getattr(clause, 'table', None)
+        if table is not None and table.name in SHARED_TABLES:
+            return None
+        return engines[workspace]
+
+    def _replica_engine(self, mapper):
+        if self._flushing or self.info.get('wrote') or not has_request_context():
+            return None
+        engines = current_app.extensions.get('replica_engines')
+        if not engines or request.method not in READ_METHODS:
+            return None
+        # Models with their own bind key are never replicated
+        if mapper is not None and sa.inspect(mapper).local_table.metadata.info.get('bind_key') is not None:
+            return None
+
+        # Decide once per session (i.e. per request) so all reads are consistent
+        engine = self.info.get('replica_engine')
+        if engine is None:
+            last_write = _client_last_write()
+            if last_write is not None and time.time() - last_write <= current_app.config['REPLICA_LAG_TOLERANCE']:
+                engine = False
+            else:
+                engine = random.choice(engines)
+            self.info['replica_engine'] = engine
+        return engine or None
+
+
+def _client_last_write():
+    """When the client last wrote, from its session cookie or the header it echoes."""
+    last_write = client_session.get(LAST_WRITE_KEY)
+    header = request.headers.get(LAST_WRITE_HEADER)
+    if header:
+        try:
+            last_write = max(last_write or 0.0, float(header))
+        except ValueError:
+            pass
+    return last_write
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _remember_write(session, flush_context):
+    session.info['wrote'] = True
+    if has_request_context() and current_app.extensions.get('replica_engines'):
+        g.last_write_at = client_session[LAST_WRITE_KEY] = time.time()
+
+
+def _expose_last_write(response):
+    last_write = g.pop('last_write_at', None)
+    if last_write is not None:
+        response.headers[LAST_WRITE_HEADER] = repr(last_write)
+    return response
+
+
+def init_replicas(app):
+    """Create an engine for every configured replica URI."""
+    app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [])
+    app.config.setdefault('REPLICA_LAG_TOLERANCE', 1.0)
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    app.extensions['replica_engines'] = [
+        sa.create_engine(uri, **options) for uri in app.config['SQLALCHEMY_REPLICA_URIS']
+    ]
+    if app.extensions['replica_engines']:
+        app.after_request(_expose_last_write)
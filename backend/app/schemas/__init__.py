@@ -0,0 +1,5 @@
+from .base import ValidationError
+from .task import TaskSchema
+from .comment import CommentSchema, CommentUpdateSchema
+
+__all__ = ['ValidationError', 'TaskSchema', 'CommentSchema', 'CommentUpdateSchema']
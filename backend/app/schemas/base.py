@@ -0,0 +1,184 @@
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_MISSING = object()
+
+class ValidationError(ValueError):
+    """Raised when a request body fails schema validation.
+    
+    ``errors`` maps each offending field to its message; ``str(error)`` joins
+    all messages so existing ``except ValueError`` handlers keep working.
+    """
+    
+    def __init__(self, errors: Dict[Any, str]):
+        self.errors = errors
+        super().__init__("; ".join(str(message) for message in errors.values()))
+
+class Field:
+    """Declarative description of one request field.
+    
+    ``compile`` turns the declaration into a single closure once, when the
+    schema class is created, so validating a request does no per-call setup.
+    Only ``nullable`` fields accept an explicit ``null`` (or a blank string);
+    any other optional field must be left out or hold a valid value.
+    """
+    
+    def __init__(self, label: str, required: bool = False, nullable: bool = False,
+                 required_message: Optional[str] = None, empty_message: Optional[str] = None):
+        self.label = label
+        self.required = required
+        self.nullable = nullable
+        self.required_message = required_message or f"{label} is required"
+        self.empty_message = empty_message or f"{label} cannot be empty"
+    
+    def check(self) -> Optional[Callable[[Any], Optional[str]]]:
+        """Return the type-specific check, which yields an error message or None."""
+        return None
+    
+    def compile(self, partial: bool) -> Callable[[Any], Optional[str]]:
+        check = self.check()
+        required = self.required and not partial
+        missing_message = self.required_message if required else None
+        # Required fields treat blank values as missing on create, and as
+        # "cannot be empty" when they are explicitly sent in an update
+        blank_message = self.required_message if required else (self.empty_message if self.required else None)
+        blank_allowed = self.required or self.nullable
+        null_message = blank_message if blank_allowed else f"{self.label} cannot be null"
+        
+        def validate(value):
+            if value is _MISSING:
+                return missing_message
+            if value is None:
+                return null_message
+            if value == '' and blank_allowed:
+                return blank_message
+            return check(value) if check is not None else None
+        
+        return validate
+
+class String(Field):
+    def __init__(self, label: str, max_length: Optional[int] = None, pattern: Optional[str] = None,
+                 pattern_message: Optional[str] = None, **kwargs):
+        super().__init__(label, **kwargs)
+        self.max_length = max_length
+        self.pattern = re.compile(pattern) if pattern else None
+        self.pattern_message = pattern_message or f"Invalid {label.lower()} format"
+    
+    def check(self):
+        type_message = f"{self.label} must be a string"
+        max_length = self.max_length if self.max_length is not None else float('inf')
+        length_message = f"{self.label} must be at most {self.max_length} characters"
+        match = self.pattern.match if self.pattern is not None else None
+        pattern_message = self.pattern_message
+        
+        def check(value):
+            if type(value) is not str:
+                return type_message
+            if len(value) > max_length:
+                return length_message
+            if match is not None and match(value) is None:
+                return pattern_message
+            return None
+        
+        return check
+
+class Integer(Field):
+    def __init__(self, label: str, minimum: Optional[int] = None, **kwargs):
+        super().__init__(label, **kwargs)
+        self.minimum = minimum
+    
+    def check(self):
+        type_message = f"{self.label} must be an integer"
+        minimum = self.minimum if self.minimum is not None else float('-inf')
+        minimum_message = f"{self.label} must be at least {self.minimum}"
+        
+        def check(value):
+            # Exact type test: bool is an int subclass but never a valid id
+            if type(value) is not int:
+                return type_message
+            if value < minimum:
+                return minimum_message
+            return None
+        
+        return check
+
+class Choice(Field):
+    def __init__(self, label: str, choices: Iterable[str], **kwargs):
+        super().__init__(label, **kwargs)
+        self.choices = tuple(choices)
+    
+    def check(self):
+        allowed = frozenset(self.choices)
+        message = f"{self.label} must be one of: {', '.join(self.choices)}"
+        
+        def check(value):
+            return None if isinstance(value, str) and value in allowed else message
+        
+        return check
+
+class Schema:
+    """Base class for request body schemas.
+    
+    Subclasses declare ``Field`` attributes. Validators for full and partial
+    (update) payloads are compiled when the subclass is defined, and a call to
+    ``validate`` checks every field in one pass, collecting all errors.
+    """
+    
+    update_requires_field = True
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            fields.update({name: value for name, value in vars(klass).items() if isinstance(value, Field)})
+        cls.fields = fields
+        cls._validators = {
+            partial: tuple((name, field.compile(partial)) for name, field in fields.items())
+            for partial in (False, True)
+        }
+    
+    @classmethod
+    def _run(cls, data: Any, partial: bool) -> Tuple[dict, Dict[str, str]]:
+        """Check every field in one pass, returning ``(cleaned, errors)``."""
+        if not isinstance(data, dict):
+            return {}, {'_schema': "Request body must be a JSON object"}
+        
+        cleaned, errors = {}, {}
+        for name, validate in cls._validators[partial]:
+            value = data.get(name, _MISSING)
+            message = validate(value)
+            if message is not None:
+                errors[name] = message
+            elif value is not _MISSING:
+                cleaned[name] = value
+        
+        if partial and cls.update_requires_field and not cleaned and not errors:
+            errors['_schema'] = "At least one field must be provided for update"
+        return cleaned, errors
+    
+    @classmethod
+    def errors(cls, data: Any, partial: bool = False) -> Dict[str, str]:
+        """Return ``{field: message}`` for every invalid field."""
+        return cls._run(data, partial)[1]
+    
+    @classmethod
+    def validate(cls, data: Any, partial: bool = False) -> dict:
+        """Validate ``data`` and return the known fields, or raise ``ValidationError``."""
+        cleaned, errors = cls._run(data, partial)
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
+    
+    @classmethod
+    def validate_many(cls, items: Iterable[Any], partial: bool = False) -> List[dict]:
+        """Validate a batch (e.g. a bulk endpoint body); errors are keyed by item index."""
+        cleaned_items, errors = [], {}
+        for index, item in enumerate(items):
+            cleaned, item_errors = cls._run(item, partial)
+            if item_errors:
+                errors[index] = f"Item {index}: " + "; ".join(item_errors.values())
+            else:
+                cleaned_items.append(cleaned)
+        if errors:
+            raise ValidationError(errors)
+        return cleaned_items
@@ -0,0 +1,20 @@
+from app.schemas.base import Integer, Schema, String
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+class CommentSchema(Schema):
+    """Request body for creating a comment."""
+    
+    content = String('Content', required=True)
+    author_name = String('Author name', required=True, max_length=100)
+    author_email = String('Author email', nullable=True, max_length=120, pattern=EMAIL_PATTERN,
+                          pattern_message="Invalid email format")
+    task_id = Integer('Task ID', required=True, minimum=1)
+    parent_id = Integer('Parent ID', minimum=1)
+
+class CommentUpdateSchema(Schema):
+    """Request body for updating a comment; task and parent cannot change."""
+    
+    content = CommentSchema.content
+    author_name = CommentSchema.author_name
+    author_email = CommentSchema.author_email
@@ -0,0 +1,12 @@
+from app.schemas.base import Choice, Schema, String
+
+TASK_STATUSES = ('pending', 'in_progress', 'completed')
+TASK_PRIORITIES = ('low', 'medium', 'high')
+
+class TaskSchema(Schema):
+    """Request body for creating or updating a task."""
+    
+    title = String('Title', required=True, max_length=200)
+    description = String('Description', nullable=True)
+    status = Choice('Status', TASK_STATUSES)
+    priority = Choice('Priority', TASK_PRIORITIES)
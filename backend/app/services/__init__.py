@@ -1,4 +1,7 @@
+from .activity_service import ActivityService
+from .change_service import ChangeService
 from .comment_service import CommentService
+from .stats_service import StatsService
 from .task_service import TaskService
 
-__all__ = ['CommentService', 'TaskService']
+__all__ = ['ActivityService', 'ChangeService', 'CommentService', 'StatsService', 'TaskService']
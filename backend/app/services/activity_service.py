@@ -0,0 +1,32 @@
+from typing import List, Optional
+from app import db
+from app.models.event import Event
+
+class ActivityService:
+    """Service layer for the append-only activity feed."""
+    
+    @staticmethod
+    def record(action: str, entity) -> Event:
+        """Add an event for a flushed task or comment to the current transaction.
+        
+        Nothing is written until the caller commits, so the event and the
+        change it describes are committed (or rolled back) together.
+        """
+        event = Event.for_entity(action, entity)
+        db.session.add(event)
+        return event
+    
+    @staticmethod
+    def get_activity(before: Optional[int] = None, task_id: Optional[int] = None, limit: int = 50) -> List[Event]:
+        """Get events newest first; ``before`` is the id of the last event on the previous page.
+        
+        Event ids grow with insertion, so this is a backwards scan of the
+        primary key (or of the (task_id, id) index) that stops after
+        ``limit`` rows, however long the history is.
+        """
+        query = Event.query
+        if task_id is not None:
+            query = query.filter(Event.task_id == task_id)
+        if before is not None:
+            query = query.filter(Event.id < before)
+        return query.order_by(Event.id.desc()).limit(limit).all()
@@ -0,0 +1,88 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from sqlalchemy import bindparam, literal, select
+from app import db
+from app.models.archived_comment import ArchivedComment
+from app.models.comment import Comment
+from app.models.task import Task
+
+ARCHIVED_COMMENTS_BY_TASK = select(ArchivedComment).where(
+    ArchivedComment.task_id == bindparam('task_id'),
+    ArchivedComment.deleted_at.is_(None)
+).order_by(ArchivedComment.created_at.desc())
+
+class ArchiveService:
+    """Service layer that moves comments of long-completed tasks to cold storage.
+    
+    A task qualifies once it is completed and has not changed for the
+    archival age. Its comments are copied to ``comments_archive`` and
+    deleted from ``comments`` in batches of ``batch_size`` ids, each in its
+    own transaction, so the hot table and its indexes only hold comments
+    that are still being read and written.
+    """
+    
+    @staticmethod
+    def archive_completed(age: timedelta, batch_size: int = 1000, max_batches: Optional[int] = None,
+                          on_batch: Optional[Callable[[int], None]] = None) -> dict:
+        """Archive every comment of tasks completed more than ``age`` ago.
+        
+        ``on_batch`` is called after every committed batch with the number
+        of comments archived so far (jobs report it as progress).
+        """
+        cutoff = datetime.utcnow() - age
+        archived = {'comments': 0, 'tasks': 0}
+        batches = 0
+        
+        stale_tasks = db.session.query(Task.id).filter(
+            Task.status == 'completed',
+            Task.updated_at <= cutoff,
+            Task.deleted_at.is_(None)
+        )
+        # Soft-deleted comments move too, so no reply is left pointing at an
+        # archived parent. Newest ids first: replies go before their parents.
+        candidates = db.session.query(Comment.id, Comment.task_id, Comment.deleted_at) \
+            .filter(Comment.task_id.in_(stale_tasks.scalar_subquery())) \
+            .order_by(Comment.id.desc())
+        
+        columns = [column.name for column in Comment.__table__.columns]
+        archive = ArchivedComment.__table__
+        tasks = Task.__table__
+        touched = set()
+        
+        while max_batches is None or batches < max_batches:
+            rows = candidates.limit(batch_size).all()
+            if not rows:
+                break
+            
+            ids = [row.id for row in rows]
+            db.session.execute(archive.insert().from_select(
+                columns + ['archived_at'],
+                select(*[Comment.__table__.c[name] for name in columns], literal(datetime.utcnow()))
+                .where(Comment.id.in_(ids))
+            ))
+            Comment.query.filter(Comment.id.in_(ids)).delete(synchronize_session=False)
+            
+            # Keep comments_count whole without touching updated_at or version,
+            # so archival is invisible to ETags and the change feed
+            visible = Counter(row.task_id for row in rows if row.deleted_at is None)
+            for task_id, count in visible.items():
+                db.session.execute(tasks.update().where(tasks.c.id == task_id).values(
+                    archived_comments_count=tasks.c.archived_comments_count + count,
+                    updated_at=tasks.c.updated_at
+                ))
+            db.session.commit()
+            
+            archived['comments'] += len(ids)
+            touched.update(row.task_id for row in rows)
+            batches += 1
+            if on_batch is not None:
+                on_batch(archived['comments'])
+        
+        archived['tasks'] = len(touched)
+        return archived
+    
+    @staticmethod
+    def get_archived_comments(task_id: int) -> List[ArchivedComment]:
+        """Get a task's visible archived comments, newest first."""
+        return db.session.execute(ARCHIVED_COMMENTS_BY_TASK, {'task_id': task_id}).scalars().all()
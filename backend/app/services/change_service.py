@@ -0,0 +1,122 @@
+import base64
+import binascii
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, or_
+from app.models.comment import Comment
+from app.models.task import Task
+from app.services.task_service import with_comments_count
+
+class ChangeCursor(NamedTuple):
+    """Position in the change feed: the last change a client has seen.
+    
+    ``synced_at`` is the time up to which the client has seen every change.
+    It is what ages a cursor, because a quiet feed keeps handing back the
+    same position. Cursors without it (older tokens) fall back to
+    ``updated_at``.
+    """
+    updated_at: datetime
+    kind: int  # index into ChangeService.SOURCES, breaks ties between tables
+    id: int
+    synced_at: Optional[datetime] = None
+    
+    def encode(self) -> str:
+        synced_at = self.synced_at or self.updated_at
+        raw = f'{self.updated_at.isoformat()}|{self.kind}|{self.id}|{synced_at.isoformat()}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+    
+    @classmethod
+    def decode(cls, token: str) -> 'ChangeCursor':
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+            parts = raw.split('|')
+            if len(parts) == 3:
+                parts.append(parts[0])
+            updated_at, kind, id, synced_at = parts
+            cursor = cls(datetime.fromisoformat(updated_at), int(kind), int(id), datetime.fromisoformat(synced_at))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f'Invalid change cursor {token!r}') from e
+        if not 0 <= cursor.kind < len(ChangeService.SOURCES):
+            raise ValueError(f'Invalid change cursor {token!r}')
+        return cursor
+
+class ChangeService:
+    """Service layer for the incremental change feed.
+    
+    Every insert, update, soft delete and restore bumps a row's
+    ``updated_at``, so the rows changed since a cursor are an index range
+    scan on ``(updated_at, id)`` per table. Ties on ``updated_at`` are
+    ordered by table and then id, which makes the merged order total and the
+    cursor strictly monotonic. Deleted rows come back as tombstones until
+    ``PurgeService`` removes them. A client that was last caught up longer
+    ago than the purge grace period must do a full sync. Comments of a deleted task are
+    not reported individually: the task's tombstone covers them. Restoring
+    the task re-stamps its visible comments, so they are sent again after it.
+    
+    ``updated_at`` is stamped at flush time, not commit time, so a
+    transaction that commits after a later-stamped one could land behind a
+    cursor that has already moved past it. The feed therefore only reads up
+    to ``lag`` before now, and a cursor is never marked synced past that
+    point: a write that commits within ``lag`` of being stamped (and a
+    clock that is at most ``lag`` ahead) is always seen. The lag must
+    exceed the longest write transaction.
+    """
+    
+    SOURCES = (('task', Task), ('comment', Comment))
+    
+    @staticmethod
+    def get_changes(since: Optional[ChangeCursor] = None, limit: int = 100,
+                    lag: timedelta = timedelta(0)) -> Tuple[List[dict], Optional[ChangeCursor]]:
+        """Get up to ``limit`` changes after ``since`` and older than ``lag``, oldest first.
+        
+        Returns the changes and the cursor of the last one, or the position of
+        ``since`` when there is nothing new. More changes may follow when
+        ``limit`` are returned. A page that reaches the end of the feed stamps
+        the cursor's ``synced_at`` with the horizon it was read up to.
+        """
+        horizon = datetime.utcnow() - lag
+        rows = []
+        for kind, (name, model) in enumerate(ChangeService.SOURCES):
+            query = with_comments_count(model.query) if model is Task else model.query
+            query = query.filter(model.updated_at <= horizon)
+            if since is not None:
+                query = query.filter(ChangeService._after(model, kind, since))
+            for row in query.order_by(model.updated_at, model.id).limit(limit).all():
+                rows.append((ChangeCursor(row.updated_at, kind, row.id), name, row))
+        
+        rows.sort(key=lambda item: item[0])
+        rows = rows[:limit]
+        changes = [ChangeService._change(cursor, name, row) for cursor, name, row in rows]
+        
+        cursor = rows[-1][0] if rows else since
+        if cursor is None:
+            return changes, None
+        if len(rows) < limit:
+            synced_at = horizon
+        else:
+            # Caught up to the last change on this page, or to the previous sync
+            synced_at = max(cursor.updated_at, since.synced_at or since.updated_at) if since else cursor.updated_at
+        return changes, cursor._replace(synced_at=synced_at)
+    
+    @staticmethod
+    def _after(model, kind: int, since: ChangeCursor):
+        """Rows of ``model`` that sort after ``since`` in (updated_at, kind, id) order."""
+        if kind > since.kind:
+            return model.updated_at >= since.updated_at
+        if kind < since.kind:
+            return model.updated_at > since.updated_at
+        return or_(
+            model.updated_at > since.updated_at,
+            and_(model.updated_at == since.updated_at, model.id > since.id)
+        )
+    
+    @staticmethod
+    def _change(cursor: ChangeCursor, name: str, row) -> dict:
+        deleted = row.deleted_at is not None
+        return {
+            'type': name,
+            'id': row.id,
+            'deleted': deleted,
+            'updated_at': row.updated_at.isoformat(),
+            'data': None if deleted else row.to_dict()
+        }
@@ -1,90 +1,247 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from flask import current_app
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from app import db
+from app.models.archived_comment import ArchivedComment
 from app.models.comment import Comment
 from app.models.task import Task
+from app.schemas import CommentSchema, CommentUpdateSchema
+from app.services.activity_service import ActivityService
+from app.services.archive_service import ArchiveService
+from app.services.exceptions import ConflictError, PreconditionFailedError
+from app.services.revision_service import RevisionService
+from app.services.task_service import active_tasks
+
+def visible_comments():
+    """Query for comments that are not soft-deleted and whose task is not either."""
+    return Comment.query.join(Task, Comment.task_id == Task.id).filter(
+        Comment.deleted_at.is_(None),
+        Task.deleted_at.is_(None)
+    )
+
+# Hot lookups are built once with bound parameters (see task_service)
+VISIBLE_COMMENTS = select(Comment).join(Task, Comment.task_id == Task.id).where(
+    Comment.deleted_at.is_(None),
+    Task.deleted_at.is_(None)
+)
+COMMENTS_BY_TASK = VISIBLE_COMMENTS.where(Comment.task_id == bindparam('task_id')) \
+    .order_by(Comment.created_at.desc())
+COMMENT_BY_ID = VISIBLE_COMMENTS.where(Comment.id == bindparam('comment_id'))
+
+# ROW_NUMBER() ranks each task's comments newest first; the outer query keeps the top ``limit``
+_rank = func.row_number().over(
+    partition_by=Comment.task_id,
+    order_by=(Comment.created_at.desc(), Comment.id.desc())
+).label('rank')
+_ranked = select(Comment, _rank).where(
+    Comment.task_id.in_(bindparam('task_ids', expanding=True)),
+    Comment.deleted_at.is_(None)
+).subquery()
+_ranked_comment = aliased(Comment, _ranked)
+LATEST_COMMENTS_BY_TASKS = select(_ranked_comment).where(_ranked.c.rank <= bindparam('limit')) \
+    .order_by(_ranked.c.task_id, _ranked.c.rank)
 
 class CommentService:
     """Service layer for comment business logic."""
     
+    PATCHABLE_FIELDS = ('content', 'author_name', 'author_email')
+    
     @staticmethod
-    def get_comments_by_task(task_id: int) -> List[Comment]:
-        """Get all comments for a specific task."""
-        return Comment.query.filter_by(task_id=task_id).order_by(Comment.created_at.desc()).all()
+    def get_comments_by_task(task_id: int) -> List[Union[Comment, ArchivedComment]]:
+        """Get all comments for a specific task, newest first.
+        
+        Comments moved to cold storage by ``ArchiveService`` are merged in.
+        The archive is only queried for tasks that have archived comments;
+        callers have usually loaded the task already, so checking costs no
+        extra query.
+        """
+        comments = db.session.execute(COMMENTS_BY_TASK, {'task_id': task_id}).scalars().all()
+        
+        task = db.session.get(Task, task_id)
+        if task is None or task.deleted_at is not None or not task.archived_comments_count:
+            return comments
+        
+        archived = ArchiveService.get_archived_comments(task_id)
+        return sorted(comments + archived, key=lambda comment: comment.created_at, reverse=True)
+    
+    @staticmethod
+    def get_latest_by_tasks(task_ids: Iterable[int], limit: int) -> Dict[int, List[Comment]]:
+        """Get the newest ``limit`` visible comments of each task, in one query.
+        
+        A page of tasks costs one round trip however many tasks it holds.
+        Callers pass visible tasks.
+        """
+        task_ids = list(task_ids)
+        latest = {task_id: [] for task_id in task_ids}
+        if not task_ids:
+            return latest
+        
+        comments = db.session.execute(LATEST_COMMENTS_BY_TASKS, {'task_ids': task_ids, 'limit': limit}).scalars()
+        for comment in comments:
+            latest[comment.task_id].append(comment)
+        return latest
     
     @staticmethod
     def get_comment_by_id(comment_id: int) -> Optional[Comment]:
         """Get a specific comment by ID."""
-        return Comment.query.get(comment_id)
+        return db.session.execute(COMMENT_BY_ID, {'comment_id': comment_id}).scalars().first()
+    
+    @staticmethod
+    def get_thread(task_id: int, root: Optional[Comment] = None, max_depth: Optional[int] = None,
+                   after: Optional[str] = None, limit: int = 50) -> List[Comment]:
+        """Get a task's comment thread, or the subtree under ``root``, in display order.
+        
+        The whole result is one range scan over the (task_id, path) index:
+        a subtree is every path starting with the root's path, and ordering
+        by path yields depth-first order with replies oldest first.
+        ``max_depth`` is relative to the root; ``after`` is the path of the
+        last comment on the previous page.
+        """
+        query = visible_comments().filter(Comment.task_id == task_id)
+        
+        base_depth = 0
+        if root is not None:
+            # '~' sorts after digits and '.', so this bounds the path prefix
+            query = query.filter(Comment.path >= root.path, Comment.path < root.path + '~')
+            base_depth = root.depth
+        if max_depth is not None:
+            query = query.filter(Comment.depth <= base_depth + max_depth)
+        if after:
+            query = query.filter(Comment.path > after)
+        
+        return query.order_by(Comment.path).limit(limit).all()
     
     @staticmethod
     def create_comment(data: dict) -> Comment:
         """Create a new comment."""
+        data = CommentSchema.validate(data)
+        
         # Validate task exists
-        task = Task.query.get(data.get('task_id'))
+        task = active_tasks().filter(Task.id == data['task_id']).first()
         if not task:
-            raise ValueError(f"Task with ID {data.get('task_id')} not found")
-        
-        # Validate required fields
-        if not data.get('content') or not data.get('author_name'):
-            raise ValueError("Content and author_name are required")
+            raise ValueError(f"Task with ID {data['task_id']} not found")
         
         comment = Comment.from_dict(data)
+        # Set here rather than at flush: the group-commit writer's session serves no workspace
+        comment.workspace_id = task.workspace_id
+        
+        if comment.parent_id is not None:
+            parent = CommentService.get_comment_by_id(comment.parent_id)
+            if not parent or parent.task_id != task.id:
+                raise ValueError(f"Parent comment with ID {comment.parent_id} not found on task {task.id}")
+            if parent.depth >= Comment.MAX_DEPTH:
+                raise ValueError(f"Replies cannot be nested more than {Comment.MAX_DEPTH} levels deep")
+            # The insert hook appends the new id to the parent's path
+            comment.path = parent.path
+            comment.depth = parent.depth + 1
+        
+        # Group-commit mode: the background writer batches concurrent inserts
+        writer = current_app.extensions.get('comment_writer')
+        if writer is not None:
+            return writer.write(comment)
+        
         db.session.add(comment)
+        db.session.flush()
+        ActivityService.record('created', comment)
         db.session.commit()
         return comment
     
     @staticmethod
-    def update_comment(comment_id: int, data: dict) -> Optional[Comment]:
-        """Update an existing comment."""
-        comment = Comment.query.get(comment_id)
+    def update_comment(comment_id: int, data: dict, expected_versions: Optional[Iterable[int]] = None) -> Optional[Comment]:
+        """Update an existing comment.
+        
+        ``expected_versions`` comes from the client's If-Match header; the
+        update is rejected if the stored version is not one of them.
+        """
+        result = CommentService._apply(comment_id, data, expected_versions, always_write=True)
+        return result and result[0]
+    
+    @staticmethod
+    def patch_comment(comment_id: int, data: dict,
+                      expected_versions: Optional[Iterable[int]] = None) -> Optional[Tuple[Comment, List[str]]]:
+        """Apply only the fields whose values differ; return the comment and the changed fields.
+        
+        Unlike ``update_comment``, ``updated_at`` only moves when something
+        changed, and a no-op costs no UPDATE, event or commit.
+        """
+        return CommentService._apply(comment_id, data, expected_versions)
+    
+    @staticmethod
+    def _apply(comment_id: int, data: dict, expected_versions: Optional[Iterable[int]],
+               always_write: bool = False) -> Optional[Tuple[Comment, List[str]]]:
+        """Validate ``data`` and write the fields that differ, shared by PUT and PATCH.
+        
+        ``always_write`` touches ``updated_at``, records the update event and
+        commits even when no field changed, as PUT always has.
+        """
+        data = CommentUpdateSchema.validate(data, partial=True)
+        
+        comment = CommentService.get_comment_by_id(comment_id)
         if not comment:
             return None
         
-        # Validate content if provided
-        if 'content' in data and not data['content']:
-            raise ValueError("Content cannot be empty")
+        if expected_versions is not None and comment.version not in expected_versions:
+            raise PreconditionFailedError(f"Comment {comment_id} has been modified (current version {comment.version})")
         
-        comment.update_from_dict(data)
-        db.session.commit()
-        return comment
+        changed = [field for field in CommentService.PATCHABLE_FIELDS
+                   if field in data and getattr(comment, field) != data[field]]
+        if not changed and not always_write:
+            return comment, changed
+        
+        old_content = comment.content
+        for field in changed:
+            setattr(comment, field, data[field])
+        comment.updated_at = datetime.utcnow()
+        if 'content' in changed:
+            RevisionService.record_edit(comment, old_content)
+        ActivityService.record('updated', comment)
+        
+        try:
+            db.session.commit()
+        except (StaleDataError, IntegrityError):
+            # A concurrent edit bumped the version or took the next revision number
+            db.session.rollback()
+            raise ConflictError(f"Comment {comment_id} was modified by another request")
+        return comment, changed
     
     @staticmethod
     def delete_comment(comment_id: int) -> bool:
-        """Delete a comment."""
-        comment = Comment.query.get(comment_id)
+        """Soft-delete a comment; ``PurgeService`` removes it later."""
+        comment = CommentService.get_comment_by_id(comment_id)
         if not comment:
             return False
         
-        db.session.delete(comment)
+        comment.deleted_at = datetime.utcnow()
+        ActivityService.record('deleted', comment)
         db.session.commit()
         return True
     
+    @staticmethod
+    def restore_comment(comment_id: int) -> Optional[Comment]:
+        """Restore a soft-deleted comment that has not been purged yet."""
+        comment = Comment.query.filter(Comment.id == comment_id, Comment.deleted_at.isnot(None)).first()
+        if not comment:
+            return None
+        
+        if comment.task.deleted_at is not None:
+            raise ValueError(f"Task with ID {comment.task_id} is deleted; restore the task first")
+        
+        comment.deleted_at = None
+        ActivityService.record('restored', comment)
+        db.session.commit()
+        return comment
+    
     @staticmethod
     def validate_comment_data(data: dict, is_update: bool = False) -> dict:
-        """Validate comment data and return cleaned data."""
-        errors = []
-        
-        if not is_update:
-            # Required fields for creation
-            if not data.get('content'):
-                errors.append("Content is required")
-            if not data.get('author_name'):
-                errors.append("Author name is required")
-            if not data.get('task_id'):
-                errors.append("Task ID is required")
-        else:
-            # For updates, at least one field should be provided
-            if not any(key in data for key in ['content', 'author_name', 'author_email']):
-                errors.append("At least one field must be provided for update")
-        
-        # Validate email format if provided
-        if data.get('author_email'):
-            import re
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, data['author_email']):
-                errors.append("Invalid email format")
-        
-        if errors:
-            raise ValueError("; ".join(errors))
-        
-        return data
+        """Validate comment data and return cleaned data.
+        
+        Kept for callers that validate ahead of time; the create and update
+        methods run the same compiled schema themselves.
+        """
+        if is_update:
+            return CommentUpdateSchema.validate(data, partial=True)
+        return CommentSchema.validate(data)
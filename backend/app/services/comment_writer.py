@@ -0,0 +1,166 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Tuple
+from sqlalchemy.orm import Session
+from app import db
+from app.models.comment import Comment
+from app.models.event import Event
+from app.tenancy import workspace_engine
+
+_STOP = object()
+
+class CommentBatchWriter:
+    """Background writer that group-commits comment inserts.
+
+    Requests hand their ``Comment`` to ``submit`` and block on the returned
+    future. The writer thread collects everything that arrives within
+    ``window_ms`` (up to ``max_batch`` comments) and inserts it in a single
+    transaction, so a burst of comments on one task costs one fsync instead
+    of one per request.
+
+    Durability: a future only resolves after ``COMMIT`` has returned, so a
+    request that got its comment back has the same durability guarantee as
+    the per-request path. Comments still waiting in the queue when the
+    process dies are lost, but their requests never received a success
+    response. If a batch fails to commit, its comments are retried one per
+    transaction so each request gets its own success or failure. A request
+    that gives up waiting (``timeout``) has an ambiguous outcome: its insert
+    may still be committed afterwards.
+
+    Comments of workspaces with a database of their own are committed
+    there, one transaction per database in each batch.
+    """
+
+    def __init__(self, app, window_ms: float = 5, max_batch: int = 100, timeout: float = 10):
+        self.app = app
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.batches_committed = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread if it is not already running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='comment-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Flush queued comments and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, comment: Comment) -> Future:
+        """Queue a transient comment for insertion and return its future."""
+        if self._thread is None:
+            self.start()
+        future = Future()
+        self._queue.put((comment, future))
+        return future
+
+    def write(self, comment: Comment) -> Comment:
+        """Queue a comment and wait until it has been committed."""
+        return self.submit(comment).result(timeout=self.timeout)
+
+    def _collect(self) -> Tuple[List, bool]:
+        """Block for the first item, then gather more until the window closes."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        with self.app.app_context():
+            stopping = False
+            while not stopping:
+                batch, stopping = self._collect()
+                if batch:
+                    self._write_batch(batch)
+
+            # Drain anything that raced with the stop request
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    self._write_batch([item])
+
+    def _write_batch(self, batch: List):
+        """Insert a batch, one transaction per database, isolating failures if one aborts."""
+        groups = {}
+        for comment, future in batch:
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(self._engine_for(comment), []).append((comment, future))
+        for engine, live in groups.items():
+            self._write_group(engine, live)
+
+    @staticmethod
+    def _engine_for(comment: Comment):
+        return workspace_engine(comment.workspace_id) or db.engine
+
+    def _write_group(self, engine, live: List):
+        # expire_on_commit=False keeps the attributes loaded so callers can
+        # serialize the returned comments without another SELECT
+        session = Session(bind=engine, expire_on_commit=False)
+        try:
+            session.add_all([comment for comment, _ in live])
+            session.flush()
+            session.add_all([Event.for_entity('created', comment) for comment, _ in live])
+            session.commit()
+        except Exception:
+            session.rollback()
+            failed = True
+        else:
+            failed = False
+        finally:
+            session.close()
+
+        if failed:
+            self._write_individually(engine, live)
+            return
+
+        self.batches_committed += 1
+        for comment, future in live:
+            future.set_result(comment)
+
+    def _write_individually(self, engine, items: List):
+        for comment, future in items:
+            # A rolled-back flush leaves the generated key behind
+            comment.id = None
+            session = Session(bind=engine, expire_on_commit=False)
+            try:
+                session.add(comment)
+                session.flush()
+                session.add(Event.for_entity('created', comment))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(comment)
+            finally:
+                session.close()
@@ -0,0 +1,11 @@
+class ConcurrencyError(Exception):
+    """Base class for optimistic concurrency failures."""
+
+class PreconditionFailedError(ConcurrencyError):
+    """Raised when the client's If-Match version is no longer current."""
+
+class ConflictError(ConcurrencyError):
+    """Raised when a concurrent write changed the row between read and update."""
+
+class LeaseLostError(ConcurrencyError):
+    """Raised when a job's attempt was claimed again after its lease ran out."""
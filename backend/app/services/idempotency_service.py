@@ -0,0 +1,108 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.idempotency_key import IdempotencyKey
+
+class IdempotencyService:
+    """Service layer that records POST outcomes so retries can be replayed.
+    
+    ``begin`` claims a key by inserting a placeholder row; a duplicate
+    insert fails on the primary key, so two concurrent retries can never
+    both run the operation. The claim holds the key until ``locked_until``:
+    if the process dies before ``complete``, a retry with the same body
+    takes the key over once that passes instead of getting 409 until the
+    key expires. ``complete`` stores the response, and ``abandon`` releases
+    the key when the operation failed in a way the client should retry;
+    both only touch the row while the claim is still theirs.
+    """
+    
+    CLAIM_ATTEMPTS = 3
+    
+    @staticmethod
+    def digest(*parts: str) -> str:
+        return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+    
+    @staticmethod
+    def begin(key_hash: str, request_hash: str, ttl: timedelta,
+              lock: timedelta) -> Tuple[Optional[IdempotencyKey], bool]:
+        """Claim ``key_hash``; return its row and whether this call claimed it.
+        
+        The row is returned detached, as it was when read or claimed. It is
+        None if the claim lost every race for the key, which callers treat
+        like a request still in progress.
+        """
+        keys = IdempotencyKey.__table__
+        for _ in range(IdempotencyService.CLAIM_ATTEMPTS):
+            now = datetime.utcnow()
+            claim = {'request_hash': request_hash, 'status_code': None, 'body': None, 'etag': None,
+                     'locked_until': now + lock, 'expires_at': now + ttl}
+            record = db.session.get(IdempotencyKey, key_hash, populate_existing=True)
+            if record is None:
+                db.session.add(IdempotencyKey(key_hash=key_hash, **claim))
+                try:
+                    db.session.commit()
+                except IntegrityError:
+                    # A concurrent request claimed the key first
+                    db.session.rollback()
+                    continue
+            elif record.expires_at <= now or (record.status_code is None and record.locked_until <= now
+                                              and record.request_hash == request_hash):
+                # Expired, or claimed by a request that never finished: take it over
+                # unless a concurrent retry got there first
+                result = db.session.execute(keys.update().where(
+                    keys.c.key_hash == key_hash,
+                    keys.c.expires_at == record.expires_at,
+                    keys.c.locked_until == record.locked_until
+                ).values(**claim))
+                db.session.commit()
+                if not result.rowcount:
+                    continue
+            else:
+                db.session.expunge(record)
+                return record, False
+            
+            record = db.session.get(IdempotencyKey, key_hash, populate_existing=True)
+            db.session.expunge(record)
+            return record, True
+        return None, False
+    
+    @staticmethod
+    def _claimed(record: IdempotencyKey):
+        """Conditions that hold while ``record``'s claim is still the current one."""
+        keys = IdempotencyKey.__table__
+        return (keys.c.key_hash == record.key_hash,
+                keys.c.status_code.is_(None),
+                keys.c.locked_until == record.locked_until)
+    
+    @staticmethod
+    def complete(record: IdempotencyKey, status_code: int, body: str, etag: Optional[str]) -> bool:
+        """Store the response for replay; False if a retry took the key over meanwhile."""
+        keys = IdempotencyKey.__table__
+        result = db.session.execute(keys.update().where(*IdempotencyService._claimed(record)).values(
+            status_code=status_code, body=body, etag=etag
+        ))
+        db.session.commit()
+        return result.rowcount > 0
+    
+    @staticmethod
+    def abandon(record: IdempotencyKey):
+        """Release a claimed key so the client can retry the operation."""
+        db.session.rollback()
+        keys = IdempotencyKey.__table__
+        db.session.execute(keys.delete().where(*IdempotencyService._claimed(record)))
+        db.session.commit()
+    
+    @staticmethod
+    def purge_expired(batch_size: int = 1000) -> int:
+        """Delete expired keys in batches; returns how many were removed."""
+        purged = 0
+        while True:
+            hashes = [row.key_hash for row in db.session.query(IdempotencyKey.key_hash)
+                      .filter(IdempotencyKey.expires_at <= datetime.utcnow()).limit(batch_size).all()]
+            if not hashes:
+                return purged
+            IdempotencyKey.query.filter(IdempotencyKey.key_hash.in_(hashes)).delete(synchronize_session=False)
+            db.session.commit()
+            purged += len(hashes)
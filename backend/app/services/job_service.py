@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, or_
+from app import db
+from app.models.job import Job
+from app.services.exceptions import LeaseLostError
+
+class JobService:
+    """Service layer for the database-backed job queue.
+    
+    Workers ``claim`` jobs with a conditional UPDATE per candidate, so two
+    workers polling at once can never both start the same job, on any
+    database and without row locks. Every later update is fenced on the
+    claiming worker and attempt number, so an attempt whose lease ran out
+    cannot touch the job once it has been claimed again. Handlers run in
+    ``app.jobs``.
+    """
+    
+    @staticmethod
+    def enqueue(kind: str, payload: Optional[dict] = None, max_attempts: int = 3) -> Job:
+        """Queue a job for the next free worker."""
+        from app.jobs import HANDLERS
+        
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}'. Known kinds: {', '.join(sorted(HANDLERS))}")
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+        
+        job = Job(kind=kind, payload=json.dumps(payload or {}), max_attempts=max_attempts)
+        db.session.add(job)
+        db.session.commit()
+        return job
+    
+    @staticmethod
+    def get_job(job_id: int) -> Optional[Job]:
+        """Get a specific job by ID, as currently stored.
+        
+        Workers update jobs behind the session's back, so the row is always
+        reloaded rather than taken from the identity map.
+        """
+        return db.session.get(Job, job_id, populate_existing=True)
+    
+    @staticmethod
+    def claim(worker: str, limit: int, lease: timedelta) -> List[int]:
+        """Mark up to ``limit`` runnable jobs as running on ``worker``; return their ids.
+        
+        Runnable means queued and due, or running on a worker that has not
+        reported within ``lease`` (it most likely died).
+        """
+        now = datetime.utcnow()
+        jobs = Job.__table__
+        runnable = or_(
+            and_(jobs.c.status == 'queued', jobs.c.run_after <= now),
+            and_(jobs.c.status == 'running', jobs.c.heartbeat_at < now - lease)
+        )
+        
+        candidates = db.session.query(Job.id).filter(runnable).order_by(Job.run_after, Job.id).limit(limit).all()
+        claimed = []
+        for candidate in candidates:
+            result = db.session.execute(jobs.update().where(jobs.c.id == candidate.id, runnable).values(
+                status='running',
+                attempts=jobs.c.attempts + 1,
+                worker=worker,
+                started_at=now,
+                heartbeat_at=now
+            ))
+            if result.rowcount:
+                claimed.append(candidate.id)
+        db.session.commit()
+        return claimed
+    
+    @staticmethod
+    def _update_attempt(job_id: int, worker: str, attempt: int, **values) -> bool:
+        """Update a running job only while ``worker`` still holds ``attempt``; commits.
+        
+        Returns False once the job was claimed again, so a worker whose lease
+        ran out can never overwrite the newer attempt.
+        """
+        jobs = Job.__table__
+        result = db.session.execute(jobs.update().where(
+            jobs.c.id == job_id,
+            jobs.c.status == 'running',
+            jobs.c.worker == worker,
+            jobs.c.attempts == attempt
+        ).values(**values))
+        db.session.commit()
+        return result.rowcount > 0
+    
+    @staticmethod
+    def heartbeat(job_id: int, worker: str, attempt: int) -> bool:
+        """Renew the lease of a running attempt; False if it was claimed again."""
+        return JobService._update_attempt(job_id, worker, attempt, heartbeat_at=datetime.utcnow())
+    
+    @staticmethod
+    def report_progress(job_id: int, worker: str, attempt: int, done: int, total: Optional[int] = None):
+        """Record progress and renew the attempt's lease.
+        
+        Commits the session, so handlers report between units of work.
+        Raises ``LeaseLostError`` once the job was claimed again, which stops
+        the handler.
+        """
+        values = {'progress_done': done, 'heartbeat_at': datetime.utcnow()}
+        if total is not None:
+            values['progress_total'] = total
+        if not JobService._update_attempt(job_id, worker, attempt, **values):
+            raise LeaseLostError(f'Job {job_id} was claimed again after attempt {attempt} lost its lease')
+    
+    @staticmethod
+    def succeed(job_id: int, worker: str, attempt: int, result=None) -> bool:
+        """Mark an attempt finished and store its JSON-serializable result.
+        
+        Returns False, changing nothing, if the job was claimed again.
+        """
+        return JobService._update_attempt(
+            job_id, worker, attempt,
+            status='succeeded',
+            result=json.dumps(result) if result is not None else None,
+            error=None,
+            finished_at=datetime.utcnow()
+        )
+    
+    @staticmethod
+    def fail(job_id: int, worker: str, attempt: int, error: str, backoff: timedelta) -> bool:
+        """Record a failed attempt; requeue the job after ``backoff`` doubled per attempt.
+        
+        Once ``max_attempts`` is used up the job stays failed. Returns False,
+        changing nothing, if the job was claimed again.
+        """
+        db.session.rollback()
+        job = JobService.get_job(job_id)
+        if job is None:
+            return False
+        now = datetime.utcnow()
+        if attempt < job.max_attempts:
+            values = {'status': 'queued', 'run_after': now + backoff * 2 ** (attempt - 1)}
+        else:
+            values = {'status': 'failed', 'finished_at': now}
+        return JobService._update_attempt(job_id, worker, attempt, error=error[:Job.ERROR_LENGTH], **values)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import aliased
+from app import db
+from app.models.archived_comment import ArchivedComment
+from app.models.comment import Comment
+from app.models.comment_revision import CommentRevision
+from app.models.task import Task
+
+class PurgeService:
+    """Service layer that permanently removes soft-deleted rows.
+    
+    Rows are deleted in batches of ``batch_size`` ids, each in its own
+    transaction, so a task with tens of thousands of comments never holds
+    locks or memory for the whole cascade. Tombstones younger than the
+    grace period are left alone and can still be restored.
+    
+    ``comments.parent_id`` is a foreign key, so a tombstoned comment that
+    still has a live (or restorable) reply is kept until the reply goes.
+    Comments are purged newest id first, replies before their parents, and
+    the replies of a batch are detached before it is deleted, so no
+    statement ever leaves a dangling ``parent_id``.
+    """
+    
+    @staticmethod
+    def purge_deleted(grace_period: timedelta, batch_size: int = 1000, max_batches: Optional[int] = None,
+                      on_batch: Optional[Callable[[int], None]] = None) -> dict:
+        """Delete tombstoned comments and tasks older than ``grace_period``.
+        
+        ``on_batch`` is called after every committed batch with the number
+        of rows purged so far (jobs report it as progress).
+        """
+        cutoff = datetime.utcnow() - grace_period
+        purged = {'comments': 0, 'tasks': 0}
+        batches = 0
+        
+        expired_tasks = db.session.query(Task.id).filter(Task.deleted_at <= cutoff)
+        reply = aliased(Comment)
+        surviving_replies = db.session.query(reply.id).filter(
+            reply.parent_id == Comment.id,
+            or_(reply.deleted_at.is_(None), reply.deleted_at > cutoff),
+            reply.task_id.notin_(expired_tasks.scalar_subquery())
+        )
+        expired_comments = db.session.query(Comment.id).filter(
+            (Comment.deleted_at <= cutoff) | Comment.task_id.in_(expired_tasks.scalar_subquery()),
+            ~surviving_replies.exists()
+        ).order_by(Comment.id.desc())
+        expired_archived = db.session.query(ArchivedComment.id).filter(
+            (ArchivedComment.deleted_at <= cutoff) | ArchivedComment.task_id.in_(expired_tasks.scalar_subquery())
+        )
+        
+        # Comments first, so deleting a task never cascades through the ORM
+        steps = (
+            (Comment, expired_comments, 'comments'),
+            (ArchivedComment, expired_archived, 'comments'),
+            (Task, expired_tasks, 'tasks')
+        )
+        for model, query, key in steps:
+            while max_batches is None or batches < max_batches:
+                ids = [row.id for row in query.limit(batch_size).all()]
+                if not ids:
+                    break
+                
+                if model is Comment:
+                    # Only expired replies are left; keep updated_at so their tombstones stay put
+                    comments = Comment.__table__
+                    db.session.execute(comments.update().where(comments.c.parent_id.in_(ids))
+                                       .values(parent_id=None, updated_at=comments.c.updated_at))
+                if model is not Task:
+                    CommentRevision.query.filter(CommentRevision.comment_id.in_(ids)).delete(synchronize_session=False)
+                model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+                db.session.commit()
+                purged[key] += len(ids)
+                batches += 1
+                if on_batch is not None:
+                    on_batch(purged['comments'] + purged['tasks'])
+        
+        return purged
@@ -0,0 +1,100 @@
+import json
+import re
+import zlib
+from difflib import SequenceMatcher
+from typing import List, Optional
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models.comment import Comment
+from app.models.comment_revision import CommentRevision
+
+# Words, runs of whitespace and single punctuation marks: diffing tokens
+# rather than characters keeps SequenceMatcher fast on long comments
+_TOKEN = re.compile(r'\w+|\s+|[^\w\s]')
+
+def make_delta(old: str, new: str) -> list:
+    """Describe ``new`` as ops on ``old``: ``[start, end]`` copies a slice of ``old``, a string is inserted."""
+    old_tokens = _TOKEN.findall(old)
+    new_tokens = _TOKEN.findall(new)
+    offsets = [0]
+    for token in old_tokens:
+        offsets.append(offsets[-1] + len(token))
+    
+    ops = []
+    matcher = SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([offsets[i1], offsets[i2]])
+        elif tag in ('replace', 'insert'):
+            ops.append(''.join(new_tokens[j1:j2]))
+    return ops
+
+def apply_delta(old: str, ops: list) -> str:
+    return ''.join(old[op[0]:op[1]] if isinstance(op, list) else op for op in ops)
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(',', ':')).encode())
+
+def _unpack(data: bytes):
+    return json.loads(zlib.decompress(data))
+
+class RevisionService:
+    """Service layer for comment edit history.
+    
+    Every ``COMMENT_REVISION_SNAPSHOT_INTERVAL``-th revision stores the full
+    content; the others store a delta against the previous revision, so
+    rebuilding any revision reads at most one snapshot and interval - 1
+    deltas. Revisions are added to the session of the edit that produced
+    them and are committed with it.
+    """
+    
+    @staticmethod
+    def record_edit(comment: Comment, old_content: str):
+        """Add the revisions for an edit from ``old_content`` to ``comment.content``."""
+        # Keep the edit unflushed so it is written in one flush at commit
+        with db.session.no_autoflush:
+            latest = db.session.query(func.max(CommentRevision.revision)) \
+                .filter(CommentRevision.comment_id == comment.id).scalar()
+        if latest is None:
+            # First edit: keep the original as revision 1
+            RevisionService._add(comment.id, 1, old_content, None)
+            latest = 1
+        RevisionService._add(comment.id, latest + 1, comment.content, old_content)
+    
+    @staticmethod
+    def _add(comment_id: int, revision: int, content: str, previous: Optional[str]):
+        interval = current_app.config['COMMENT_REVISION_SNAPSHOT_INTERVAL']
+        if previous is None or (revision - 1) % interval == 0:
+            kind, data = 'snapshot', _pack(content)
+        else:
+            kind, data = 'delta', _pack(make_delta(previous, content))
+        db.session.add(CommentRevision(comment_id=comment_id, revision=revision, kind=kind,
+                                       data=data, content_length=len(content)))
+    
+    @staticmethod
+    def get_revisions(comment_id: int) -> List[CommentRevision]:
+        """Get a comment's revisions, oldest first."""
+        return CommentRevision.query.filter(CommentRevision.comment_id == comment_id) \
+            .order_by(CommentRevision.revision).all()
+    
+    @staticmethod
+    def get_content(comment_id: int, revision: int) -> Optional[str]:
+        """Rebuild the content of one revision from its nearest snapshot."""
+        snapshot = db.session.query(func.max(CommentRevision.revision)).filter(
+            CommentRevision.comment_id == comment_id,
+            CommentRevision.kind == 'snapshot',
+            CommentRevision.revision <= revision
+        ).scalar_subquery()
+        rows = CommentRevision.query.filter(
+            CommentRevision.comment_id == comment_id,
+            CommentRevision.revision >= snapshot,
+            CommentRevision.revision <= revision
+        ).order_by(CommentRevision.revision).all()
+        if not rows or rows[-1].revision != revision:
+            return None
+        
+        content = _unpack(rows[0].data)
+        for row in rows[1:]:
+            content = apply_delta(content, _unpack(row.data))
+        return content
@@ -0,0 +1,155 @@
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session
+from app import db
+from app.models.comment import Comment
+from app.models.task import Task
+from app.models.workspace import DEFAULT_WORKSPACE
+from app.services.comment_service import visible_comments
+from app.services.task_service import active_tasks
+from app.tenancy import current_workspace
+
+class StatsCache:
+    """TTL cache for aggregate results, invalidated when tasks or comments change.
+    
+    Every invalidation bumps a generation counter; a result computed while
+    a write committed is returned but not stored, so the cache never keeps
+    a value older than the last write it has been told about. Keys carry
+    the workspace: ``('global', workspace)`` and ``('task', workspace, id)``.
+    """
+    
+    def __init__(self, ttl: float = 10.0, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key, compute: Callable):
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        
+        generation = self._generation
+        value = compute()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, value)
+        return value
+    
+    def invalidate(self, task_ids: Iterable[int], workspace_id: str = DEFAULT_WORKSPACE):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(('global', workspace_id), None)
+            for task_id in task_ids:
+                self._entries.pop(('task', workspace_id, task_id), None)
+
+def stats_cache() -> StatsCache:
+    cache = current_app.extensions.get('stats_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('stats_cache', StatsCache(current_app.config['STATS_CACHE_TTL']))
+    return cache
+
+def _workspace() -> str:
+    return current_workspace() or DEFAULT_WORKSPACE
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_tasks(session, flush_context):
+    changed = session.info.get('stats_task_ids')
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Task, Comment)):
+            if changed is None:
+                changed = session.info['stats_task_ids'] = {}
+            changed.setdefault(obj.workspace_id, set()).add(obj.id if isinstance(obj, Task) else obj.task_id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_stats(session):
+    changed = session.info.pop('stats_task_ids', None)
+    if changed and has_app_context() and 'stats_cache' in current_app.extensions:
+        for workspace_id, task_ids in changed.items():
+            current_app.extensions['stats_cache'].invalidate(task_ids, workspace_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_tasks(session):
+    session.info.pop('stats_task_ids', None)
+
+class StatsService:
+    """Service layer for aggregate dashboards; every figure is a GROUP BY on the server."""
+    
+    TOP_N = 5
+    
+    @staticmethod
+    def get_stats() -> dict:
+        """Get task counts by status and priority, top commenters and busiest tasks."""
+        return stats_cache().get_or_compute(('global', _workspace()), StatsService._compute_stats)
+    
+    @staticmethod
+    def get_task_stats(task_id: int) -> Optional[dict]:
+        """Get comment statistics for one task, or None if the task does not exist."""
+        return stats_cache().get_or_compute(('task', _workspace(), task_id),
+                                            lambda: StatsService._compute_task_stats(task_id))
+    
+    @staticmethod
+    def _compute_stats() -> dict:
+        by_status, by_priority, total_tasks = {}, {}, 0
+        rows = active_tasks().with_entities(Task.status, Task.priority, func.count(Task.id)) \
+            .group_by(Task.status, Task.priority).all()
+        for status, priority, count in rows:
+            by_status[status] = by_status.get(status, 0) + count
+            by_priority[priority] = by_priority.get(priority, 0) + count
+            total_tasks += count
+        
+        comment_count = func.count(Comment.id)
+        total_comments = visible_comments().with_entities(comment_count).scalar()
+        top_authors = visible_comments().with_entities(Comment.author_name, comment_count) \
+            .group_by(Comment.author_name).order_by(comment_count.desc(), Comment.author_name) \
+            .limit(StatsService.TOP_N).all()
+        busiest = visible_comments().with_entities(Task.id, Task.title, comment_count) \
+            .group_by(Task.id, Task.title).order_by(comment_count.desc(), Task.id) \
+            .limit(StatsService.TOP_N).all()
+        
+        return {
+            'tasks': {'total': total_tasks, 'by_status': by_status, 'by_priority': by_priority},
+            'comments': {
+                'total': total_comments,
+                'top_authors': [{'author_name': name, 'count': count} for name, count in top_authors]
+            },
+            'busiest_tasks': [{'id': id, 'title': title, 'comments_count': count} for id, title, count in busiest],
+            'generated_at': datetime.utcnow().isoformat()
+        }
+    
+    @staticmethod
+    def _compute_task_stats(task_id: int) -> Optional[dict]:
+        task = active_tasks().filter(Task.id == task_id).with_entities(Task.id).first()
+        if task is None:
+            return None
+        
+        # One pass over the task's (task_id, path) index range, grouped by author
+        rows = db.session.query(
+            Comment.author_name,
+            func.count(Comment.id),
+            func.sum(case((Comment.parent_id.isnot(None), 1), else_=0)),
+            func.min(Comment.created_at),
+            func.max(Comment.created_at),
+            func.max(Comment.depth)
+        ).filter(Comment.task_id == task_id, Comment.deleted_at.is_(None)) \
+            .group_by(Comment.author_name).order_by(func.count(Comment.id).desc(), Comment.author_name).all()
+        
+        first = min((row[3] for row in rows), default=None)
+        last = max((row[4] for row in rows), default=None)
+        return {
+            'task_id': task_id,
+            'comments': sum(row[1] for row in rows),
+            'replies': sum(row[2] for row in rows),
+            'authors': len(rows),
+            'top_authors': [{'author_name': row[0], 'count': row[1]} for row in rows[:StatsService.TOP_N]],
+            'max_depth': max((row[5] for row in rows), default=0),
+            'first_comment_at': first.isoformat() if first else None,
+            'last_comment_at': last.isoformat() if last else None,
+            'generated_at': datetime.utcnow().isoformat()
+        }
@@ -1,57 +1,158 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import undefer
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
 from app import db
+from app.models.comment import Comment
 from app.models.task import Task
+from app.schemas import TaskSchema
+from app.services.activity_service import ActivityService
+from app.services.exceptions import ConflictError, PreconditionFailedError
+
+def active_tasks():
+    """Query for tasks that have not been soft-deleted."""
+    return Task.query.filter(Task.deleted_at.is_(None))
+
+def with_comments_count(query):
+    """Load ``Task.comments_count`` in the same SELECT as the tasks."""
+    return query.options(undefer(Task.comments_count))
+
+# Hot lookups are built once with bound parameters: each call only generates
+# the cache key and reuses the compiled SQL, instead of rebuilding a Query
+ACTIVE_TASKS = select(Task).where(Task.deleted_at.is_(None)).options(undefer(Task.comments_count))
+ALL_TASKS = ACTIVE_TASKS.order_by(Task.created_at.desc())
+TASK_BY_ID = ACTIVE_TASKS.where(Task.id == bindparam('task_id'))
 
 class TaskService:
     """Service layer for task business logic."""
     
+    PATCHABLE_FIELDS = ('title', 'description', 'status', 'priority')
+    # Comments re-stamped per UPDATE when a task is restored
+    RESTORE_BATCH_SIZE = 1000
+    
     @staticmethod
     def get_all_tasks() -> List[Task]:
         """Get all tasks."""
-        return Task.query.order_by(Task.created_at.desc()).all()
+        return db.session.execute(ALL_TASKS).scalars().all()
     
     @staticmethod
     def get_task_by_id(task_id: int) -> Optional[Task]:
         """Get a specific task by ID."""
-        return Task.query.get(task_id)
+        return db.session.execute(TASK_BY_ID, {'task_id': task_id}).scalars().first()
     
     @staticmethod
     def create_task(data: dict) -> Task:
         """Create a new task."""
-        if not data.get('title'):
-            raise ValueError("Title is required")
+        data = TaskSchema.validate(data)
         
         task = Task.from_dict(data)
         db.session.add(task)
+        db.session.flush()
+        # A new task has no comments; saves to_dict() a COUNT query
+        set_committed_value(task, 'comments_count', 0)
+        ActivityService.record('created', task)
         db.session.commit()
         return task
     
     @staticmethod
-    def update_task(task_id: int, data: dict) -> Optional[Task]:
-        """Update an existing task."""
-        task = Task.query.get(task_id)
+    def update_task(task_id: int, data: dict, expected_versions: Optional[Iterable[int]] = None) -> Optional[Task]:
+        """Update an existing task.
+        
+        ``expected_versions`` comes from the client's If-Match header; the
+        update is rejected if the stored version is not one of them.
+        """
+        result = TaskService._apply(task_id, data, expected_versions, always_write=True)
+        return result and result[0]
+    
+    @staticmethod
+    def patch_task(task_id: int, data: dict,
+                   expected_versions: Optional[Iterable[int]] = None) -> Optional[Tuple[Task, List[str]]]:
+        """Apply only the fields whose values differ; return the task and the changed fields.
+        
+        When nothing differs there is no UPDATE, no activity event and no
+        commit, so the version (and ETag) stays the same.
+        """
+        return TaskService._apply(task_id, data, expected_versions)
+    
+    @staticmethod
+    def _apply(task_id: int, data: dict, expected_versions: Optional[Iterable[int]],
+               always_write: bool = False) -> Optional[Tuple[Task, List[str]]]:
+        """Validate ``data`` and write the fields that differ, shared by PUT and PATCH.
+        
+        ``always_write`` records the update event and commits even when no
+        field changed, as PUT always has.
+        """
+        data = TaskSchema.validate(data, partial=True)
+        
+        task = TaskService.get_task_by_id(task_id)
         if not task:
             return None
         
-        if 'title' in data:
-            task.title = data['title']
-        if 'description' in data:
-            task.description = data['description']
-        if 'status' in data:
-            task.status = data['status']
-        if 'priority' in data:
-            task.priority = data['priority']
+        if expected_versions is not None and task.version not in expected_versions:
+            raise PreconditionFailedError(f"Task {task_id} has been modified (current version {task.version})")
         
-        db.session.commit()
-        return task
+        changed = [field for field in TaskService.PATCHABLE_FIELDS
+                   if field in data and getattr(task, field) != data[field]]
+        if not changed and not always_write:
+            return task, changed
+        
+        for field in changed:
+            setattr(task, field, data[field])
+        ActivityService.record('updated', task)
+        
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            raise ConflictError(f"Task {task_id} was modified by another request")
+        return task, changed
     
     @staticmethod
     def delete_task(task_id: int) -> bool:
-        """Delete a task and all its comments."""
-        task = Task.query.get(task_id)
+        """Soft-delete a task, hiding it and all its comments.
+        
+        Only the task row is touched; comments are hidden through their
+        task's tombstone, so this is O(1) no matter how many comments the
+        task has. Rows are removed later by ``PurgeService``.
+        """
+        task = TaskService.get_task_by_id(task_id)
         if not task:
             return False
         
-        db.session.delete(task)
+        task.deleted_at = datetime.utcnow()
+        ActivityService.record('deleted', task)
         db.session.commit()
         return True
+    
+    @staticmethod
+    def restore_task(task_id: int) -> Optional[Task]:
+        """Restore a soft-deleted task that has not been purged yet.
+        
+        Change-feed clients dropped the task's comments along with its
+        tombstone, so its visible comments are stamped with the restore time
+        too and come back after the task. They are updated ``RESTORE_BATCH_SIZE``
+        ids per statement, in the restore's own transaction.
+        """
+        task = with_comments_count(Task.query).filter(Task.id == task_id, Task.deleted_at.isnot(None)).first()
+        if not task:
+            return None
+        
+        task.deleted_at = None
+        db.session.flush()
+        
+        comments = Comment.__table__
+        visible = db.session.query(Comment.id).filter(Comment.task_id == task.id, Comment.deleted_at.is_(None))
+        last_id = 0
+        while True:
+            batch = visible.filter(Comment.id > last_id).order_by(Comment.id).limit(TaskService.RESTORE_BATCH_SIZE)
+            ids = [row.id for row in batch.all()]
+            if not ids:
+                break
+            db.session.execute(comments.update().where(comments.c.id.in_(ids)).values(updated_at=task.updated_at))
+            last_id = ids[-1]
+        
+        ActivityService.record('restored', task)
+        db.session.commit()
+        return task
@@ -0,0 +1,177 @@
+"""Workspaces: many tenants served by one deployment.
+
+A request belongs to the workspace of its API key: ``API_KEYS`` maps each
+key (sent as ``X-API-Key``) to one workspace, and requests without a key
+belong to ``DEFAULT_WORKSPACE``. An unknown key gets ``401``; an
+``X-Workspace-Id`` header, if sent, must name the request's workspace or
+it gets ``404``. Both are rejected before any budget is spent, so made-up
+names never get a semaphore or token bucket. Its session carries the
+workspace in ``session.info['workspace_id']`` and the service layer needs
+no filters of its own:
+
+* every ORM query adds ``workspace_id = :workspace`` for each
+  ``WorkspaceScoped`` model it touches (including relationship loads and
+  bulk UPDATE/DELETE), so the tenant-leading indexes serve the hot paths;
+* a flush stamps new rows with the workspace and refuses to write rows of
+  another one.
+
+Sessions without a workspace (CLI commands, the job worker's queue
+bookkeeping) are not scoped. Per-workspace budgets:
+
+* ``WORKSPACE_MAX_CONCURRENCY`` caps the requests of one workspace running
+  at once in a process, and so the pooled connections it can hold; others
+  wait up to ``WORKSPACE_QUEUE_TIMEOUT`` seconds, then get ``503``;
+* ``RATELIMIT_WORKSPACE_DEFAULT`` / ``RATELIMIT_WORKSPACE_LIMITS`` give each
+  workspace a token bucket of its own (see ``app.ratelimit``);
+* ``WORKSPACE_DATABASE_URLS`` (``"bigco=postgresql://...,acme=..."``) moves
+  large workspaces to a database of their own: ``RoutingSession`` sends all
+  of their statements there, except for the shared job queue.
+"""
+import math
+import re
+import threading
+
+import sqlalchemy as sa
+from flask import current_app, g, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.orm import with_loader_criteria
+
+from app import db
+from app.models.workspace import DEFAULT_WORKSPACE, WorkspaceScoped
+from app.routing import RoutingSession
+
+WORKSPACE_HEADER = 'X-Workspace-Id'
+API_KEY_HEADER = 'X-API-Key'
+_WORKSPACE_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,50}$')
+
+
+class WorkspaceError(Exception):
+    """Raised when a session serving one workspace writes another workspace's rows."""
+    pass
+
+
+def current_workspace():
+    """The workspace the current session serves, or None if it is not scoped."""
+    return db.session.info.get('workspace_id')
+
+
+def workspace_engine(workspace):
+    """The dedicated engine of a workspace, or None if it lives in the primary database."""
+    return current_app.extensions.get('workspace_engines', {}).get(workspace)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _scope_to_workspace(state):
+    workspace = state.session.info.get('workspace_id')
+    if workspace is None or state.is_column_load or state.is_relationship_load:
+        return
+    if state.is_select or state.is_update or state.is_delete:
+        # The lambda is cached with ``workspace`` as a bound parameter, so every
+        # workspace shares one compiled statement; relationship and column
+        # loads of the returned objects inherit the criteria
+        state.statement = state.statement.options(with_loader_criteria(
+            WorkspaceScoped, lambda cls: cls.workspace_id == workspace, include_aliases=True
+        ))
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _stamp_workspace(session, flush_context, instances):
+    workspace = session.info.get('workspace_id')
+    if workspace is None:
+        return
+    for obj in session.new:
+        if isinstance(obj, WorkspaceScoped):
+            if obj.workspace_id is None:
+                obj.workspace_id = workspace
+            elif obj.workspace_id != workspace:
+                raise WorkspaceError(f"Cannot write to workspace '{obj.workspace_id}' from workspace '{workspace}'")
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, WorkspaceScoped) and obj.workspace_id != workspace:
+            raise WorkspaceError(f"Cannot write to workspace '{obj.workspace_id}' from workspace '{workspace}'")
+
+
+class WorkspaceBudget:
+    """Caps how many requests of each workspace run at once in this process."""
+
+    def __init__(self, limit: int, timeout: float):
+        self.limit = limit
+        self.timeout = timeout
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, workspace: str) -> bool:
+        """Wait up to ``timeout`` seconds for a slot; False if none became free."""
+        semaphore = self._semaphores.get(workspace)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._semaphores.setdefault(workspace, threading.BoundedSemaphore(self.limit))
+        return semaphore.acquire(timeout=self.timeout)
+
+    def release(self, workspace: str):
+        self._semaphores[workspace].release()
+
+
+def init_workspace_binds(app):
+    """Create an engine for every workspace with a database of its own."""
+    app.config.setdefault('WORKSPACE_DATABASE_URLS', {})
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    app.extensions['workspace_engines'] = {
+        workspace: sa.create_engine(uri, **options)
+        for workspace, uri in app.config['WORKSPACE_DATABASE_URLS'].items()
+    }
+
+
+def init_tenancy(app):
+    """Register the request hooks that select the workspace and enforce its budget."""
+    app.config.setdefault('API_KEYS', {})
+    for workspace in app.config['API_KEYS'].values():
+        if not _WORKSPACE_PATTERN.match(workspace):
+            raise ValueError(f"Invalid workspace {workspace!r} in API_KEYS")
+    app.config.setdefault('WORKSPACE_MAX_CONCURRENCY', 0)
+    app.config.setdefault('WORKSPACE_QUEUE_TIMEOUT', 1.0)
+
+    limit = app.config['WORKSPACE_MAX_CONCURRENCY']
+    app.extensions['workspace_budget'] = (
+        WorkspaceBudget(limit, app.config['WORKSPACE_QUEUE_TIMEOUT']) if limit > 0 else None
+    )
+    app.before_request(_select_workspace)
+    app.teardown_request(_release_workspace)
+
+
+def _select_workspace():
+    api_key = request.headers.get(API_KEY_HEADER)
+    if api_key is None:
+        workspace = DEFAULT_WORKSPACE
+    else:
+        workspace = current_app.config['API_KEYS'].get(api_key)
+        if workspace is None:
+            return jsonify({'error': f'Unknown {API_KEY_HEADER}'}), 401
+        # Verified, so it may identify the client
+        g.api_key = api_key
+
+    requested = request.headers.get(WORKSPACE_HEADER)
+    if requested is not None and requested != workspace:
+        if not _WORKSPACE_PATTERN.match(requested):
+            return jsonify({'error': f'{WORKSPACE_HEADER} must be 1-50 letters, digits, hyphens or underscores'}), 400
+        return jsonify({'error': f"Unknown workspace '{requested}'"}), 404
+    g.workspace_id = workspace
+    db.session.info['workspace_id'] = workspace
+
+    budget = current_app.extensions['workspace_budget']
+    if budget is None or request.method == 'OPTIONS':
+        return None
+    if not budget.acquire(workspace):
+        response = jsonify({'error': f"Too many concurrent requests for workspace '{workspace}'"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(max(1, math.ceil(budget.timeout)))
+        return response
+    g._workspace_slot = workspace
+    return None
+
+
+def _release_workspace(exc):
+    # The session outlives the request when the app context was pushed by the caller
+    db.session.info.pop('workspace_id', None)
+    workspace = g.pop('_workspace_slot', None)
+    if workspace is not None:
+        current_app.extensions['workspace_budget'].release(workspace)
@@ -0,0 +1,160 @@
+"""Job worker: claims jobs from the ``jobs`` table and runs them on a pool.
+
+The dispatcher loop claims at most as many jobs as there are free pool
+slots, so a job is never marked running while it waits in a local queue.
+``mode='thread'`` suits jobs that mostly wait on the database;
+``mode='process'`` uses separate interpreters for CPU-bound work, each
+with its own application (built with ``create_app(deferred=True)``) and
+connection pool.
+"""
+import multiprocessing
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import Optional
+
+
+_process_app = None
+
+
+def _init_process(config_name: str):
+    """Process pool initializer: build this process's own application."""
+    global _process_app
+    from app import create_app
+    _process_app = create_app(config_name, deferred=True)
+
+
+def _renew_lease(app, job_id: int, worker: str, attempt: int, interval: float, stop: threading.Event):
+    """Heartbeat thread: renew an attempt's lease every ``interval`` seconds until stopped or lost."""
+    from app.services.job_service import JobService
+
+    while not stop.wait(interval):
+        try:
+            with app.app_context():
+                if not JobService.heartbeat(job_id, worker, attempt):
+                    return
+        except Exception:
+            # A missed beat is retried; the lease outlasts several of them
+            app.logger.warning('Could not renew the lease of job %s', job_id, exc_info=True)
+
+
+def execute_job(job_id: int, app=None) -> Optional[str]:
+    """Run one claimed job under a fresh application context; return its final status.
+
+    A job queued by a workspace runs with its session scoped to that workspace.
+    A heartbeat thread renews the job's lease while the handler runs, so a
+    handler that reports no progress for a while is not claimed again.
+    Returns None if the job no longer exists.
+    """
+    from app import db
+    from app.jobs import HANDLERS, Progress
+    from app.services.exceptions import LeaseLostError
+    from app.services.job_service import JobService
+
+    app = app or _process_app
+    with app.app_context():
+        job = JobService.get_job(job_id)
+        if job is None:
+            app.logger.warning('Job %s was claimed but no longer exists', job_id)
+            return None
+        worker, attempt = job.worker, job.attempts
+        if job.workspace_id is not None:
+            db.session.info['workspace_id'] = job.workspace_id
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_renew_lease, name=f'job-{job_id}-heartbeat', daemon=True,
+            args=(app, job_id, worker, attempt, app.config['JOB_LEASE_SECONDS'] / 3, stop)
+        )
+        heartbeat.start()
+        try:
+            if attempt > job.max_attempts:
+                raise RuntimeError('Lease expired on the last attempt; the worker running it probably died')
+            handler = HANDLERS[job.kind]
+            progress = Progress(job.id, worker, attempt, job.progress_done, job.progress_total)
+            result = handler(job.payload_dict(), progress)
+            recorded = JobService.succeed(job_id, worker, attempt, result)
+        except LeaseLostError:
+            db.session.rollback()
+            recorded = False
+        except Exception:
+            recorded = JobService.fail(job_id, worker, attempt, traceback.format_exc(),
+                                       timedelta(seconds=app.config['JOB_RETRY_BACKOFF']))
+        finally:
+            stop.set()
+            heartbeat.join()
+        if not recorded:
+            app.logger.warning('Job %s was claimed again; attempt %s stopped without recording its outcome',
+                               job_id, attempt)
+        job = JobService.get_job(job_id)
+        return job.status if job is not None else None
+
+
+class Worker:
+    """Polls the job queue and runs claimed jobs on a thread or process pool."""
+
+    def __init__(self, app, concurrency: int = 4, mode: str = 'thread', poll_interval: float = 1.0):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"mode must be 'thread' or 'process', not {mode!r}")
+        self.app = app
+        self.concurrency = concurrency
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.lease = timedelta(seconds=app.config['JOB_LEASE_SECONDS'])
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Stop claiming jobs; running jobs are allowed to finish."""
+        self._stop.set()
+
+    def _executor(self):
+        if self.mode == 'process':
+            # spawn, not fork: children must not share the parent's connections
+            return ProcessPoolExecutor(self.concurrency, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_process, initargs=(self.app.config['CONFIG_NAME'],))
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix='job-worker')
+
+    def _submit(self, executor, job_id: int):
+        if self.mode == 'process':
+            return executor.submit(execute_job, job_id)
+        return executor.submit(execute_job, job_id, self.app)
+
+    def run(self, burst: bool = False, max_jobs: Optional[int] = None) -> int:
+        """Run jobs until stopped; return how many ran.
+        
+        With ``burst`` the worker exits once the queue is empty and its jobs
+        have finished, which suits cron and tests.
+        """
+        from app.services.job_service import JobService
+
+        running = set()
+        started = 0
+        with self._executor() as executor:
+            while not self._stop.is_set():
+                free = self.concurrency - len(running)
+                if max_jobs is not None:
+                    free = min(free, max_jobs - started)
+                claimed = []
+                if free > 0:
+                    with self.app.app_context():
+                        claimed = JobService.claim(self.name, free, self.lease)
+                for job_id in claimed:
+                    running.add(self._submit(executor, job_id))
+                started += len(claimed)
+
+                if not running:
+                    if burst or (max_jobs is not None and started >= max_jobs):
+                        break
+                    self._stop.wait(self.poll_interval)
+                    continue
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        # Failing to record the outcome leaves the job running;
+                        # its lease expires and another claim retries it
+                        self.app.logger.error('Job bookkeeping failed: %r', future.exception())
+        return started
@@ -0,0 +1,63 @@
+"""Benchmark response compression: bytes saved and CPU cost per payload.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_compression
+"""
+import json
+import time
+from datetime import datetime
+
+from app.compression import CODECS, Compress, CompressedBodyCache
+
+
+def build_payload(comment_count: int) -> bytes:
+    """Build a comment-thread payload shaped like ``get_task_comments`` output."""
+    now = datetime.utcnow().isoformat()
+    comments = [{
+        'id': i,
+        'content': f'Comment {i}: looked into this, the fix is in review and should land today.',
+        'author_name': f'User {i % 25}',
+        'author_email': f'user{i % 25}@example.com',
+        'task_id': 1,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(comment_count)]
+    return json.dumps({
+        'task_id': 1,
+        'task_title': 'Incident follow-up',
+        'comments': comments,
+        'count': comment_count
+    }).encode()
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = 50
+    for comment_count in (50, 500, 2000):
+        body = build_payload(comment_count)
+        print(f'\npayload: {comment_count} comments, {len(body) / 1024:.1f} KiB')
+        print(f'{"codec":>8} {"level":>5} {"size KiB":>9} {"saved":>7} {"cold ms":>8} {"cached ms":>9}')
+        for encoding in CODECS:
+            for level in (1, 6, 9):
+                compressed = CODECS[encoding](body, level)
+                cold = timed(lambda: CODECS[encoding](body, level), repeat)
+
+                compress = Compress()
+                compress.cache = CompressedBodyCache()
+                compress.compress(body, encoding, level)
+                cached = timed(lambda: compress.compress(body, encoding, level), repeat)
+
+                saved = 1 - len(compressed) / len(body)
+                print(f'{encoding:>8} {level:>5} {len(compressed) / 1024:>9.1f} {saved:>6.1%} '
+                      f'{cold * 1000:>8.3f} {cached * 1000:>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
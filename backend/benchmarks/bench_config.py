@@ -0,0 +1,59 @@
+"""Benchmark per-request overhead of the development and production profiles.
+
+Both profiles serve the same 100-task listing from a temporary SQLite file;
+the difference is debug mode, sorted keys and indented JSON. The last line
+isolates JSON serialization of the listing. Run from the
+backend directory:
+
+    python -m benchmarks.bench_config
+"""
+import os
+import tempfile
+import timeit
+
+from app import create_app, db
+from app.models import Task
+
+
+def request_us(app, path, number=30) -> float:
+    client = app.test_client()
+    return min(timeit.repeat(lambda: client.get(path), number=number, repeat=3)) / number * 1e6
+
+
+def serialize_us(app, number=300) -> float:
+    with app.app_context():
+        payload = {'tasks': [task.to_dict() for task in Task.query.all()], 'count': Task.query.count()}
+        return min(timeit.repeat(lambda: app.json.response(payload), number=number, repeat=5)) / number * 1e6
+
+
+def build_app(config_name, database_url, tasks=100):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['RATELIMIT_ENABLED'] = 'false'
+    app = create_app(config_name)
+    with app.app_context():
+        db.create_all()
+        if not Task.query.count():
+            db.session.add_all([Task(title=f'Task {i}', description='x' * 200) for i in range(tasks)])
+            db.session.commit()
+    return app
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        development = build_app('development', url)
+        production = build_app('production', url)
+
+        for path in ('/api/tasks/', '/api/tasks/1'):
+            dev_us = request_us(development, path)
+            prod_us = request_us(production, path)
+            size_dev = len(development.test_client().get(path).data)
+            size_prod = len(production.test_client().get(path).data)
+            print(f'GET {path:14} development {dev_us:8.1f} us ({size_dev} B)   '
+                  f'production {prod_us:8.1f} us ({size_prod} B)')
+        print(f'serialize listing    development {serialize_us(development):8.1f} us'
+              f'              production {serialize_us(production):8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
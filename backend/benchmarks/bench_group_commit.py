@@ -0,0 +1,68 @@
+"""Benchmark comment creation throughput: per-request commits vs group commit.
+
+Each worker thread creates comments through ``CommentService.create_comment``
+against a fresh SQLite file database. Run from the backend directory:
+
+    python -m benchmarks.bench_group_commit
+"""
+import os
+import tempfile
+import threading
+import time
+
+
+def run(group_commit: bool, workers: int, per_worker: int) -> float:
+    """Return comments committed per second for one configuration."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ['COMMENT_GROUP_COMMIT'] = 'true' if group_commit else 'false'
+
+        from app import create_app, db
+        from app.models import Task
+        from app.services.comment_service import CommentService
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            task = Task(title='Incident')
+            db.session.add(task)
+            db.session.commit()
+            task_id = task.id
+
+        def worker(n):
+            with app.app_context():
+                for i in range(per_worker):
+                    CommentService.create_comment({
+                        'content': f'worker {n} comment {i}',
+                        'author_name': f'User {n}',
+                        'task_id': task_id
+                    })
+                    db.session.remove()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        writer = app.extensions.get('comment_writer')
+        if writer is not None:
+            writer.stop()
+        with app.app_context():
+            db.engine.dispose()
+        return workers * per_worker / elapsed
+
+
+def main():
+    per_worker = 50
+    print(f'{"workers":>7} {"per-request/s":>14} {"group/s":>10} {"speedup":>8}')
+    for workers in (1, 8, 32):
+        baseline = run(False, workers, per_worker)
+        grouped = run(True, workers, per_worker)
+        print(f'{workers:>7} {baseline:>14.0f} {grouped:>10.0f} {grouped / baseline:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
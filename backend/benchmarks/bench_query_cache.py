@@ -0,0 +1,73 @@
+"""Benchmark per-call overhead of the service lookups before and after
+module-level ``select()`` statements.
+
+"legacy" rebuilds the ``Query`` each call, as the services used to;
+"prebuilt" is the current service method. Both hit SQLAlchemy's compiled
+cache; the difference is building the statement and its options on every
+call. Lookups run against a temporary SQLite file of 100 tasks with 5
+comments each. Run from the backend directory:
+
+    python -m benchmarks.bench_query_cache
+"""
+import os
+import tempfile
+import timeit
+
+from sqlalchemy.orm import undefer
+
+from app import create_app, db
+from app.models import Task, Comment
+from app.services.comment_service import CommentService, visible_comments
+from app.services.task_service import TaskService, active_tasks
+
+LOOKUPS = {
+    'task by id': (
+        lambda: active_tasks().options(undefer(Task.comments_count)).filter(Task.id == 42).first(),
+        lambda: TaskService.get_task_by_id(42)
+    ),
+    'comment by id': (
+        lambda: visible_comments().filter(Comment.id == 42).first(),
+        lambda: CommentService.get_comment_by_id(42)
+    ),
+    'comments by task': (
+        lambda: visible_comments().filter(Comment.task_id == 42).order_by(Comment.created_at.desc()).all(),
+        lambda: CommentService.get_comments_by_task(42)
+    ),
+}
+
+
+def per_call_us(func, number=2000) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def build_app(database_url, tasks=100, comments=5):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['QUERY_CACHE_STATS'] = 'true'
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([Task(title=f'Task {i}') for i in range(tasks)])
+        db.session.commit()
+        db.session.add_all([
+            Comment(content=f'Comment {j}', author_name='Bench', task_id=task_id)
+            for task_id in range(1, tasks + 1) for j in range(comments)
+        ])
+        db.session.commit()
+    return app
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        stats = app.extensions['query_cache_stats']
+        with app.app_context():
+            for name, (legacy, prebuilt) in LOOKUPS.items():
+                legacy_us = per_call_us(legacy)
+                prebuilt_us = per_call_us(prebuilt)
+                print(f'{name:18} legacy {legacy_us:7.1f} us   prebuilt {prebuilt_us:7.1f} us   '
+                      f'({legacy_us - prebuilt_us:.1f} us saved)')
+        print(f'statement cache      {stats.snapshot()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the rate limiter's per-request overhead (budget: well under 50 us).
+
+Measures the bucket store alone, with a new client evicting another on
+every call, the full before/after request hooks, and the store under
+contention from several threads. Run from the backend
+directory:
+
+    python -m benchmarks.bench_ratelimit
+"""
+import threading
+import time
+import timeit
+
+from app import create_app
+from app.ratelimit import Limit, MemoryStore
+
+
+def per_call_us(func, number=100000) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def contended_us(store, limit, threads=8, per_thread=50000) -> float:
+    def worker(n):
+        for i in range(per_thread):
+            store.consume(f'client-{(n * per_thread + i) % 1000}|tasks.get_tasks', limit)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) / (threads * per_thread) * 1e6
+
+
+def main():
+    limit = Limit.parse('1000000/second')
+    store = MemoryStore()
+    print(f'store.consume, one key:        {per_call_us(lambda: store.consume("client|tasks.get_tasks", limit)):6.2f} us')
+
+    # Every call is a new client on a full shard, so every call evicts
+    full = MemoryStore(shards=1, max_keys_per_shard=10000)
+    keys = iter(range(10 ** 9))
+    print(f'store.consume, new key, full:  {per_call_us(lambda: full.consume(f"client-{next(keys)}", limit)):6.2f} us')
+
+    app = create_app()
+    limiter = app.extensions['ratelimit']
+    limiter['default'] = limit
+    hooks = app.before_request_funcs[None], app.after_request_funcs[None]
+    before = next(f for f in hooks[0] if f.__qualname__ == 'RateLimiter.before_request')
+    after = next(f for f in hooks[1] if f.__qualname__ == 'RateLimiter.after_request')
+
+    with app.test_request_context('/api/tasks/'):
+        from flask import request
+        request.url_rule = app.url_map.bind('localhost').match('/api/tasks/', return_rule=True)[0]
+
+        def hook():
+            before()
+            after(app.response_class())
+
+        baseline = per_call_us(app.response_class)
+        print(f'before+after request hooks:    {per_call_us(hook) - baseline:6.2f} us')
+
+    print(f'store.consume, 8 threads:      {contended_us(MemoryStore(), limit):6.2f} us (wall time per call)')
+
+
+if __name__ == '__main__':
+    main()
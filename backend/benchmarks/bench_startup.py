@@ -0,0 +1,85 @@
+"""Benchmark cold start and per-test fixture cost.
+
+Cold start is the wall time of a fresh interpreter that imports the app and
+calls ``create_app`` (eagerly, deferred, and deferred plus its first
+request). Fixture cost compares creating and dropping the schema around
+every test with rolling back one transaction per test. Run from the backend
+directory:
+
+    python -m benchmarks.bench_startup
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+
+SNIPPETS = {
+    'interpreter only': 'pass',
+    'create_app()': 'from app import create_app; create_app()',
+    'create_app(deferred=True)': 'from app import create_app; create_app(deferred=True)',
+    'deferred + first request': ('from app import create_app; '
+                                 'create_app(deferred=True).test_client().get("/api/tasks/")'),
+}
+
+
+def cold_start_ms(code, env, runs=7) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], env=env, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def fixture_ms(app, db, runs=50):
+    with app.app_context():
+        @event.listens_for(db.engine, 'connect')
+        def do_connect(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(db.engine, 'begin')
+        def do_begin(connection):
+            connection.exec_driver_sql('BEGIN')
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            db.create_all()
+            db.drop_all()
+        recreate = (time.perf_counter() - start) / runs * 1000
+
+        db.create_all()
+        start = time.perf_counter()
+        for _ in range(runs):
+            connection = db.engine.connect()
+            transaction = connection.begin()
+            connection.begin_nested()
+            transaction.rollback()
+            connection.close()
+        rollback = (time.perf_counter() - start) / runs * 1000
+        db.drop_all()
+    return recreate, rollback
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        env['PYTHONPATH'] = os.getcwd()
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', 'init-db'],
+                       env=env, check=True, stdout=subprocess.DEVNULL)
+        for label, code in SNIPPETS.items():
+            print(f'{label:28} {cold_start_ms(code, env):7.1f} ms')
+
+        os.environ['DATABASE_URL'] = env['DATABASE_URL']
+        from app import create_app, db
+        from app import models  # noqa: F401
+        recreate, rollback = fixture_ms(create_app('testing', deferred=True), db)
+        print(f'fixture, create/drop schema: {recreate:7.2f} ms per test')
+        print(f'fixture, rolled-back txn:    {rollback:7.2f} ms per test')
+
+
+if __name__ == '__main__':
+    main()
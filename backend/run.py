@@ -1,3 +1,4 @@
+import os
 from app import create_app, db
 from app.models import Task, Comment
 
@@ -9,6 +10,9 @@ def make_shell_context():
     return {'db': db, 'Task': Task, 'Comment': Comment}
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # create_all() inspects every table on each boot; opt in for local development
+    # (or run `flask --app run init-db` once)
+    if os.getenv('AUTO_CREATE_SCHEMA', 'false').lower() == 'true':
+        with app.app_context():
+            db.create_all()
+    app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5000)
@@ -1,22 +1,165 @@
+import json
+from contextlib import contextmanager
 import pytest
+from sqlalchemy import event
 from app import create_app, db
 from app.models import Task, Comment
+from app.ratelimit import MemoryStore
+from app.routing import RoutingSession
+
+def enable_sqlite_savepoints(engine):
+    """Let SQLAlchemy, not pysqlite, manage transactions so SAVEPOINT works."""
+    @event.listens_for(engine, 'connect')
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, 'begin')
+    def do_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+class SavepointSession(RoutingSession):
+    """Session whose commits and rollbacks only end a SAVEPOINT."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.begin_nested()
+
+@event.listens_for(SavepointSession, 'after_transaction_end')
+def restart_savepoint(session, transaction):
+    if transaction.nested and not transaction._parent.nested:
+        session.begin_nested()
+
+@pytest.fixture(scope='session')
+def session_app():
+    """Create the application and its in-memory schema once per test session."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv('DATABASE_URL', raising=False)
+        app = create_app('testing')
+    
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            enable_sqlite_savepoints(db.engine)
+        db.create_all()
+    
+    yield app
+    
+    with app.app_context():
+        db.drop_all()
+        db.engine.dispose()
+
+@contextmanager
+def rolled_back(app):
+    """Run a block inside a transaction that is rolled back afterwards.
+    
+    Sessions are bound to a single connection and start a SAVEPOINT that is
+    reopened whenever application code commits or rolls back, so the block
+    sees its own writes but nothing survives the outer rollback.
+    """
+    config = app.config.copy()
+    ratelimit = app.extensions['ratelimit'].copy()
+    app.extensions['ratelimit'].update(routes=dict(ratelimit['routes']), store=MemoryStore())
+    
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        
+        original_session = db.session
+        # expire_on_commit=False keeps fixture objects readable after their
+        # (nested) app context has closed the session that created them
+        db.session = db._make_scoped_session({
+            'class_': SavepointSession,
+            'bind': connection,
+            'expire_on_commit': False
+        })
+        
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.session = original_session
+            transaction.rollback()
+            connection.close()
+            app.config.clear()
+            app.config.update(config)
+            app.extensions['ratelimit'].clear()
+            app.extensions['ratelimit'].update(ratelimit)
+            app.extensions.pop('stats_cache', None)
 
 @pytest.fixture
-def app():
-    """Create application for testing."""
+def app(session_app):
+    """Run each test inside a transaction that is rolled back afterwards."""
+    with rolled_back(session_app):
+        yield session_app
+
+@pytest.fixture
+def rollback_scope(session_app):
+    """Open ``rolled_back`` scopes of the shared app, for tests of the isolation itself."""
+    return lambda: rolled_back(session_app)
+
+def summarize(statement: str) -> str:
+    """Reduce a statement to its verb and, for writes, its table: 'INSERT tasks'."""
+    words = statement.split()
+    verb = words[0].upper()
+    if verb == 'INSERT' or verb == 'DELETE':
+        return f'{verb} {words[2]}'
+    if verb == 'UPDATE':
+        return f'{verb} {words[1]}'
+    return verb
+
+@pytest.fixture
+def statements(app):
+    """Record the statements the application issues, minus the test's savepoints."""
+    recorded = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith(('SAVEPOINT', 'RELEASE', 'ROLLBACK TO')):
+            recorded.append(summarize(statement))
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield recorded
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """Create application backed by a file database for multi-threaded tests."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
     app = create_app('testing')
     
     with app.app_context():
         db.create_all()
-        yield app
-        db.drop_all()
+    
+    yield app
 
 @pytest.fixture
 def client(app):
     """Create test client."""
     return app.test_client()
 
+@pytest.fixture
+def send_json():
+    """Send a JSON payload with a test client and return the response."""
+    def send(client, url, payload, headers=None, method='POST'):
+        return client.open(url, method=method, data=json.dumps(payload),
+                           content_type='application/json', headers=headers)
+    return send
+
+@pytest.fixture
+def task_with_comments(send_json):
+    """Create a task and ``comments`` comments on it through the API.
+    
+    Returns ``(task_id, comment_ids)``; keyword arguments are task fields.
+    """
+    def create(client, comments=3, **fields):
+        task_id = send_json(client, '/api/tasks/', {'title': 'Test Task', **fields}).get_json()['id']
+        comment_ids = [
+            send_json(client, '/api/comments/', {
+                'content': f'Comment {i}', 'author_name': 'Test User', 'task_id': task_id
+            }).get_json()['id']
+            for i in range(comments)
+        ]
+        return task_id, comment_ids
+    return create
+
 @pytest.fixture
 def sample_task(app):
     """Create a sample task for testing."""
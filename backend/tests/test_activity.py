@@ -0,0 +1,68 @@
+import json
+from app import db
+from app.models import Event
+
+class TestActivityFeed:
+    """Test cases for the activity feed."""
+    
+    def test_feed_merges_task_and_comment_changes(self, client, send_json):
+        """Test that changes across tasks come back newest first."""
+        first = send_json(client, '/api/tasks/', {'title': 'First'}).get_json()
+        second = send_json(client, '/api/tasks/', {'title': 'Second'}).get_json()
+        comment = send_json(client, '/api/comments/', {
+            'content': 'On it', 'author_name': 'Ann', 'task_id': first['id']
+        }).get_json()
+        send_json(client, f"/api/comments/{comment['id']}", {'content': 'Done'}, method='PUT')
+        send_json(client, f"/api/tasks/{second['id']}", {'status': 'completed'}, method='PUT')
+        client.delete(f"/api/tasks/{first['id']}")
+        
+        response = client.get('/api/activity/')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert [event['type'] for event in data['events']] == [
+            'task.deleted', 'task.updated', 'comment.updated',
+            'comment.created', 'task.created', 'task.created'
+        ]
+        assert data['events'][2]['summary'] == 'Done'
+        assert data['events'][2]['actor'] == 'Ann'
+        assert data['events'][2]['task_id'] == first['id']
+        assert data['next_cursor'] is None
+    
+    def test_keyset_pagination(self, client, send_json):
+        """Test that pages follow each other without gaps or repeats."""
+        for i in range(5):
+            send_json(client, '/api/tasks/', {'title': f'Task {i}'})
+        
+        page1 = json.loads(client.get('/api/activity/?limit=2').data)
+        page2 = json.loads(client.get(f"/api/activity/?limit=2&before={page1['next_cursor']}").data)
+        page3 = json.loads(client.get(f"/api/activity/?limit=2&before={page2['next_cursor']}").data)
+        
+        summaries = [e['summary'] for page in (page1, page2, page3) for e in page['events']]
+        assert summaries == ['Task 4', 'Task 3', 'Task 2', 'Task 1', 'Task 0']
+        assert page3['next_cursor'] is None
+    
+    def test_filter_by_task(self, client, send_json):
+        """Test the per-task activity feed."""
+        task = send_json(client, '/api/tasks/', {'title': 'Mine'}).get_json()
+        send_json(client, '/api/tasks/', {'title': 'Other'})
+        send_json(client, '/api/comments/', {'content': 'Hi', 'author_name': 'Bo', 'task_id': task['id']})
+        
+        data = json.loads(client.get(f"/api/activity/?task_id={task['id']}").data)
+        
+        assert [event['type'] for event in data['events']] == ['comment.created', 'task.created']
+    
+    def test_rejected_change_records_no_event(self, client, send_json):
+        """Test that events are only written when the change itself is."""
+        task = send_json(client, '/api/tasks/', {'title': 'Guarded'}).get_json()
+        
+        response = client.put(f"/api/tasks/{task['id']}", data=json.dumps({'title': 'Nope'}),
+                              content_type='application/json', headers={'If-Match': '"99"'})
+        
+        assert response.status_code == 412
+        assert db.session.query(Event).count() == 1
+    
+    def test_invalid_limit(self, client):
+        """Test that a non-positive limit is rejected."""
+        response = client.get('/api/activity/?limit=0')
+        assert response.status_code == 400
@@ -0,0 +1,49 @@
+import json
+from app import create_app, db
+from app.models import Task
+
+class TestAppFactory:
+    """Test cases for deferred application setup and test isolation."""
+    
+    def test_deferred_setup_runs_before_first_request(self, tmp_path, monkeypatch):
+        """Test that a deferred app registers blueprints lazily."""
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'deferred.db'}")
+        app = create_app('testing', deferred=True)
+        
+        assert 'tasks' not in app.blueprints
+        assert 'compress' not in app.extensions
+        with app.app_context():
+            db.create_all()
+        
+        response = app.test_client().get('/api/tasks/')
+        
+        assert response.status_code == 200
+        assert 'tasks' in app.blueprints
+        assert 'compress' in app.extensions
+    
+    def test_writes_are_visible_within_a_test(self, client):
+        """Test that committed writes are visible to later requests in the same test."""
+        client.post('/api/tasks/', data=json.dumps({'title': 'Scratch'}), content_type='application/json')
+        
+        assert Task.query.count() == 1
+        assert json.loads(client.get('/api/tasks/').data)['count'] == 1
+    
+    def test_writes_are_rolled_back_between_tests(self, session_app, rollback_scope):
+        """Test that a committed task does not survive the end of its test's scope."""
+        with rollback_scope():
+            client = session_app.test_client()
+            client.post('/api/tasks/', data=json.dumps({'title': 'Scratch'}), content_type='application/json')
+            assert Task.query.count() == 1
+        
+        with rollback_scope():
+            assert Task.query.count() == 0
+    
+    def test_application_rollback_keeps_test_transaction(self, app):
+        """Test that a rollback in application code only discards its own work."""
+        db.session.add(Task(title='Kept'))
+        db.session.commit()
+        db.session.add(Task(title='Discarded'))
+        db.session.flush()
+        db.session.rollback()
+        
+        assert [task.title for task in Task.query.all()] == ['Kept']
@@ -0,0 +1,119 @@
+import json
+from datetime import datetime, timedelta
+from app import db
+from app.models import Task, Comment, ArchivedComment
+from app.services.archive_service import ArchiveService
+from app.services.purge_service import PurgeService
+
+def age_task(task_id, days=100):
+    """Pretend the task was last changed ``days`` ago."""
+    db.session.execute(Task.__table__.update().where(Task.__table__.c.id == task_id)
+                       .values(updated_at=datetime.utcnow() - timedelta(days=days)))
+    db.session.commit()
+
+class TestArchive:
+    """Test cases for archiving comments of completed tasks."""
+    
+    def test_archives_only_old_completed_tasks(self, client, task_with_comments):
+        """Test that recent or unfinished tasks keep their comments."""
+        old_id, _ = task_with_comments(client, status='completed')
+        recent_id, _ = task_with_comments(client, status='completed')
+        pending_id, _ = task_with_comments(client, status='pending')
+        age_task(old_id)
+        age_task(pending_id)
+        
+        archived = ArchiveService.archive_completed(timedelta(days=90))
+        
+        assert archived == {'comments': 3, 'tasks': 1}
+        assert Comment.query.filter_by(task_id=old_id).count() == 0
+        assert ArchivedComment.query.filter_by(task_id=old_id).count() == 3
+        assert Comment.query.count() == 6
+    
+    def test_new_comments_never_reuse_archived_ids(self, client, task_with_comments):
+        """Test that ids freed by archival are not handed out again."""
+        task_id, comment_ids = task_with_comments(client, status='completed')
+        age_task(task_id)
+        ArchiveService.archive_completed(timedelta(days=90))
+        
+        _, [new_id] = task_with_comments(client, comments=1)
+        
+        assert new_id > max(comment_ids)
+    
+    def test_archives_in_bounded_batches(self, client, task_with_comments):
+        """Test that archival moves at most batch_size comments per batch."""
+        task_id, _ = task_with_comments(client, comments=5, status='completed')
+        age_task(task_id)
+        
+        archived = ArchiveService.archive_completed(timedelta(days=90), batch_size=2, max_batches=2)
+        assert archived['comments'] == 4
+        
+        archived = ArchiveService.archive_completed(timedelta(days=90), batch_size=2)
+        assert archived['comments'] == 1
+        assert ArchivedComment.query.count() == 5
+    
+    def test_comments_fall_back_to_archive(self, client, send_json, task_with_comments):
+        """Test that listing a task's comments merges archived and live ones."""
+        task_id, comment_ids = task_with_comments(client, status='completed')
+        age_task(task_id)
+        ArchiveService.archive_completed(timedelta(days=90))
+        _, [other_id] = task_with_comments(client, comments=1)
+        
+        # A comment arriving after archival stays in the hot table
+        late_id = send_json(client, '/api/comments/', {
+            'content': 'Late reply', 'author_name': 'Test User', 'task_id': task_id
+        }).get_json()['id']
+        
+        data = json.loads(client.get(f'/api/comments/?task_id={task_id}').data)
+        
+        assert [c['id'] for c in data['comments']] == [late_id] + comment_ids[::-1]
+        assert data['comments'][1]['content'] == 'Comment 2'
+        assert other_id not in [c['id'] for c in data['comments']]
+    
+    def test_archival_keeps_task_version_and_count(self, client, task_with_comments):
+        """Test that archival changes neither the task's ETag nor its comments_count."""
+        task_id, _ = task_with_comments(client, status='completed')
+        age_task(task_id)
+        before = client.get(f'/api/tasks/{task_id}')
+        
+        ArchiveService.archive_completed(timedelta(days=90))
+        db.session.expire_all()
+        after = client.get(f'/api/tasks/{task_id}')
+        
+        assert after.headers['ETag'] == before.headers['ETag']
+        assert json.loads(after.data)['comments_count'] == 3
+        assert json.loads(after.data)['updated_at'] == json.loads(before.data)['updated_at']
+    
+    def test_deleted_comments_stay_hidden(self, client, task_with_comments):
+        """Test that soft-deleted comments are archived but not listed."""
+        task_id, comment_ids = task_with_comments(client, status='completed')
+        client.delete(f'/api/comments/{comment_ids[0]}')
+        age_task(task_id)
+        
+        ArchiveService.archive_completed(timedelta(days=90))
+        db.session.expire_all()
+        
+        data = json.loads(client.get(f'/api/tasks/{task_id}/comments').data)
+        assert data['comments_count'] == 2
+        assert data['task']['comments_count'] == 2
+    
+    def test_purge_removes_archived_comments_of_purged_tasks(self, client, task_with_comments):
+        """Test that purging a task also removes its archived comments."""
+        task_id, _ = task_with_comments(client, status='completed')
+        age_task(task_id)
+        ArchiveService.archive_completed(timedelta(days=90))
+        client.delete(f'/api/tasks/{task_id}')
+        
+        purged = PurgeService.purge_deleted(timedelta(0))
+        
+        assert purged == {'comments': 3, 'tasks': 1}
+        assert ArchivedComment.query.count() == 0
+    
+    def test_archive_cli_command(self, app, client, task_with_comments):
+        """Test the archive-comments CLI command."""
+        task_id, _ = task_with_comments(client, comments=2, status='completed')
+        age_task(task_id)
+        
+        result = app.test_cli_runner().invoke(args=['archive-comments', '--after-days', '30'])
+        
+        assert 'Archived 2 comments from 1 tasks' in result.output
+        assert Comment.query.count() == 0
@@ -0,0 +1,166 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import Task, Comment
+from app.services.change_service import ChangeCursor
+from app.services.task_service import TaskService
+
+@pytest.fixture(autouse=True)
+def no_safety_lag(app):
+    """Most tests read the feed right after writing to it."""
+    app.config['CHANGE_FEED_SAFETY_LAG_SECONDS'] = 0
+
+class TestChangeFeed:
+    """Test cases for the incremental change feed."""
+    
+    def _changes(self, client, since=None, limit=None):
+        query = []
+        if since:
+            query.append(f'since={since}')
+        if limit:
+            query.append(f'limit={limit}')
+        response = client.get('/api/changes/?' + '&'.join(query))
+        assert response.status_code == 200
+        return json.loads(response.data)
+    
+    def test_initial_sync_returns_everything_in_order(self, client, send_json):
+        """Test that a sync without a cursor returns all rows oldest first."""
+        task = send_json(client, '/api/tasks/', {'title': 'Sync me'}).get_json()
+        comment = send_json(client, '/api/comments/', {
+            'content': 'First', 'author_name': 'Ann', 'task_id': task['id']
+        }).get_json()
+        
+        data = self._changes(client)
+        
+        assert [(c['type'], c['id']) for c in data['changes']] == [('task', task['id']), ('comment', comment['id'])]
+        assert data['changes'][0]['data']['title'] == 'Sync me'
+        assert data['next_cursor'] is not None
+    
+    def test_incremental_sync_returns_only_new_changes(self, client, send_json):
+        """Test that a cursor skips everything the client has already seen."""
+        task = send_json(client, '/api/tasks/', {'title': 'Stable'}).get_json()
+        comment = send_json(client, '/api/comments/', {
+            'content': 'Draft', 'author_name': 'Ann', 'task_id': task['id']
+        }).get_json()
+        cursor = self._changes(client)['next_cursor']
+        
+        data = self._changes(client, since=cursor)
+        assert (data['changes'], data['has_more']) == ([], False)
+        # Same position, newer sync time
+        assert ChangeCursor.decode(data['next_cursor'])[:3] == ChangeCursor.decode(cursor)[:3]
+        
+        client.put(f"/api/comments/{comment['id']}", data=json.dumps({'content': 'Final'}),
+                   content_type='application/json')
+        data = self._changes(client, since=cursor)
+        
+        assert data['count'] == 1
+        assert data['changes'][0]['type'] == 'comment'
+        assert data['changes'][0]['data']['content'] == 'Final'
+    
+    def test_deletes_are_reported_as_tombstones(self, client, send_json):
+        """Test that soft-deleted rows come back as tombstones without data."""
+        task = send_json(client, '/api/tasks/', {'title': 'Short-lived'}).get_json()
+        cursor = self._changes(client)['next_cursor']
+        
+        client.delete(f"/api/tasks/{task['id']}")
+        data = self._changes(client, since=cursor)
+        
+        assert data['changes'] == [{
+            'type': 'task', 'id': task['id'], 'deleted': True,
+            'updated_at': data['changes'][0]['updated_at'], 'data': None
+        }]
+    
+    def test_restored_task_brings_back_its_comments(self, app, client, monkeypatch, send_json):
+        """Test that comments dropped with a task's tombstone are re-sent after a restore."""
+        monkeypatch.setattr(TaskService, 'RESTORE_BATCH_SIZE', 2)
+        task = send_json(client, '/api/tasks/', {'title': 'Comeback'}).get_json()
+        comments = [send_json(client, '/api/comments/', {'content': f'c{i}', 'author_name': 'Ann', 'task_id': task['id']}).get_json()
+                    for i in range(3)]
+        client.delete(f"/api/comments/{comments[2]['id']}")
+        client.delete(f"/api/tasks/{task['id']}")
+        
+        data = self._changes(client)
+        assert [(c['type'], c['deleted']) for c in data['changes'] if c['type'] == 'task'] == [('task', True)]
+        
+        client.post(f"/api/tasks/{task['id']}/restore")
+        data = self._changes(client, since=data['next_cursor'])
+        
+        assert [(c['type'], c['id'], c['deleted']) for c in data['changes']] == [
+            ('task', task['id'], False), ('comment', comments[0]['id'], False), ('comment', comments[1]['id'], False)
+        ]
+    
+    def test_pagination_breaks_timestamp_ties(self, app, client):
+        """Test that rows sharing an updated_at are paged without gaps or repeats."""
+        stamp = datetime.utcnow().replace(microsecond=0)
+        tasks = [Task(title=f'Task {i}') for i in range(3)]
+        db.session.add_all(tasks)
+        db.session.flush()
+        db.session.add_all([Comment(content='c', author_name='a', task_id=tasks[0].id) for _ in range(3)])
+        db.session.flush()
+        Task.query.update({'updated_at': stamp})
+        Comment.query.update({'updated_at': stamp})
+        db.session.commit()
+        
+        seen = []
+        cursor = None
+        while True:
+            data = self._changes(client, since=cursor, limit=2)
+            seen.extend((c['type'], c['id']) for c in data['changes'])
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                break
+        
+        assert len(seen) == 6 and len(set(seen)) == 6
+        assert [kind for kind, _ in seen] == ['task'] * 3 + ['comment'] * 3
+    
+    def test_invalid_and_expired_cursors(self, client):
+        """Test that malformed cursors are rejected and stale ones need a full sync."""
+        assert client.get('/api/changes/?since=not-a-cursor').status_code == 400
+        
+        stale = ChangeCursor(datetime.utcnow() - timedelta(days=30), 0, 1).encode()
+        response = client.get(f'/api/changes/?since={stale}')
+        assert response.status_code == 410
+    
+    def test_quiet_feed_keeps_cursors_fresh(self, app, client, send_json):
+        """Test that a cursor ages from the last sync, not from the last change."""
+        task = send_json(client, '/api/tasks/', {'title': 'Quiet'}).get_json()
+        month_ago = datetime.utcnow() - timedelta(days=30)
+        Task.query.filter_by(id=task['id']).update({'updated_at': month_ago})
+        db.session.commit()
+        
+        cursor = self._changes(client)['next_cursor']
+        assert ChangeCursor.decode(cursor).updated_at == month_ago
+        
+        data = self._changes(client, since=cursor)
+        assert data['count'] == 0
+        assert self._changes(client, since=data['next_cursor'])['count'] == 0
+        
+        forgotten = ChangeCursor.decode(cursor)._replace(synced_at=month_ago).encode()
+        assert client.get(f'/api/changes/?since={forgotten}').status_code == 410
+    
+    def test_late_commits_are_not_skipped(self, app, client):
+        """Test that a change stamped before a newer one but committed after it is still seen."""
+        app.config['CHANGE_FEED_SAFETY_LAG_SECONDS'] = 60
+        now = datetime.utcnow()
+        early, recent = Task(title='Early'), Task(title='Recent')
+        db.session.add_all([early, recent])
+        db.session.commit()
+        Task.query.filter_by(id=early.id).update({'updated_at': now - timedelta(minutes=2)})
+        Task.query.filter_by(id=recent.id).update({'updated_at': now - timedelta(seconds=10)})
+        db.session.commit()
+        
+        data = self._changes(client)
+        assert [c['id'] for c in data['changes']] == [early.id]
+        assert ChangeCursor.decode(data['next_cursor']).synced_at <= now - timedelta(seconds=59)
+        
+        # Stamped 30 seconds ago, before ``recent``, but only committed now
+        late = Task(title='Late')
+        db.session.add(late)
+        db.session.flush()
+        Task.query.filter_by(id=late.id).update({'updated_at': now - timedelta(seconds=30)})
+        db.session.commit()
+        
+        app.config['CHANGE_FEED_SAFETY_LAG_SECONDS'] = 0
+        data = self._changes(client, since=data['next_cursor'])
+        assert [c['id'] for c in data['changes']] == [late.id, recent.id]
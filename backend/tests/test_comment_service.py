@@ -71,7 +71,7 @@ class TestCommentService:
         }
         
         with app.app_context():
-            with pytest.raises(ValueError, match="Content and author_name are required"):
+            with pytest.raises(ValueError, match="Content is required"):
                 CommentService.create_comment(comment_data)
     
     def test_create_comment_missing_author(self, app, sample_task):
@@ -82,7 +82,7 @@ class TestCommentService:
         }
         
         with app.app_context():
-            with pytest.raises(ValueError, match="Content and author_name are required"):
+            with pytest.raises(ValueError, match="Author name is required"):
                 CommentService.create_comment(comment_data)
     
     def test_update_comment_success(self, app, sample_comment):
@@ -148,7 +148,7 @@ class TestCommentService:
         # Missing required fields
         invalid_data = {'content': 'Test comment'}
         
-        with pytest.raises(ValueError, match="Content and author_name are required"):
+        with pytest.raises(ValueError, match="Author name is required"):
             CommentService.validate_comment_data(invalid_data)
         
         # Invalid email
@@ -0,0 +1,101 @@
+import json
+from sqlalchemy import event
+from app import db
+
+def post_comment(client, task_id, content, parent_id=None):
+    payload = {'content': content, 'author_name': 'Test User', 'task_id': task_id}
+    if parent_id is not None:
+        payload['parent_id'] = parent_id
+    response = client.post('/api/comments/',
+                           data=json.dumps(payload),
+                           content_type='application/json')
+    return response
+
+def build_thread(client):
+    """Create a task with the thread a > (a1 > a1x, a2), b."""
+    response = client.post('/api/tasks/',
+                           data=json.dumps({'title': 'Discussion'}),
+                           content_type='application/json')
+    task_id = json.loads(response.data)['id']
+    ids = {}
+    ids['a'] = json.loads(post_comment(client, task_id, 'a').data)['id']
+    ids['b'] = json.loads(post_comment(client, task_id, 'b').data)['id']
+    ids['a1'] = json.loads(post_comment(client, task_id, 'a1', ids['a']).data)['id']
+    ids['a2'] = json.loads(post_comment(client, task_id, 'a2', ids['a']).data)['id']
+    ids['a1x'] = json.loads(post_comment(client, task_id, 'a1x', ids['a1']).data)['id']
+    return task_id, ids
+
+def contents(response):
+    return [comment['content'] for comment in json.loads(response.data)['comments']]
+
+class TestCommentThreads:
+    """Test cases for threaded comments."""
+    
+    def test_reply_records_parent_and_depth(self, client):
+        """Test that replies carry their parent and depth."""
+        task_id, ids = build_thread(client)
+        
+        data = json.loads(client.get(f"/api/comments/{ids['a1x']}").data)
+        
+        assert data['parent_id'] == ids['a1']
+        assert data['depth'] == 2
+    
+    def test_task_thread_in_display_order(self, client):
+        """Test that a task thread is returned depth-first, oldest reply first."""
+        task_id, ids = build_thread(client)
+        
+        response = client.get(f'/api/comments/task/{task_id}/thread')
+        
+        assert response.status_code == 200
+        assert contents(response) == ['a', 'a1', 'a1x', 'a2', 'b']
+    
+    def test_subtree_with_depth_limit(self, client):
+        """Test loading a subtree limited to direct replies."""
+        task_id, ids = build_thread(client)
+        
+        response = client.get(f"/api/comments/{ids['a']}/thread?max_depth=1")
+        
+        assert contents(response) == ['a', 'a1', 'a2']
+        assert json.loads(response.data)['root_id'] == ids['a']
+    
+    def test_thread_pagination(self, client):
+        """Test cursor pagination through a thread."""
+        task_id, ids = build_thread(client)
+        
+        first = json.loads(client.get(f'/api/comments/task/{task_id}/thread?limit=3').data)
+        second = json.loads(client.get(
+            f"/api/comments/task/{task_id}/thread?limit=3&after={first['next_cursor']}").data)
+        
+        assert [c['content'] for c in first['comments']] == ['a', 'a1', 'a1x']
+        assert [c['content'] for c in second['comments']] == ['a2', 'b']
+        assert second['next_cursor'] is None
+    
+    def test_subtree_is_a_single_query(self, app, client):
+        """Test that a whole subtree loads with one SELECT on comments."""
+        task_id, ids = build_thread(client)
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            client.get(f"/api/comments/{ids['a']}/thread")
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        # One lookup for the root comment, one range scan for the subtree
+        assert len([s for s in statements if 'FROM comments' in s]) == 2
+    
+    def test_reply_to_comment_on_other_task(self, client):
+        """Test that a reply must belong to the parent's task."""
+        task_id, ids = build_thread(client)
+        response = client.post('/api/tasks/',
+                               data=json.dumps({'title': 'Other'}),
+                               content_type='application/json')
+        other_task_id = json.loads(response.data)['id']
+        
+        response = post_comment(client, other_task_id, 'misplaced', ids['a'])
+        
+        assert response.status_code == 400
+        assert 'Parent comment' in json.loads(response.data)['error']
@@ -0,0 +1,89 @@
+import pytest
+import threading
+from app import create_app, db
+from app.models import Task, Comment, Event
+from app.services.comment_service import CommentService
+
+@pytest.fixture
+def group_commit_app(tmp_path, monkeypatch):
+    """Create an application with group commit enabled on a file database."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'group_commit.db'}")
+    monkeypatch.setenv('COMMENT_GROUP_COMMIT', 'true')
+    monkeypatch.setenv('COMMENT_GROUP_COMMIT_WINDOW_MS', '50')
+    app = create_app('testing')
+    
+    with app.app_context():
+        db.create_all()
+        task = Task(title="Incident")
+        db.session.add(task)
+        db.session.commit()
+        app.config['TEST_TASK_ID'] = task.id
+    
+    yield app
+    
+    app.extensions['comment_writer'].stop()
+
+class TestCommentBatchWriter:
+    """Test cases for group-commit comment creation."""
+    
+    def test_create_comment_uses_writer(self, group_commit_app):
+        """Test that the service returns a committed, serializable comment."""
+        task_id = group_commit_app.config['TEST_TASK_ID']
+        
+        with group_commit_app.app_context():
+            comment = CommentService.create_comment({
+                'content': 'Looking into it',
+                'author_name': 'On-call',
+                'task_id': task_id
+            })
+            assert comment.id is not None
+            assert comment.to_dict()['task_id'] == task_id
+            assert Comment.query.count() == 1
+            assert Event.query.filter_by(entity_type='comment', entity_id=comment.id).count() == 1
+    
+    def test_concurrent_comments_share_commits(self, group_commit_app):
+        """Test that a burst of comments is committed in fewer transactions."""
+        task_id = group_commit_app.config['TEST_TASK_ID']
+        writer = group_commit_app.extensions['comment_writer']
+        ids = []
+        errors = []
+        
+        def post_comment(i):
+            with group_commit_app.app_context():
+                try:
+                    comment = CommentService.create_comment({
+                        'content': f'Comment {i}',
+                        'author_name': 'Responder',
+                        'task_id': task_id
+                    })
+                    ids.append(comment.id)
+                except Exception as e:
+                    errors.append(e)
+        
+        threads = [threading.Thread(target=post_comment, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert len(set(ids)) == 20
+        assert writer.batches_committed < 20
+        with group_commit_app.app_context():
+            assert Comment.query.count() == 20
+    
+    def test_failed_insert_does_not_fail_batch(self, group_commit_app):
+        """Test that one bad comment only fails its own request."""
+        task_id = group_commit_app.config['TEST_TASK_ID']
+        writer = group_commit_app.extensions['comment_writer']
+        
+        good = writer.submit(Comment(content='ok', author_name='A', task_id=task_id))
+        bad = writer.submit(Comment(content='missing task', author_name='B', task_id=None))
+        also_good = writer.submit(Comment(content='ok too', author_name='C', task_id=task_id))
+        
+        assert good.result(timeout=5).id is not None
+        assert also_good.result(timeout=5).id is not None
+        with pytest.raises(Exception):
+            bad.result(timeout=5)
+        with group_commit_app.app_context():
+            assert Comment.query.count() == 2
@@ -0,0 +1,86 @@
+import gzip
+import json
+import zlib
+from flask import current_app
+from app.compression import choose_encoding
+
+class TestCompression:
+    """Test cases for response compression."""
+
+    def _create_thread(self, client, comments=30):
+        response = client.post('/api/tasks/',
+                             data=json.dumps({'title': 'Busy Task'}),
+                             content_type='application/json')
+        task_id = json.loads(response.data)['id']
+        for i in range(comments):
+            client.post('/api/comments/',
+                        data=json.dumps({
+                            'content': f'Comment number {i} with some repetitive text',
+                            'author_name': 'Test User',
+                            'task_id': task_id
+                        }),
+                        content_type='application/json')
+        return task_id
+
+    def test_choose_encoding(self):
+        """Test Accept-Encoding negotiation."""
+        assert choose_encoding('') is None
+        assert choose_encoding('identity') is None
+        assert choose_encoding('gzip, deflate') == 'gzip'
+        assert choose_encoding('gzip;q=0.5, deflate') == 'deflate'
+        assert choose_encoding('gzip;q=0, *;q=0.1') == 'deflate'
+
+    def test_large_response_is_gzipped(self, client):
+        """Test that responses above the threshold are compressed."""
+        task_id = self._create_thread(client)
+
+        response = client.get(f'/api/comments/task/{task_id}',
+                              headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert int(response.headers['Content-Length']) == len(response.data)
+        data = json.loads(gzip.decompress(response.data))
+        assert data['count'] == 30
+
+    def test_deflate_response(self, client):
+        """Test deflate encoding when gzip is not accepted."""
+        task_id = self._create_thread(client)
+
+        response = client.get(f'/api/comments/task/{task_id}',
+                              headers={'Accept-Encoding': 'deflate'})
+
+        assert response.headers['Content-Encoding'] == 'deflate'
+        data = json.loads(zlib.decompress(response.data))
+        assert data['task_id'] == task_id
+
+    def test_small_response_not_compressed(self, client):
+        """Test that responses below the threshold are sent as-is."""
+        response = client.get('/api/tasks/', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert json.loads(response.data)['count'] == 0
+
+    def test_no_accept_encoding(self, client):
+        """Test that clients without Accept-Encoding get identity responses."""
+        task_id = self._create_thread(client)
+
+        response = client.get(f'/api/comments/task/{task_id}')
+
+        assert 'Content-Encoding' not in response.headers
+        assert json.loads(response.data)['count'] == 30
+
+    def test_compressed_body_is_cached(self, client):
+        """Test that repeated hot payloads reuse the cached compressed body."""
+        task_id = self._create_thread(client)
+        cache = current_app.extensions['compress'].cache
+        cache.clear()
+
+        first = client.get(f'/api/comments/task/{task_id}', headers={'Accept-Encoding': 'gzip'})
+        second = client.get(f'/api/comments/task/{task_id}', headers={'Accept-Encoding': 'gzip'})
+
+        assert first.data == second.data
+        assert cache.misses == 1
+        assert cache.hits == 1
@@ -0,0 +1,106 @@
+import pytest
+import json
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.models import Task, Comment
+
+@pytest.fixture
+def seeded_app(file_app):
+    """File-backed app with one task and one comment."""
+    with file_app.app_context():
+        task = Task(title="Shared Task")
+        db.session.add(task)
+        db.session.commit()
+        comment = Comment(content="Shared comment", author_name="Author", task_id=task.id)
+        db.session.add(comment)
+        db.session.commit()
+        file_app.config['TEST_TASK_ID'] = task.id
+        file_app.config['TEST_COMMENT_ID'] = comment.id
+    return file_app
+
+def fire_simultaneous_puts(app, url, payloads):
+    """Send PUTs from several threads that all read before any of them writes."""
+    barrier = threading.Barrier(len(payloads))
+    
+    def wait_for_all(session, flush_context, instances):
+        barrier.wait(timeout=5)
+    
+    event.listen(Session, 'before_flush', wait_for_all)
+    statuses = []
+    
+    def put(payload):
+        response = app.test_client().put(url,
+                                         data=json.dumps(payload),
+                                         content_type='application/json',
+                                         headers={'If-Match': '"1"'})
+        statuses.append(response.status_code)
+    
+    try:
+        threads = [threading.Thread(target=put, args=(payload,)) for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        event.remove(Session, 'before_flush', wait_for_all)
+    return sorted(statuses)
+
+class TestOptimisticConcurrency:
+    """Test cases for version-checked updates."""
+    
+    def test_responses_carry_version_etag(self, seeded_app):
+        """Test that reads and writes expose the row version as ETag."""
+        client = seeded_app.test_client()
+        task_id = seeded_app.config['TEST_TASK_ID']
+        
+        response = client.get(f'/api/tasks/{task_id}')
+        assert response.headers['ETag'] == '"1"'
+        assert json.loads(response.data)['version'] == 1
+        
+        response = client.put(f'/api/tasks/{task_id}',
+                              data=json.dumps({'title': 'Renamed'}),
+                              content_type='application/json',
+                              headers={'If-Match': '"1"'})
+        assert response.status_code == 200
+        assert response.headers['ETag'] == '"2"'
+    
+    def test_stale_if_match_returns_412(self, seeded_app):
+        """Test that an outdated If-Match is rejected before writing."""
+        client = seeded_app.test_client()
+        comment_id = seeded_app.config['TEST_COMMENT_ID']
+        
+        client.put(f'/api/comments/{comment_id}',
+                   data=json.dumps({'content': 'First edit'}),
+                   content_type='application/json')
+        response = client.put(f'/api/comments/{comment_id}',
+                              data=json.dumps({'content': 'Based on stale copy'}),
+                              content_type='application/json',
+                              headers={'If-Match': '"1"'})
+        
+        assert response.status_code == 412
+        with seeded_app.app_context():
+            assert Comment.query.get(comment_id).content == 'First edit'
+    
+    def test_simultaneous_task_updates(self, seeded_app):
+        """Test that only one of several racing task updates wins."""
+        task_id = seeded_app.config['TEST_TASK_ID']
+        payloads = [{'title': f'Writer {i}'} for i in range(4)]
+        
+        statuses = fire_simultaneous_puts(seeded_app, f'/api/tasks/{task_id}', payloads)
+        
+        assert statuses == [200, 409, 409, 409]
+        with seeded_app.app_context():
+            assert Task.query.get(task_id).version == 2
+    
+    def test_simultaneous_comment_updates(self, seeded_app):
+        """Test that only one of several racing comment updates wins."""
+        comment_id = seeded_app.config['TEST_COMMENT_ID']
+        payloads = [{'content': f'Edit {i}'} for i in range(4)]
+        
+        statuses = fire_simultaneous_puts(seeded_app, f'/api/comments/{comment_id}', payloads)
+        
+        assert statuses == [200, 409, 409, 409]
+        with seeded_app.app_context():
+            assert Comment.query.get(comment_id).version == 2
@@ -0,0 +1,115 @@
+import json
+from datetime import datetime, timedelta
+from app import db
+from app.models import Task, Comment, IdempotencyKey
+from app.services.comment_service import CommentService
+from app.services.idempotency_service import IdempotencyService
+
+class TestIdempotencyKeys:
+    """Test cases for Idempotency-Key handling on POST routes."""
+    
+    def test_retry_replays_original_response(self, client, send_json):
+        """Test that a retried task creation returns the first response without a duplicate."""
+        first = send_json(client, '/api/tasks/', {'title': 'Once'}, {'Idempotency-Key': 'abc-1'})
+        retry = send_json(client, '/api/tasks/', {'title': 'Once'}, {'Idempotency-Key': 'abc-1'})
+        
+        assert first.status_code == retry.status_code == 201
+        assert retry.data == first.data
+        assert retry.headers['ETag'] == first.headers['ETag']
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert 'Idempotent-Replayed' not in first.headers
+        assert Task.query.count() == 1
+    
+    def test_retry_does_not_rerun_service(self, client, sample_task, monkeypatch, send_json):
+        """Test that a retried comment never reaches CommentService.create_comment."""
+        calls = []
+        original = CommentService.create_comment
+        monkeypatch.setattr(CommentService, 'create_comment',
+                            staticmethod(lambda data: calls.append(data) or original(data)))
+        payload = {'content': 'Hello', 'author_name': 'Ann', 'task_id': sample_task.id}
+        
+        send_json(client, '/api/comments/', payload, {'Idempotency-Key': 'comment-1'})
+        send_json(client, '/api/comments/', payload, {'Idempotency-Key': 'comment-1'})
+        
+        assert len(calls) == 1
+        assert Comment.query.count() == 1
+    
+    def test_key_reuse_with_different_body(self, client, send_json):
+        """Test that a key cannot be reused for a different request."""
+        send_json(client, '/api/tasks/', {'title': 'A'}, {'Idempotency-Key': 'reused'})
+        response = send_json(client, '/api/tasks/', {'title': 'B'}, {'Idempotency-Key': 'reused'})
+        
+        assert response.status_code == 422
+        assert Task.query.count() == 1
+    
+    def test_keys_are_scoped_per_client(self, app, client, send_json):
+        """Test that two clients using the same key both get their own result."""
+        app.config['API_KEYS'] = {'alice': 'default', 'bob': 'default'}
+        send_json(client, '/api/tasks/', {'title': 'Mine'}, {'Idempotency-Key': 'k', 'X-API-Key': 'alice'})
+        response = send_json(client, '/api/tasks/', {'title': 'Mine'}, {'Idempotency-Key': 'k', 'X-API-Key': 'bob'})
+        
+        assert 'Idempotent-Replayed' not in response.headers
+        assert Task.query.count() == 2
+    
+    def test_in_progress_and_expired_keys(self, app, client, send_json):
+        """Test that a running request blocks retries and expired keys are reclaimed."""
+        payload = json.dumps({'title': 'Slow'})
+        key_hash = IdempotencyService.digest('default', '127.0.0.1', 'POST', '/api/tasks/', 'slow')
+        db.session.add(IdempotencyKey(key_hash=key_hash, request_hash=IdempotencyService.digest(payload),
+                                      locked_until=datetime.utcnow() + timedelta(minutes=1),
+                                      expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db.session.commit()
+        
+        assert send_json(client, '/api/tasks/', {'title': 'Slow'}, {'Idempotency-Key': 'slow'}).status_code == 409
+        
+        db.session.get(IdempotencyKey, key_hash).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert send_json(client, '/api/tasks/', {'title': 'Slow'}, {'Idempotency-Key': 'slow'}).status_code == 201
+    
+    def test_abandoned_claim_is_taken_over_after_its_lock(self, app, client, send_json):
+        """Test that a request that died mid-flight blocks retries only until its lock passes."""
+        payload = json.dumps({'title': 'Crashed'})
+        key_hash = IdempotencyService.digest('default', '127.0.0.1', 'POST', '/api/tasks/', 'crash')
+        # The original request claimed the key, then died; its lock has already passed
+        stale, created = IdempotencyService.begin(key_hash, IdempotencyService.digest(payload),
+                                                  timedelta(hours=1), timedelta(seconds=-1))
+        assert created
+        
+        other = send_json(client, '/api/tasks/', {'title': 'Other'}, {'Idempotency-Key': 'crash'})
+        retry = send_json(client, '/api/tasks/', {'title': 'Crashed'}, {'Idempotency-Key': 'crash'})
+        replay = send_json(client, '/api/tasks/', {'title': 'Crashed'}, {'Idempotency-Key': 'crash'})
+        
+        assert other.status_code == 422
+        assert retry.status_code == 201
+        assert replay.headers['Idempotent-Replayed'] == 'true'
+        assert Task.query.count() == 1
+        # The claim taken over cannot overwrite the stored response
+        assert not IdempotencyService.complete(stale, 500, '{}', None)
+    
+    def test_lost_claim_race_returns_409(self, app, client, send_json, monkeypatch):
+        """Test that a claim whose competing row vanished before it could be read is not a 500."""
+        payload = json.dumps({'title': 'Racy'})
+        key_hash = IdempotencyService.digest('default', '127.0.0.1', 'POST', '/api/tasks/', 'racy')
+        now = datetime.utcnow()
+        db.session.add(IdempotencyKey(key_hash=key_hash, request_hash=IdempotencyService.digest(payload),
+                                      locked_until=now + timedelta(minutes=1), expires_at=now + timedelta(hours=1)))
+        db.session.commit()
+        # Every read misses the row, as if it were abandoned between the insert and the read
+        monkeypatch.setattr(db.session, 'get', lambda *args, **kwargs: None, raising=False)
+        
+        response = send_json(client, '/api/tasks/', {'title': 'Racy'}, {'Idempotency-Key': 'racy'})
+        
+        assert response.status_code == 409
+        assert Task.query.count() == 0
+    
+    def test_purge_expired(self, app):
+        """Test that only expired keys are purged."""
+        now = datetime.utcnow()
+        db.session.add_all([
+            IdempotencyKey(key_hash='a' * 64, request_hash='x', locked_until=now, expires_at=now - timedelta(hours=1)),
+            IdempotencyKey(key_hash='b' * 64, request_hash='x', locked_until=now, expires_at=now + timedelta(hours=1))
+        ])
+        db.session.commit()
+        
+        assert IdempotencyService.purge_expired(batch_size=1) == 1
+        assert [key.key_hash for key in IdempotencyKey.query.all()] == ['b' * 64]
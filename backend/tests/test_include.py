@@ -0,0 +1,93 @@
+import json
+from datetime import datetime, timedelta
+from app import db
+from app.models import Task, Comment
+
+def add_comments(task, count, start=None):
+    """Add ``count`` comments to a task, one minute apart, oldest first."""
+    start = start or datetime(2024, 1, 1)
+    comments = [
+        Comment(content=f'{task.title} #{i}', author_name='Test User', task_id=task.id,
+                created_at=start + timedelta(minutes=i))
+        for i in range(count)
+    ]
+    db.session.add_all(comments)
+    db.session.commit()
+    return comments
+
+class TestIncludeComments:
+    """Test cases for embedding comments with ?include=comments."""
+    
+    def test_list_without_include_has_no_comments(self, client, sample_comment):
+        """Test that tasks omit comments unless asked for them."""
+        data = json.loads(client.get('/api/tasks/').data)
+        
+        assert 'comments' not in data['tasks'][0]
+    
+    def test_list_embeds_latest_comments_per_task(self, client, app):
+        """Test that each task embeds its newest comments, newest first."""
+        with app.app_context():
+            busy, quiet, silent = Task(title='Busy'), Task(title='Quiet'), Task(title='Silent')
+            db.session.add_all([busy, quiet, silent])
+            db.session.commit()
+            add_comments(busy, 5)
+            add_comments(quiet, 1)
+        
+        response = client.get('/api/tasks/?include=comments&comments_limit=2')
+        
+        assert response.status_code == 200
+        tasks = {task['title']: task for task in json.loads(response.data)['tasks']}
+        assert [c['content'] for c in tasks['Busy']['comments']] == ['Busy #4', 'Busy #3']
+        assert [c['content'] for c in tasks['Quiet']['comments']] == ['Quiet #0']
+        assert tasks['Silent']['comments'] == []
+        assert tasks['Busy']['comments_count'] == 5
+    
+    def test_list_skips_deleted_comments(self, client, app, sample_task):
+        """Test that soft-deleted comments are not embedded."""
+        with app.app_context():
+            comments = add_comments(sample_task, 2)
+            client.delete(f'/api/comments/{comments[1].id}')
+        
+        data = json.loads(client.get('/api/tasks/?include=comments').data)
+        
+        assert [c['id'] for c in data['tasks'][0]['comments']] == [comments[0].id]
+    
+    def test_list_loads_comments_in_one_query(self, client, app, statements):
+        """Test that embedding comments costs one SELECT however many tasks there are."""
+        with app.app_context():
+            tasks = [Task(title=f'Task {i}') for i in range(10)]
+            db.session.add_all(tasks)
+            db.session.commit()
+            for task in tasks:
+                add_comments(task, 4)
+        statements.clear()
+        
+        response = client.get('/api/tasks/?include=comments')
+        
+        assert response.status_code == 200
+        assert all(len(task['comments']) == 3 for task in json.loads(response.data)['tasks'])
+        assert statements == ['SELECT', 'SELECT']
+    
+    def test_get_task_embeds_comments_with_etag(self, client, app, sample_task):
+        """Test that a single task embeds comments and keeps its ETag."""
+        with app.app_context():
+            add_comments(sample_task, 4)
+        
+        response = client.get(f'/api/tasks/{sample_task.id}?include=comments&comments_limit=50')
+        
+        assert response.status_code == 200
+        assert response.headers['ETag'] == f'"{sample_task.version}"'
+        assert len(json.loads(response.data)['comments']) == 4
+    
+    def test_unknown_include_returns_400(self, client, sample_task):
+        """Test that unknown relations are rejected."""
+        response = client.get(f'/api/tasks/{sample_task.id}?include=owner')
+        
+        assert response.status_code == 400
+        assert 'owner' in json.loads(response.data)['error']
+    
+    def test_comments_limit_out_of_range_returns_400(self, client, sample_task):
+        """Test that comments_limit must be between 1 and 50."""
+        for limit in (0, 51):
+            response = client.get(f'/api/tasks/?include=comments&comments_limit={limit}')
+            assert response.status_code == 400
@@ -0,0 +1,261 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.jobs import HANDLERS
+from app.models import Task, Comment, Job
+from app.services.comment_service import CommentService
+from app.services.exceptions import LeaseLostError
+from app.services.job_service import JobService
+from app.worker import Worker, execute_job
+
+@pytest.fixture
+def export_dir(app, tmp_path):
+    app.config['JOB_EXPORT_DIR'] = str(tmp_path)
+    return tmp_path
+
+class TestJobRoutes:
+    """Test cases for queueing jobs and reading their status over HTTP."""
+    
+    def test_create_and_get_job(self, client, sample_task):
+        """Test that a queued job is returned with a Location to poll."""
+        response = client.post('/api/jobs/', data=json.dumps({
+            'kind': 'export-task', 'payload': {'task_id': sample_task.id}
+        }), content_type='application/json')
+        
+        assert response.status_code == 202
+        job = json.loads(response.data)
+        assert job['status'] == 'queued'
+        assert response.headers['Location'].endswith(f"/api/jobs/{job['id']}")
+        
+        data = json.loads(client.get(f"/api/jobs/{job['id']}").data)
+        assert data['kind'] == 'export-task'
+        assert data['progress'] == {'done': 0, 'total': None}
+    
+    def test_maintenance_jobs_cannot_be_queued_over_http(self, client):
+        """Test that CLI-only and unknown kinds are rejected."""
+        for kind in ('purge-deleted', 'nope'):
+            response = client.post('/api/jobs/', data=json.dumps({'kind': kind}), content_type='application/json')
+            assert response.status_code == 400
+    
+    def test_get_missing_job_returns_404(self, client):
+        """Test that unknown job ids return 404."""
+        assert client.get('/api/jobs/999').status_code == 404
+
+class TestJobExecution:
+    """Test cases for running, retrying and claiming jobs."""
+    
+    def _run(self, app, job):
+        [job_id] = JobService.claim('test', 1, timedelta(minutes=10))
+        assert job_id == job.id
+        return execute_job(job_id, app)
+    
+    def test_export_task(self, app, sample_comment, export_dir):
+        """Test that an export writes the task and its comments and reports progress."""
+        job = JobService.enqueue('export-task', {'task_id': sample_comment.task_id})
+        
+        assert self._run(app, job) == 'succeeded'
+        
+        data = JobService.get_job(job.id).to_dict()
+        assert data['progress'] == {'done': 1, 'total': 1}
+        with open(data['result']['path']) as f:
+            exported = json.load(f)
+        assert exported['comments'][0]['content'] == sample_comment.content
+    
+    def test_import_resumes_after_reported_progress(self, app, sample_task):
+        """Test that a retried import skips the comments it already created."""
+        comments = [{'content': f'Imported {i}', 'author_name': 'Importer'} for i in range(3)]
+        job = JobService.enqueue('import-comments', {'task_id': sample_task.id, 'comments': comments})
+        job.progress_done = 1
+        db.session.commit()
+        
+        assert self._run(app, job) == 'succeeded'
+        
+        assert sorted(c.content for c in Comment.query.all()) == ['Imported 1', 'Imported 2']
+        assert JobService.get_job(job.id).progress_done == 3
+    
+    def test_maintenance_jobs_report_progress_per_batch(self, app, client, monkeypatch):
+        """Test that purge and archive jobs report progress per batch."""
+        reports = []
+        monkeypatch.setattr(JobService, 'report_progress',
+                            lambda job_id, worker, attempt, done, total=None: reports.append((job_id, done)))
+        for i in range(3):
+            client.post('/api/tasks/', data=json.dumps({'title': f'Doomed {i}'}), content_type='application/json')
+        for task in Task.query.all():
+            client.delete(f'/api/tasks/{task.id}')
+        completed = Task(title='Done', status='completed')
+        db.session.add(completed)
+        db.session.flush()
+        db.session.add_all([Comment(content=f'c{i}', author_name='a', task_id=completed.id) for i in range(3)])
+        db.session.commit()
+        
+        purge = JobService.enqueue('purge-deleted', {'grace_hours': 0, 'batch_size': 2})
+        assert self._run(app, purge) == 'succeeded'
+        archive = JobService.enqueue('archive-comments', {'after_days': 0, 'batch_size': 2})
+        assert self._run(app, archive) == 'succeeded'
+        
+        assert [done for job_id, done in reports if job_id == purge.id] == [2, 3]
+        assert [done for job_id, done in reports if job_id == archive.id] == [2, 3]
+    
+    def test_claim_is_exclusive(self, app):
+        """Test that a claimed job is not handed to a second worker."""
+        JobService.enqueue('purge-deleted')
+        
+        assert len(JobService.claim('first', 5, timedelta(minutes=10))) == 1
+        assert JobService.claim('second', 5, timedelta(minutes=10)) == []
+    
+    def test_expired_lease_is_reclaimed(self, app):
+        """Test that a running job whose worker went quiet can be claimed again."""
+        job = JobService.enqueue('purge-deleted')
+        JobService.claim('dead', 1, timedelta(minutes=10))
+        job = JobService.get_job(job.id)
+        job.heartbeat_at = datetime.utcnow() - timedelta(minutes=20)
+        db.session.commit()
+        
+        assert JobService.claim('alive', 1, timedelta(minutes=10)) == [job.id]
+        assert JobService.get_job(job.id).attempts == 2
+    
+    def test_stale_attempt_cannot_touch_the_reclaimed_job(self, app):
+        """Test that updates from an attempt whose lease ran out change nothing."""
+        job = JobService.enqueue('purge-deleted')
+        JobService.claim('dead', 1, timedelta(minutes=10))
+        job = JobService.get_job(job.id)
+        job.heartbeat_at = datetime.utcnow() - timedelta(minutes=20)
+        db.session.commit()
+        JobService.claim('alive', 1, timedelta(minutes=10))
+        
+        assert not JobService.heartbeat(job.id, 'dead', 1)
+        with pytest.raises(LeaseLostError):
+            JobService.report_progress(job.id, 'dead', 1, 5)
+        assert not JobService.succeed(job.id, 'dead', 1, {'stale': True})
+        assert not JobService.fail(job.id, 'dead', 1, 'stale', timedelta(0))
+        
+        job = JobService.get_job(job.id)
+        assert (job.status, job.worker, job.attempts) == ('running', 'alive', 2)
+        assert (job.progress_done, job.result, job.error) == (0, None, None)
+        assert JobService.succeed(job.id, 'alive', 2, {'ok': True})
+    
+    def test_lost_lease_stops_the_handler(self, app, sample_task, monkeypatch):
+        """Test that a handler's next progress report ends an attempt that was claimed again."""
+        comments = [{'content': f'Imported {i}', 'author_name': 'Importer'} for i in range(3)]
+        job = JobService.enqueue('import-comments', {'task_id': sample_task.id, 'comments': comments})
+        [job_id] = JobService.claim('first', 1, timedelta(minutes=10))
+        original = CommentService.create_comment
+        
+        def create_and_lose_lease(data):
+            comment = original(data)
+            Job.query.filter_by(id=job_id).update({'worker': 'second', 'attempts': Job.attempts + 1})
+            return comment
+        
+        monkeypatch.setattr(CommentService, 'create_comment', staticmethod(create_and_lose_lease))
+        
+        assert execute_job(job_id, app) == 'running'
+        assert Comment.query.count() == 1
+        assert JobService.get_job(job.id).worker == 'second'
+    
+    def test_missing_job_is_skipped(self, app):
+        """Test that a claimed job deleted before it ran is skipped."""
+        assert execute_job(999, app) is None
+
+class TestWorker:
+    """Test cases for the worker loop and retries against a file database."""
+    
+    def _seed(self, app, jobs):
+        with app.app_context():
+            task = Task(title='Exported', status='completed')
+            db.session.add(task)
+            db.session.commit()
+            return [JobService.enqueue('export-task', {'task_id': task.id}).id for _ in range(jobs)]
+    
+    def _statuses(self, app, job_ids):
+        with app.app_context():
+            return [db.session.get(Job, job_id).status for job_id in job_ids]
+    
+    def test_thread_pool_runs_all_jobs(self, file_app, tmp_path):
+        """Test that a burst worker drains the queue on a thread pool."""
+        file_app.config['JOB_EXPORT_DIR'] = str(tmp_path / 'exports')
+        job_ids = self._seed(file_app, 5)
+        
+        ran = Worker(file_app, concurrency=3, poll_interval=0.05).run(burst=True)
+        
+        assert ran == 5
+        assert self._statuses(file_app, job_ids) == ['succeeded'] * 5
+    
+    def test_process_pool_runs_jobs(self, file_app, tmp_path, monkeypatch):
+        """Test that jobs also run in worker processes with their own app."""
+        monkeypatch.setenv('JOB_EXPORT_DIR', str(tmp_path / 'exports'))
+        job_ids = self._seed(file_app, 2)
+        
+        ran = Worker(file_app, concurrency=2, mode='process', poll_interval=0.05).run(burst=True)
+        
+        assert ran == 2
+        assert self._statuses(file_app, job_ids) == ['succeeded'] * 2
+    
+    def test_failed_attempt_is_retried_with_backoff(self, file_app):
+        """Test that a failure requeues the job until attempts run out."""
+        with file_app.app_context():
+            job_id = JobService.enqueue('export-task', {'task_id': 999}, max_attempts=2).id
+        
+        def attempt():
+            with file_app.app_context():
+                assert JobService.claim('test', 1, timedelta(minutes=10)) == [job_id]
+            return execute_job(job_id, file_app)
+        
+        assert attempt() == 'queued'
+        with file_app.app_context():
+            job = JobService.get_job(job_id)
+            assert job.attempts == 1
+            assert 'Task with ID 999 not found' in job.error
+            assert job.run_after > datetime.utcnow()
+            assert JobService.claim('test', 1, timedelta(minutes=10)) == []
+            
+            job.run_after = datetime.utcnow()
+            db.session.commit()
+        
+        assert attempt() == 'failed'
+        with file_app.app_context():
+            assert JobService.get_job(job_id).finished_at is not None
+    
+    def test_heartbeat_renews_lease_of_a_quiet_handler(self, file_app, monkeypatch):
+        """Test that a handler that reports no progress keeps its job while it runs."""
+        file_app.config['JOB_LEASE_SECONDS'] = 0.3
+        lease = timedelta(seconds=0.3)
+        started, release = threading.Event(), threading.Event()
+        
+        def quiet(payload, progress):
+            started.set()
+            release.wait(5)
+            return {'done': True}
+        
+        monkeypatch.setitem(HANDLERS, 'quiet', quiet)
+        with file_app.app_context():
+            job_id = JobService.enqueue('purge-deleted').id
+            Job.query.filter_by(id=job_id).update({'kind': 'quiet'})
+            db.session.commit()
+            assert JobService.claim('test', 1, lease) == [job_id]
+        
+        runner = threading.Thread(target=execute_job, args=(job_id, file_app))
+        runner.start()
+        started.wait(5)
+        time.sleep(0.6)
+        with file_app.app_context():
+            reclaimed = JobService.claim('other', 1, lease)
+        release.set()
+        runner.join()
+        
+        assert reclaimed == []
+        assert self._statuses(file_app, [job_id]) == ['succeeded']
+    
+    def test_worker_cli_command(self, file_app, tmp_path):
+        """Test the enqueue and worker CLI commands."""
+        file_app.config['JOB_EXPORT_DIR'] = str(tmp_path / 'exports')
+        runner = file_app.test_cli_runner()
+        
+        result = runner.invoke(args=['enqueue', 'purge-deleted', '--payload', '{"grace_hours": 0}'])
+        assert 'Queued job 1' in result.output
+        
+        result = runner.invoke(args=['worker', '--burst', '--concurrency', '1'])
+        assert 'Ran 1 jobs' in result.output
+        assert self._statuses(file_app, [1]) == ['succeeded']
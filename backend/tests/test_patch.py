@@ -0,0 +1,69 @@
+import json
+from app.models import Event
+
+class TestPatch:
+    """Test cases for PATCH with no-op elimination."""
+    
+    def test_patch_task_reports_changed_fields(self, client, sample_task, send_json):
+        """Test that only fields with new values are applied and reported."""
+        response = send_json(client, f'/api/tasks/{sample_task.id}', {
+            'title': sample_task.title, 'status': 'completed', 'priority': 'high'
+        }, method='PATCH')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['changed_fields'] == ['status', 'priority']
+        assert data['status'] == 'completed'
+        assert data['version'] == sample_task.version + 1
+        assert response.headers['ETag'] == f'"{data["version"]}"'
+    
+    def test_noop_task_patch_keeps_version_and_writes_nothing(self, client, sample_task, send_json):
+        """Test that an unchanged PATCH keeps the ETag and records no event."""
+        before = json.loads(client.get(f'/api/tasks/{sample_task.id}').data)
+        
+        response = send_json(client, f'/api/tasks/{sample_task.id}', {
+            'title': sample_task.title, 'status': sample_task.status
+        }, method='PATCH')
+        
+        data = json.loads(response.data)
+        assert data['changed_fields'] == []
+        assert data['version'] == before['version']
+        assert data['updated_at'] == before['updated_at']
+        assert response.headers['ETag'] == f'"{before["version"]}"'
+        assert Event.query.count() == 0
+    
+    def test_noop_comment_patch_keeps_updated_at(self, client, sample_comment, send_json):
+        """Test that an unchanged comment PATCH does not bump updated_at."""
+        before = json.loads(client.get(f'/api/comments/{sample_comment.id}').data)
+        
+        response = send_json(client, f'/api/comments/{sample_comment.id}', {'content': sample_comment.content}, method='PATCH')
+        
+        data = json.loads(response.data)
+        assert data['changed_fields'] == []
+        assert data['updated_at'] == before['updated_at']
+        assert data['version'] == before['version']
+    
+    def test_patch_comment_applies_changes(self, client, sample_comment, send_json):
+        """Test that a changed comment is written and reported."""
+        response = send_json(client, f'/api/comments/{sample_comment.id}', {
+            'content': 'Edited', 'author_name': sample_comment.author_name
+        }, method='PATCH')
+        
+        data = json.loads(response.data)
+        assert data['changed_fields'] == ['content']
+        assert data['content'] == 'Edited'
+        assert data['version'] == sample_comment.version + 1
+        assert Event.query.filter_by(action='updated').count() == 1
+    
+    def test_patch_checks_if_match_even_when_unchanged(self, client, sample_task, send_json):
+        """Test that a stale If-Match is rejected before the no-op shortcut."""
+        response = send_json(client, f'/api/tasks/{sample_task.id}', {'title': sample_task.title},
+                             headers={'If-Match': '"99"'}, method='PATCH')
+        
+        assert response.status_code == 412
+    
+    def test_patch_validates_and_404s(self, client, sample_task, send_json):
+        """Test invalid values and missing rows."""
+        assert send_json(client, f'/api/tasks/{sample_task.id}', {'status': 'bogus'}, method='PATCH').status_code == 400
+        assert send_json(client, '/api/tasks/999', {'title': 'x'}, method='PATCH').status_code == 404
+        assert send_json(client, '/api/comments/999', {'content': 'x'}, method='PATCH').status_code == 404
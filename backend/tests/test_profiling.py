@@ -0,0 +1,61 @@
+import pstats
+import pytest
+from app import create_app, db
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Build applications with profiling settings taken from keyword arguments."""
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path / 'profiles'))
+    
+    def make(**env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        app = create_app('testing')
+        with app.app_context():
+            db.create_all()
+        return app
+    
+    return make
+
+class TestProfiling:
+    """Test cases for on-demand request profiling."""
+    
+    def test_disabled_by_default(self, make_app):
+        """Test that no hooks are registered without a token or sample rate."""
+        app = make_app()
+        hooks = [f.__qualname__ for f in app.before_request_funcs[None]]
+        
+        assert 'profiler' not in app.extensions
+        assert not any(name.startswith('Profiler.') for name in hooks)
+        assert 'X-Profile' not in app.test_client().get('/api/tasks/').headers
+    
+    def test_admin_token_writes_pstats(self, make_app, tmp_path):
+        """Test that a request with the admin token is profiled with cProfile."""
+        app = make_app(PROFILE_ADMIN_TOKEN='s3cret')
+        client = app.test_client()
+        
+        assert 'X-Profile' not in client.get('/api/tasks/', headers={'X-Profile-Token': 'wrong'}).headers
+        response = client.get('/api/tasks/', headers={'X-Profile-Token': 's3cret'})
+        
+        filename = response.headers['X-Profile']
+        assert filename.startswith('tasks.get_tasks.') and filename.endswith('.pstats')
+        stats = pstats.Stats(str(tmp_path / 'profiles' / filename))
+        assert any(func[2] == 'get_tasks' for func in stats.stats)
+    
+    def test_sampling_writes_collapsed_stacks(self, make_app, tmp_path):
+        """Test that sampled requests produce flame-graph input tagged with the endpoint."""
+        app = make_app(PROFILE_SAMPLE_RATE='1', PROFILE_MODE='sample')
+        
+        response = app.test_client().get('/api/stats/')
+        
+        filename = response.headers['X-Profile']
+        assert filename.startswith('stats.get_stats.') and filename.endswith('.collapsed')
+        for line in (tmp_path / 'profiles' / filename).read_text().splitlines():
+            stack, count = line.rsplit(' ', 1)
+            assert int(count) > 0 and ';' in stack
+    
+    def test_invalid_mode(self, make_app):
+        """Test that an unknown profiling mode fails at startup."""
+        with pytest.raises(ValueError):
+            make_app(PROFILE_SAMPLE_RATE='1', PROFILE_MODE='perf')
@@ -0,0 +1,63 @@
+import json
+import pytest
+from app import create_app, db
+from app.models import Task, Comment
+from app.services.comment_service import CommentService
+from app.services.task_service import TaskService
+
+@pytest.fixture
+def cache_app(tmp_path, monkeypatch):
+    """File-backed app, with a cold statement cache, that counts cache outcomes."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'cache.db'}")
+    monkeypatch.setenv('QUERY_CACHE_STATS', 'true')
+    monkeypatch.setenv('RATELIMIT_ENABLED', 'false')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        tasks = [Task(title=f'Task {i}') for i in range(2)]
+        db.session.add_all(tasks)
+        db.session.commit()
+        db.session.add_all([Comment(content='Hi', author_name='Ann', task_id=task.id) for task in tasks])
+        db.session.commit()
+    return app
+
+class TestQueryCache:
+    """Test cases for compiled statement caching of service queries."""
+    
+    @pytest.mark.parametrize('lookup', [
+        lambda task_id: TaskService.get_task_by_id(task_id),
+        lambda task_id: CommentService.get_comments_by_task(task_id),
+        # A longer IN list is still the same cached statement
+        lambda task_id: CommentService.get_latest_by_tasks(range(1, task_id + 1), 3),
+        lambda task_id: TaskService.get_all_tasks()
+    ], ids=['task_by_id', 'comments_by_task', 'latest_by_tasks', 'all_tasks'])
+    def test_repeated_lookups_hit_the_cache(self, cache_app, lookup):
+        """Test that a lookup with new parameter values reuses the compiled SQL."""
+        stats = cache_app.extensions['query_cache_stats']
+        with cache_app.app_context():
+            lookup(1)
+        stats.reset()
+        
+        with cache_app.app_context():
+            lookup(2)
+        
+        snapshot = stats.snapshot()
+        assert snapshot['misses'] == 0
+        assert snapshot['hits'] >= 1
+        assert snapshot['hit_rate'] == 1.0
+    
+    def test_endpoint_reports_hit_rate(self, cache_app):
+        """Test that the endpoint reports the process's counters."""
+        client = cache_app.test_client()
+        client.get('/api/tasks/1')
+        client.get('/api/tasks/2')
+        
+        data = json.loads(client.get('/api/stats/query-cache').data)
+        
+        assert data['misses'] >= 1
+        assert data['hits'] >= 1
+        assert 0 < data['hit_rate'] < 1
+    
+    def test_endpoint_is_404_when_disabled(self, client):
+        """Test that statistics are off unless QUERY_CACHE_STATS is set."""
+        assert client.get('/api/stats/query-cache').status_code == 404
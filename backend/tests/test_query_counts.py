@@ -0,0 +1,81 @@
+import json
+
+class TestWriteRouteQueryCounts:
+    """Test that write routes serialize their result without refresh SELECTs."""
+    
+    def _send(self, client, method, url, payload):
+        response = client.open(url, method=method, data=json.dumps(payload), content_type='application/json')
+        assert response.status_code in (200, 201)
+        return json.loads(response.data)
+    
+    def test_create_task(self, client, statements):
+        """Test that creating a task is one INSERT plus its activity event."""
+        task = self._send(client, 'POST', '/api/tasks/', {'title': 'Counted'})
+        
+        assert task['comments_count'] == 0
+        assert statements == ['INSERT tasks', 'INSERT events']
+    
+    def test_update_task(self, client, statements):
+        """Test that updating a task is the row lookup, one UPDATE and its event."""
+        task = self._send(client, 'POST', '/api/tasks/', {'title': 'Counted'})
+        statements.clear()
+        
+        updated = self._send(client, 'PUT', f"/api/tasks/{task['id']}", {'status': 'completed'})
+        
+        assert updated['version'] == task['version'] + 1
+        assert sorted(statements) == ['INSERT events', 'SELECT', 'UPDATE tasks']
+        assert statements[0] == 'SELECT'
+    
+    def test_create_comment(self, client, statements):
+        """Test that creating a comment needs no SELECT after its INSERT."""
+        task = self._send(client, 'POST', '/api/tasks/', {'title': 'Counted'})
+        statements.clear()
+        
+        comment = self._send(client, 'POST', '/api/comments/', {
+            'content': 'Hi', 'author_name': 'Ann', 'task_id': task['id']
+        })
+        
+        assert comment['depth'] == 0
+        # Task lookup, then the insert, its materialized path and its event
+        assert statements == ['SELECT', 'INSERT comments', 'UPDATE comments', 'INSERT events']
+    
+    def test_update_comment(self, client, statements):
+        """Test that editing a comment is the row lookup, one UPDATE, its event and its revisions."""
+        task = self._send(client, 'POST', '/api/tasks/', {'title': 'Counted'})
+        comment = self._send(client, 'POST', '/api/comments/', {
+            'content': 'Hi', 'author_name': 'Ann', 'task_id': task['id']
+        })
+        statements.clear()
+        
+        updated = self._send(client, 'PUT', f"/api/comments/{comment['id']}", {'content': 'Edited'})
+        
+        assert updated['content'] == 'Edited'
+        # The first edit stores the original and the new content as revisions 1 and 2
+        assert sorted(statements) == ['INSERT comment_revisions', 'INSERT comment_revisions', 'INSERT events',
+                                      'SELECT', 'SELECT', 'UPDATE comments']
+        assert statements[:2] == ['SELECT', 'SELECT']
+    
+    def test_noop_patch_is_one_select(self, client, statements):
+        """Test that a PATCH that changes nothing only reads the row."""
+        task = self._send(client, 'POST', '/api/tasks/', {'title': 'Counted'})
+        comment = self._send(client, 'POST', '/api/comments/', {
+            'content': 'Hi', 'author_name': 'Ann', 'task_id': task['id']
+        })
+        statements.clear()
+        
+        self._send(client, 'PATCH', f"/api/tasks/{task['id']}", {'title': 'Counted'})
+        self._send(client, 'PATCH', f"/api/comments/{comment['id']}", {'content': 'Hi'})
+        
+        assert statements == ['SELECT', 'SELECT']
+    
+    def test_task_list_counts_comments_in_one_query(self, client, statements):
+        """Test that comments_count no longer lazy-loads every task's comments."""
+        for title in ('One', 'Two', 'Three'):
+            task = self._send(client, 'POST', '/api/tasks/', {'title': title})
+            self._send(client, 'POST', '/api/comments/', {'content': 'c', 'author_name': 'a', 'task_id': task['id']})
+        statements.clear()
+        
+        data = json.loads(client.get('/api/tasks/').data)
+        
+        assert [task['comments_count'] for task in data['tasks']] == [1, 1, 1]
+        assert statements == ['SELECT']
@@ -0,0 +1,84 @@
+import pytest
+import json
+from flask import g, request
+from app.ratelimit import Limit, MemoryStore, RateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class TestRateLimit:
+    """Test cases for token-bucket rate limiting."""
+    
+    def test_parse_limits(self):
+        """Test limit string parsing."""
+        assert Limit.parse('100/60') == Limit(100, 100 / 60)
+        assert Limit.parse('5/second') == Limit(5, 5.0)
+        with pytest.raises(ValueError):
+            Limit.parse('lots')
+    
+    def test_bucket_refills_over_time(self):
+        """Test that spent tokens come back at the configured rate."""
+        clock = FakeClock()
+        store = MemoryStore(clock=clock)
+        limit = Limit.parse('2/second')
+        
+        assert store.consume('client', limit).allowed
+        assert store.consume('client', limit).allowed
+        denied = store.consume('client', limit)
+        assert not denied.allowed
+        assert denied.retry_after == pytest.approx(0.5)
+        
+        clock.now = 0.5
+        assert store.consume('client', limit).allowed
+        assert store.consume('other', limit).remaining == 1
+    
+    def test_least_recently_used_bucket_is_evicted(self):
+        """Test that a full shard drops its least recently used bucket, even one still draining."""
+        clock = FakeClock()
+        store = MemoryStore(shards=1, max_keys_per_shard=2, clock=clock)
+        limit = Limit.parse('1/minute')
+        store.consume('a', limit)
+        store.consume('b', limit)
+        store.consume('a', limit)
+        
+        store.consume('c', limit)
+        
+        assert list(store._shards[0][0]) == ['a', 'c']
+        assert not store.consume('a', limit).allowed
+    
+    def test_unverified_api_keys_do_not_identify_clients(self, app):
+        """Test that only an API key verified by the tenancy hook names the client's bucket."""
+        with app.test_request_context('/api/tasks/', headers={'X-API-Key': 'made-up'},
+                                      environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+            assert RateLimiter.client_id(request) == '10.0.0.1'
+            g.api_key = 'verified'
+            assert RateLimiter.client_id(request) == 'verified'
+    
+    def test_headers_and_429(self, app, client):
+        """Test rate limit headers and rejection once the bucket is empty."""
+        app.extensions['ratelimit']['routes']['tasks.get_tasks'] = Limit.parse('2/minute')
+        
+        first = client.get('/api/tasks/')
+        assert first.headers['RateLimit-Limit'] == '2'
+        assert first.headers['RateLimit-Remaining'] == '1'
+        assert int(first.headers['RateLimit-Reset']) == 30
+        
+        client.get('/api/tasks/')
+        limited = client.get('/api/tasks/')
+        assert limited.status_code == 429
+        assert int(limited.headers['Retry-After']) == 30
+        assert json.loads(limited.data)['error'] == 'Rate limit exceeded'
+    
+    def test_limits_are_per_client_and_route(self, app, client):
+        """Test that clients and routes have separate buckets."""
+        app.extensions['ratelimit']['routes']['tasks.get_tasks'] = Limit.parse('1/minute')
+        app.config['API_KEYS'] = {'integration-a': 'default'}
+        
+        assert client.get('/api/tasks/').status_code == 200
+        assert client.get('/api/tasks/').status_code == 429
+        assert client.get('/api/tasks/', headers={'X-API-Key': 'integration-a'}).status_code == 200
+        assert client.get('/api/tasks/999').status_code == 404
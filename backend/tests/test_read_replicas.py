@@ -0,0 +1,93 @@
+import pytest
+import json
+from app import create_app, db
+from app.models import Task
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """Create application with two SQLite files standing in for primary and replica."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv('DATABASE_REPLICA_URLS', f"sqlite:///{tmp_path / 'replica.db'}")
+    app = create_app('testing')
+    
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(bind=replica_app_engine(app))
+        db.session.add(Task(title="Primary Task"))
+        db.session.commit()
+        with replica_app_engine(app).begin() as connection:
+            connection.execute(Task.__table__.insert(), {'title': 'Replica Task', 'version': 1})
+    
+    yield app
+
+def replica_app_engine(app):
+    return app.extensions['replica_engines'][0]
+
+def task_titles(response):
+    return [task['title'] for task in json.loads(response.data)['tasks']]
+
+class TestReadReplicas:
+    """Test cases for replica routing."""
+    
+    def test_get_reads_from_replica(self, replica_app):
+        """Test that GET routes are served by the replica."""
+        client = replica_app.test_client()
+        
+        response = client.get('/api/tasks/')
+        
+        assert response.status_code == 200
+        assert task_titles(response) == ['Replica Task']
+    
+    def test_writes_go_to_primary(self, replica_app):
+        """Test that POST routes write to the primary only."""
+        client = replica_app.test_client()
+        
+        response = client.post('/api/tasks/',
+                               data=json.dumps({'title': 'New Task'}),
+                               content_type='application/json')
+        
+        assert response.status_code == 201
+        with replica_app.app_context():
+            primary_titles = {task.title for task in Task.query.all()}
+            with replica_app_engine(replica_app).connect() as connection:
+                replica_titles = {row.title for row in connection.execute(Task.__table__.select())}
+        assert primary_titles == {'Primary Task', 'New Task'}
+        assert replica_titles == {'Replica Task'}
+    
+    def test_read_your_writes_within_lag_tolerance(self, replica_app):
+        """Test that a client reads from the primary right after writing."""
+        writer = replica_app.test_client()
+        other = replica_app.test_client()
+        
+        writer.post('/api/tasks/',
+                    data=json.dumps({'title': 'New Task'}),
+                    content_type='application/json')
+        
+        assert 'New Task' in task_titles(writer.get('/api/tasks/'))
+        assert task_titles(other.get('/api/tasks/')) == ['Replica Task']
+    
+    def test_replica_used_again_after_lag_tolerance(self, replica_app):
+        """Test that reads return to the replica once the lag window has passed."""
+        replica_app.config['REPLICA_LAG_TOLERANCE'] = 0
+        client = replica_app.test_client()
+        
+        client.post('/api/tasks/',
+                    data=json.dumps({'title': 'New Task'}),
+                    content_type='application/json')
+        
+        assert task_titles(client.get('/api/tasks/')) == ['Replica Task']
+    
+    def test_read_your_writes_without_cookies(self, replica_app):
+        """Test that a client that drops cookies, like the cross-origin SPA, echoes the write header instead."""
+        client = replica_app.test_client(use_cookies=False)
+        
+        response = client.post('/api/tasks/',
+                               data=json.dumps({'title': 'New Task'}),
+                               content_type='application/json',
+                               headers={'Origin': 'http://localhost:3000'})
+        last_write = response.headers['X-Last-Write']
+        
+        assert 'X-Last-Write' in response.headers['Access-Control-Expose-Headers']
+        assert task_titles(client.get('/api/tasks/')) == ['Replica Task']
+        assert 'New Task' in task_titles(client.get('/api/tasks/', headers={'X-Last-Write': last_write}))
+        assert task_titles(client.get('/api/tasks/', headers={'X-Last-Write': 'garbage'})) == ['Replica Task']
@@ -0,0 +1,117 @@
+import json
+import random
+from datetime import timedelta
+from sqlalchemy import event
+from app import db
+from app.models import CommentRevision
+from app.services.purge_service import PurgeService
+from app.services.revision_service import apply_delta, make_delta
+
+def edit(client, comment_id, content, method='PUT'):
+    response = client.open(f'/api/comments/{comment_id}', method=method,
+                           data=json.dumps({'content': content}), content_type='application/json')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+class TestDeltas:
+    """Test cases for the delta codec."""
+    
+    def test_round_trip(self):
+        """Test that applying a delta to the old text gives the new text."""
+        old = 'The quick brown fox jumps over the lazy dog.\nSecond line, unchanged.'
+        new = 'The quick red fox leaps over the lazy dog!\nSecond line, unchanged. Appended.'
+        
+        assert apply_delta(old, make_delta(old, new)) == new
+    
+    def test_random_edits_round_trip(self):
+        """Test random word-level edits."""
+        rng = random.Random(7)
+        words = 'alpha beta gamma delta epsilon, zeta. eta\ntheta'.split(' ')
+        text = ' '.join(rng.choice(words) for _ in range(200))
+        for _ in range(50):
+            tokens = text.split(' ')
+            position = rng.randrange(len(tokens))
+            tokens[position:position + rng.randrange(3)] = [rng.choice(words) for _ in range(rng.randrange(3))]
+            new = ' '.join(tokens)
+            assert apply_delta(text, make_delta(text, new)) == new
+            text = new
+
+class TestCommentHistory:
+    """Test cases for storing and rebuilding comment revisions."""
+    
+    def test_unedited_comment_has_no_revisions(self, client, sample_comment):
+        """Test that history costs nothing until the first edit."""
+        data = json.loads(client.get(f'/api/comments/{sample_comment.id}/history').data)
+        
+        assert data['count'] == 0
+    
+    def test_every_revision_can_be_rebuilt(self, app, client, sample_comment):
+        """Test that any revision is reconstructed exactly."""
+        app.config['COMMENT_REVISION_SNAPSHOT_INTERVAL'] = 4
+        base = 'A long comment body that is edited many times. ' * 20
+        contents = [sample_comment.content] + [base + f'Edit number {i}.' for i in range(10)]
+        for content in contents[1:]:
+            edit(client, sample_comment.id, content)
+        
+        data = json.loads(client.get(f'/api/comments/{sample_comment.id}/history').data)
+        
+        assert data['count'] == len(contents)
+        assert [r['kind'] for r in data['revisions']][:6] == ['snapshot', 'delta', 'delta', 'delta', 'snapshot', 'delta']
+        for revision, expected in enumerate(contents, start=1):
+            response = client.get(f'/api/comments/{sample_comment.id}/history?revision={revision}')
+            assert json.loads(response.data)['content'] == expected
+    
+    def test_deltas_are_smaller_than_the_content(self, client, sample_comment):
+        """Test that a small edit to a long comment stores a small delta."""
+        base = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 50
+        edit(client, sample_comment.id, base)
+        edit(client, sample_comment.id, base + 'One more sentence.')
+        
+        revisions = json.loads(client.get(f'/api/comments/{sample_comment.id}/history').data)['revisions']
+        
+        assert revisions[-1]['kind'] == 'delta'
+        assert revisions[-1]['stored_bytes'] < 60 < revisions[-1]['content_length']
+    
+    def test_rebuild_reads_at_most_one_interval(self, app, client, sample_comment):
+        """Test that reconstruction starts at the nearest snapshot."""
+        app.config['COMMENT_REVISION_SNAPSHOT_INTERVAL'] = 5
+        for i in range(12):
+            edit(client, sample_comment.id, f'Version {i}')
+        loaded = []
+        
+        @event.listens_for(db.session, 'loaded_as_persistent')
+        def count(session, instance):
+            if isinstance(instance, CommentRevision):
+                loaded.append(instance.revision)
+        
+        response = client.get(f'/api/comments/{sample_comment.id}/history?revision=9')
+        
+        assert json.loads(response.data)['content'] == 'Version 7'
+        assert loaded == [6, 7, 8, 9]
+    
+    def test_patch_and_noop_edits(self, client, sample_comment):
+        """Test that PATCH records content edits and no-ops record nothing."""
+        edit(client, sample_comment.id, 'Patched', method='PATCH')
+        edit(client, sample_comment.id, 'Patched', method='PATCH')
+        client.put(f'/api/comments/{sample_comment.id}', data=json.dumps({'author_name': 'Someone Else'}),
+                   content_type='application/json')
+        
+        data = json.loads(client.get(f'/api/comments/{sample_comment.id}/history').data)
+        
+        assert data['count'] == 2
+    
+    def test_missing_revision_returns_404(self, client, sample_comment):
+        """Test unknown revisions and comments."""
+        edit(client, sample_comment.id, 'Edited')
+        
+        assert client.get(f'/api/comments/{sample_comment.id}/history?revision=3').status_code == 404
+        assert client.get('/api/comments/999/history').status_code == 404
+    
+    def test_purge_removes_revisions(self, client, sample_comment):
+        """Test that purging a comment also removes its history."""
+        edit(client, sample_comment.id, 'Edited')
+        client.delete(f'/api/comments/{sample_comment.id}')
+        
+        PurgeService.purge_deleted(timedelta(0))
+        
+        assert CommentRevision.query.count() == 0
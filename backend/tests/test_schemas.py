@@ -0,0 +1,81 @@
+import pytest
+import json
+from app.schemas import CommentSchema, CommentUpdateSchema, TaskSchema, ValidationError
+
+class TestSchemas:
+    """Test cases for declarative request validation."""
+    
+    def test_collects_all_errors_in_one_pass(self):
+        """Test that every invalid field is reported together."""
+        with pytest.raises(ValidationError) as excinfo:
+            CommentSchema.validate({'author_email': 'invalid-email', 'task_id': 'x'})
+        
+        assert excinfo.value.errors == {
+            'content': 'Content is required',
+            'author_name': 'Author name is required',
+            'author_email': 'Invalid email format',
+            'task_id': 'Task ID must be an integer'
+        }
+    
+    def test_returns_only_known_fields(self):
+        """Test that unknown keys are dropped from the cleaned data."""
+        data = TaskSchema.validate({'title': 'Task', 'priority': 'high', 'id': 7})
+        
+        assert data == {'title': 'Task', 'priority': 'high'}
+    
+    def test_status_and_priority_are_validated(self):
+        """Test that status and priority must be known values."""
+        with pytest.raises(ValidationError, match="Status must be one of: pending, in_progress, completed"):
+            TaskSchema.validate({'title': 'Task', 'status': 'done'})
+        with pytest.raises(ValidationError, match="Priority must be one of: low, medium, high"):
+            TaskSchema.validate({'priority': 'urgent'}, partial=True)
+    
+    def test_partial_update_rules(self):
+        """Test update semantics: optional fields, no blanks, at least one field."""
+        assert CommentUpdateSchema.validate({'author_name': 'New'}, partial=True) == {'author_name': 'New'}
+        
+        with pytest.raises(ValidationError, match="Content cannot be empty"):
+            CommentUpdateSchema.validate({'content': ''}, partial=True)
+        with pytest.raises(ValidationError, match="At least one field must be provided for update"):
+            CommentUpdateSchema.validate({'task_id': 3}, partial=True)
+    
+    def test_only_nullable_fields_accept_null(self):
+        """Test that null is rejected for choices and ids but allowed for optional text."""
+        with pytest.raises(ValidationError) as excinfo:
+            CommentSchema.validate({'content': 'Hi', 'author_name': 'Ann', 'task_id': 1, 'parent_id': None})
+        assert excinfo.value.errors == {'parent_id': 'Parent ID cannot be null'}
+        
+        with pytest.raises(ValidationError, match="Status cannot be null"):
+            TaskSchema.validate({'status': None}, partial=True)
+        with pytest.raises(ValidationError, match="Priority must be one of"):
+            TaskSchema.validate({'priority': ''}, partial=True)
+        
+        assert TaskSchema.validate({'description': None}, partial=True) == {'description': None}
+        assert CommentUpdateSchema.validate({'author_email': None}, partial=True) == {'author_email': None}
+    
+    def test_validate_many(self):
+        """Test batch validation with errors keyed by item index."""
+        items = [{'title': 'One'}, {'title': ''}, {'title': 'Three', 'status': 'bogus'}]
+        
+        with pytest.raises(ValidationError) as excinfo:
+            TaskSchema.validate_many(items)
+        
+        assert sorted(excinfo.value.errors) == [1, 2]
+        assert TaskSchema.validate_many(items[:1]) == [{'title': 'One'}]
+    
+    def test_route_rejects_invalid_status(self, client):
+        """Test that task routes return 400 for unknown status values."""
+        response = client.post('/api/tasks/',
+                               data=json.dumps({'title': 'Task', 'status': 'done'}),
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        assert 'Status must be one of' in json.loads(response.data)['error']
+    
+    def test_route_rejects_null_status(self, client, sample_task):
+        """Test that an explicit null status is rejected instead of stored."""
+        response = client.put(f'/api/tasks/{sample_task.id}', data=json.dumps({'status': None}),
+                              content_type='application/json')
+        
+        assert response.status_code == 400
+        assert json.loads(client.get(f'/api/tasks/{sample_task.id}').data)['status'] == 'pending'
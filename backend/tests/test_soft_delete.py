@@ -0,0 +1,132 @@
+import json
+from datetime import timedelta
+from sqlalchemy import event
+from app import db
+from app.models import Task, Comment
+from app.services.purge_service import PurgeService
+
+class TestSoftDelete:
+    """Test cases for soft deletion, restore and purge."""
+    
+    def test_deleted_task_and_comments_are_hidden(self, client, task_with_comments):
+        """Test that deleting a task hides it and its comments."""
+        task_id, comment_ids = task_with_comments(client)
+        
+        response = client.delete(f'/api/tasks/{task_id}')
+        
+        assert response.status_code == 200
+        assert client.get(f'/api/tasks/{task_id}').status_code == 404
+        assert client.get(f'/api/comments/{comment_ids[0]}').status_code == 404
+        assert json.loads(client.get('/api/tasks/').data)['count'] == 0
+        # Rows are still there until purged
+        assert Task.query.count() == 1
+        assert Comment.query.count() == 3
+    
+    def test_restore_task(self, client, task_with_comments):
+        """Test restoring a deleted task brings its comments back."""
+        task_id, comment_ids = task_with_comments(client)
+        client.delete(f'/api/tasks/{task_id}')
+        
+        response = client.post(f'/api/tasks/{task_id}/restore')
+        
+        assert response.status_code == 200
+        data = json.loads(client.get(f'/api/tasks/{task_id}/comments').data)
+        assert data['comments_count'] == 3
+        assert data['task']['comments_count'] == 3
+    
+    def test_restore_active_task_returns_404(self, client, task_with_comments):
+        """Test that only deleted tasks can be restored."""
+        task_id, _ = task_with_comments(client, comments=0)
+        
+        response = client.post(f'/api/tasks/{task_id}/restore')
+        
+        assert response.status_code == 404
+    
+    def test_delete_and_restore_comment(self, client, task_with_comments):
+        """Test soft-deleting and restoring a single comment."""
+        task_id, comment_ids = task_with_comments(client)
+        
+        client.delete(f'/api/comments/{comment_ids[0]}')
+        data = json.loads(client.get(f'/api/tasks/{task_id}').data)
+        assert data['comments_count'] == 2
+        
+        response = client.post(f'/api/comments/{comment_ids[0]}/restore')
+        assert response.status_code == 200
+        assert client.get(f'/api/comments/{comment_ids[0]}').status_code == 200
+    
+    def test_restore_comment_of_deleted_task(self, client, task_with_comments):
+        """Test that a comment cannot be restored while its task is deleted."""
+        task_id, comment_ids = task_with_comments(client)
+        client.delete(f'/api/comments/{comment_ids[0]}')
+        client.delete(f'/api/tasks/{task_id}')
+        
+        response = client.post(f'/api/comments/{comment_ids[0]}/restore')
+        
+        assert response.status_code == 400
+        assert 'restore the task first' in json.loads(response.data)['error']
+    
+    def test_purge_respects_grace_period(self, client, task_with_comments):
+        """Test that recent tombstones survive a purge."""
+        task_id, _ = task_with_comments(client)
+        client.delete(f'/api/tasks/{task_id}')
+        
+        purged = PurgeService.purge_deleted(timedelta(hours=1))
+        
+        assert purged == {'comments': 0, 'tasks': 0}
+        assert client.post(f'/api/tasks/{task_id}/restore').status_code == 200
+    
+    def test_purge_in_bounded_batches(self, client, task_with_comments):
+        """Test that purging removes rows batch by batch."""
+        task_id, _ = task_with_comments(client, comments=5)
+        client.delete(f'/api/tasks/{task_id}')
+        
+        purged = PurgeService.purge_deleted(timedelta(0), batch_size=2, max_batches=2)
+        assert purged == {'comments': 4, 'tasks': 0}
+        
+        purged = PurgeService.purge_deleted(timedelta(0), batch_size=2)
+        assert purged == {'comments': 1, 'tasks': 1}
+        db.session.expire_all()
+        assert Task.query.count() == 0
+        assert Comment.query.count() == 0
+    
+    def test_purge_keeps_parents_of_live_replies(self, file_app, send_json, task_with_comments):
+        """Test purging threads with foreign keys enforced."""
+        client = file_app.test_client()
+        with file_app.app_context():
+            @event.listens_for(db.engine, 'connect')
+            def enforce_foreign_keys(dbapi_connection, connection_record):
+                dbapi_connection.execute('PRAGMA foreign_keys=ON')
+            db.engine.dispose()
+        
+        task_id, [parent_id, _] = task_with_comments(client, comments=2)
+        reply = send_json(client, '/api/comments/', {
+            'content': 'Reply', 'author_name': 'Test User', 'task_id': task_id, 'parent_id': parent_id
+        }).get_json()
+        client.delete(f'/api/comments/{parent_id}')
+        
+        with file_app.app_context():
+            assert PurgeService.purge_deleted(timedelta(0)) == {'comments': 0, 'tasks': 0}
+        
+        client.delete(f"/api/comments/{reply['id']}")
+        with file_app.app_context():
+            assert PurgeService.purge_deleted(timedelta(0), batch_size=1) == {'comments': 2, 'tasks': 0}
+        
+        # A whole thread goes with its task, in one batch
+        task_id, [parent_id] = task_with_comments(client, comments=1)
+        send_json(client, '/api/comments/', {
+            'content': 'Reply', 'author_name': 'Test User', 'task_id': task_id, 'parent_id': parent_id
+        })
+        client.delete(f'/api/tasks/{task_id}')
+        with file_app.app_context():
+            assert PurgeService.purge_deleted(timedelta(0)) == {'comments': 2, 'tasks': 1}
+            assert Comment.query.count() == 1
+    
+    def test_purge_cli_command(self, app, client, task_with_comments):
+        """Test the purge-deleted CLI command."""
+        task_id, comment_ids = task_with_comments(client, comments=2)
+        client.delete(f'/api/comments/{comment_ids[0]}')
+        
+        result = app.test_cli_runner().invoke(args=['purge-deleted', '--grace-hours', '0'])
+        
+        assert 'Purged 0 tasks and 1 comments' in result.output
+        assert Comment.query.count() == 1
@@ -0,0 +1,88 @@
+import json
+from app.services.stats_service import StatsCache
+
+class TestStats:
+    """Test cases for the statistics endpoints."""
+    
+    def _seed(self, client, send_json):
+        busy = send_json(client, '/api/tasks/', {'title': 'Busy', 'status': 'in_progress', 'priority': 'high'}).get_json()
+        quiet = send_json(client, '/api/tasks/', {'title': 'Quiet'}).get_json()
+        send_json(client, '/api/tasks/', {'title': 'Done', 'status': 'completed', 'priority': 'high'})
+        root = send_json(client, '/api/comments/', {'content': 'a', 'author_name': 'Ann', 'task_id': busy['id']}).get_json()
+        send_json(client, '/api/comments/', {
+            'content': 'b', 'author_name': 'Bob', 'task_id': busy['id'], 'parent_id': root['id']
+        })
+        send_json(client, '/api/comments/', {'content': 'c', 'author_name': 'Ann', 'task_id': busy['id']})
+        send_json(client, '/api/comments/', {'content': 'd', 'author_name': 'Ann', 'task_id': quiet['id']})
+        return busy, quiet
+    
+    def test_global_stats(self, client, send_json):
+        """Test counts by status and priority, top authors and busiest tasks."""
+        busy, quiet = self._seed(client, send_json)
+        
+        response = client.get('/api/stats/')
+        data = json.loads(response.data)
+        
+        assert response.status_code == 200
+        assert len(response.data) < 1000
+        assert data['tasks'] == {
+            'total': 3,
+            'by_status': {'in_progress': 1, 'pending': 1, 'completed': 1},
+            'by_priority': {'high': 2, 'medium': 1}
+        }
+        assert data['comments']['total'] == 4
+        assert data['comments']['top_authors'] == [
+            {'author_name': 'Ann', 'count': 3}, {'author_name': 'Bob', 'count': 1}
+        ]
+        assert [task['id'] for task in data['busiest_tasks']] == [busy['id'], quiet['id']]
+        assert data['busiest_tasks'][0]['comments_count'] == 3
+    
+    def test_task_stats(self, client, send_json):
+        """Test per-task comment statistics."""
+        busy, _ = self._seed(client, send_json)
+        
+        data = json.loads(client.get(f"/api/tasks/{busy['id']}/stats").data)
+        
+        assert data['comments'] == 3
+        assert data['replies'] == 1
+        assert data['authors'] == 2
+        assert data['max_depth'] == 1
+        assert data['top_authors'][0] == {'author_name': 'Ann', 'count': 2}
+        assert client.get('/api/tasks/999/stats').status_code == 404
+    
+    def test_stats_are_cached_until_a_write(self, client, send_json):
+        """Test that repeated reads hit the cache and writes invalidate it."""
+        busy, _ = self._seed(client, send_json)
+        
+        first = json.loads(client.get('/api/stats/').data)
+        second = json.loads(client.get('/api/stats/').data)
+        assert second['generated_at'] == first['generated_at']
+        
+        send_json(client, '/api/comments/', {'content': 'e', 'author_name': 'Cy', 'task_id': busy['id']})
+        third = json.loads(client.get('/api/stats/').data)
+        task = json.loads(client.get(f"/api/tasks/{busy['id']}/stats").data)
+        
+        assert third['comments']['total'] == 5
+        assert task['comments'] == 4
+        
+        client.delete(f"/api/tasks/{busy['id']}")
+        assert json.loads(client.get('/api/stats/').data)['tasks']['total'] == 2
+        assert client.get(f"/api/tasks/{busy['id']}/stats").status_code == 404
+    
+    def test_cache_ttl_and_concurrent_invalidation(self):
+        """Test expiry, and that a result computed across an invalidation is not stored."""
+        now = [0.0]
+        cache = StatsCache(ttl=10, clock=lambda: now[0])
+        
+        assert cache.get_or_compute('global', lambda: 1) == 1
+        assert cache.get_or_compute('global', lambda: 2) == 1
+        now[0] = 11
+        assert cache.get_or_compute('global', lambda: 3) == 3
+        
+        def racing_compute():
+            cache.invalidate([1])
+            return 4
+        
+        now[0] = 30
+        assert cache.get_or_compute('global', racing_compute) == 4
+        assert cache.get_or_compute('global', lambda: 5) == 5
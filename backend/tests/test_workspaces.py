@@ -0,0 +1,204 @@
+import json
+from datetime import timedelta
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from app import create_app, db
+from app.models import Task, Job
+from app.ratelimit import Limit
+from app.services.job_service import JobService
+from app.tenancy import WorkspaceBudget, WorkspaceError
+from app.worker import execute_job
+
+# Each workspace's client authenticates with "<workspace>-key"
+API_KEYS = {f'{workspace}-key': workspace for workspace in ('acme', 'globex')}
+
+@pytest.fixture
+def api_keys(app):
+    app.config['API_KEYS'] = dict(API_KEYS)
+    return app.config['API_KEYS']
+
+def post(client, path, data, workspace=None, key=None):
+    headers = {}
+    if workspace:
+        headers['X-API-Key'] = f'{workspace}-key'
+    if key:
+        headers['Idempotency-Key'] = key
+    return client.post(path, data=json.dumps(data), content_type='application/json', headers=headers)
+
+def get(client, path, workspace=None):
+    return client.get(path, headers={'X-API-Key': f'{workspace}-key'} if workspace else {})
+
+@pytest.mark.usefixtures('api_keys')
+class TestWorkspaceIsolation:
+    """Test cases for scoping every query and write to the request's workspace."""
+    
+    def test_workspaces_only_see_their_own_rows(self, client):
+        """Test that tasks, comments, events and stats are separated by workspace."""
+        task = json.loads(post(client, '/api/tasks/', {'title': 'Acme plan'}, 'acme').data)
+        post(client, '/api/comments/', {'content': 'Hi', 'author_name': 'Ann', 'task_id': task['id']}, 'acme')
+        post(client, '/api/tasks/', {'title': 'Globex plan'}, 'globex')
+        
+        acme = json.loads(get(client, '/api/tasks/', 'acme').data)
+        assert [t['title'] for t in acme['tasks']] == ['Acme plan']
+        assert acme['tasks'][0]['comments_count'] == 1
+        assert json.loads(get(client, '/api/tasks/', 'globex').data)['count'] == 1
+        assert json.loads(get(client, '/api/tasks/').data)['count'] == 0
+        
+        assert get(client, f"/api/tasks/{task['id']}", 'globex').status_code == 404
+        assert get(client, f"/api/tasks/{task['id']}/comments", 'globex').status_code == 404
+        assert client.delete(f"/api/tasks/{task['id']}", headers={'X-Workspace-Id': 'globex'}).status_code == 404
+        assert json.loads(get(client, '/api/activity/', 'globex').data)['events'][0]['summary'] == 'Globex plan'
+        assert json.loads(get(client, '/api/stats/', 'acme').data)['comments']['total'] == 1
+        assert json.loads(get(client, '/api/stats/', 'globex').data)['comments']['total'] == 0
+    
+    def test_comments_cannot_target_another_workspaces_task(self, client):
+        """Test that a comment on a task of another workspace is rejected like a missing task."""
+        task = json.loads(post(client, '/api/tasks/', {'title': 'Acme plan'}, 'acme').data)
+        
+        response = post(client, '/api/comments/', {'content': 'x', 'author_name': 'Eve', 'task_id': task['id']}, 'globex')
+        
+        assert response.status_code == 400
+        assert db.session.get(Task, task['id']).comments_count == 0
+    
+    def test_workspace_comes_from_the_api_key(self, app, client, monkeypatch):
+        """Test that unknown keys and other workspaces are rejected before any budget is spent."""
+        app.extensions['ratelimit']['workspace_default'] = Limit.parse('100/minute')
+        budget = WorkspaceBudget(1, timeout=0.01)
+        monkeypatch.setitem(app.extensions, 'workspace_budget', budget)
+        
+        assert get(client, '/api/tasks/', 'mallory').status_code == 401
+        assert client.get('/api/tasks/', headers={'X-Workspace-Id': 'acme'}).status_code == 404
+        assert client.get('/api/tasks/', headers={'X-API-Key': 'globex-key', 'X-Workspace-Id': 'acme'}).status_code == 404
+        assert client.get('/api/tasks/', headers={'X-Workspace-Id': 'not a workspace'}).status_code == 400
+        assert client.get('/api/tasks/', headers={'X-API-Key': 'acme-key', 'X-Workspace-Id': 'acme'}).status_code == 200
+        
+        assert list(budget._semaphores) == ['acme']
+        buckets = {key for shard, _ in app.extensions['ratelimit']['store']._shards for key in shard}
+        assert {key for key in buckets if key.startswith('workspace:')} == {'workspace:acme'}
+    
+    def test_scoped_session_refuses_foreign_rows(self, app):
+        """Test that new rows are stamped and rows of another workspace cannot be written."""
+        db.session.info['workspace_id'] = 'acme'
+        task = Task(title='Stamped')
+        db.session.add(task)
+        db.session.flush()
+        assert task.workspace_id == 'acme'
+        
+        db.session.add(Task(title='Foreign', workspace_id='globex'))
+        with pytest.raises(WorkspaceError):
+            db.session.flush()
+        db.session.rollback()
+    
+    def test_queries_share_compiled_sql_and_tenant_index(self, app, client):
+        """Test that the workspace is a bound parameter and the listing uses its tenant-leading index."""
+        listings = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().startswith('SELECT') and 'FROM tasks' in statement:
+                listings.append((statement, parameters))
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            get(client, '/api/tasks/', 'acme')
+            get(client, '/api/tasks/', 'globex')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        
+        (acme_sql, acme_params), (globex_sql, globex_params) = listings
+        assert acme_sql == globex_sql
+        assert 'acme' in acme_params and 'globex' in globex_params
+        
+        plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {acme_sql}', acme_params).all()
+        assert 'ix_tasks_workspace_id_deleted_at_created_at' in plan[0][3]
+    
+    def test_idempotency_keys_are_per_workspace(self, client):
+        """Test that two workspaces reusing a key do not replay each other's responses."""
+        first = post(client, '/api/tasks/', {'title': 'Same'}, 'acme', key='k1')
+        second = post(client, '/api/tasks/', {'title': 'Same'}, 'globex', key='k1')
+        
+        assert second.status_code == 201
+        assert 'Idempotent-Replayed' not in second.headers
+        assert json.loads(first.data)['id'] != json.loads(second.data)['id']
+    
+    def test_jobs_run_inside_their_workspace(self, app, client, tmp_path):
+        """Test that jobs are private to their workspace and run scoped to it."""
+        app.config['JOB_EXPORT_DIR'] = str(tmp_path)
+        task = json.loads(post(client, '/api/tasks/', {'title': 'Acme plan'}, 'acme').data)
+        job = json.loads(post(client, '/api/jobs/', {'kind': 'export-task', 'payload': {'task_id': task['id']}}, 'acme').data)
+        
+        assert get(client, f"/api/jobs/{job['id']}", 'globex').status_code == 404
+        assert db.session.get(Job, job['id']).workspace_id == 'acme'
+        
+        [job_id] = JobService.claim('test', 1, timedelta(minutes=10))
+        assert execute_job(job_id, app) == 'succeeded'
+        
+        result = json.loads(get(client, f"/api/jobs/{job['id']}", 'acme').data)['result']
+        assert result['path'].startswith(str(tmp_path / 'acme'))
+
+@pytest.mark.usefixtures('api_keys')
+class TestWorkspaceBudgets:
+    """Test cases for per-workspace rate and concurrency budgets."""
+    
+    def test_workspace_rate_budget(self, app, client, api_keys):
+        """Test that a workspace's bucket is shared by its clients and separate from others."""
+        app.extensions['ratelimit']['workspace_default'] = Limit.parse('2/minute')
+        api_keys.update({'acme-one': 'acme', 'acme-two': 'acme', 'acme-three': 'acme'})
+        
+        for client_key in ('acme-one', 'acme-two'):
+            response = client.get('/api/tasks/', headers={'X-API-Key': client_key})
+            assert response.status_code == 200
+        limited = client.get('/api/tasks/', headers={'X-API-Key': 'acme-three'})
+        
+        assert limited.status_code == 429
+        assert 'acme' in json.loads(limited.data)['error']
+        assert 'Retry-After' in limited.headers
+        assert get(client, '/api/tasks/', 'globex').status_code == 200
+    
+    def test_workspace_concurrency_budget(self, app, client, monkeypatch):
+        """Test that a workspace with no free slot gets 503 while others are served."""
+        budget = WorkspaceBudget(1, timeout=0.01)
+        monkeypatch.setitem(app.extensions, 'workspace_budget', budget)
+        assert budget.acquire('acme')
+        
+        busy = get(client, '/api/tasks/', 'acme')
+        assert busy.status_code == 503
+        assert busy.headers['Retry-After'] == '1'
+        assert get(client, '/api/tasks/', 'globex').status_code == 200
+        
+        budget.release('acme')
+        assert get(client, '/api/tasks/', 'acme').status_code == 200
+        # The request released its slot on teardown
+        assert budget.acquire('acme')
+
+class TestWorkspaceDatabases:
+    """Test cases for workspaces with a database of their own."""
+    
+    def test_dedicated_workspace_uses_its_own_database(self, tmp_path, monkeypatch):
+        """Test that a large workspace's rows live in its database and jobs stay on the primary."""
+        primary_url = f"sqlite:///{tmp_path / 'primary.db'}"
+        big_url = f"sqlite:///{tmp_path / 'big.db'}"
+        monkeypatch.setenv('DATABASE_URL', primary_url)
+        monkeypatch.setenv('WORKSPACE_DATABASE_URLS', f'big={big_url}')
+        monkeypatch.setenv('API_KEYS', 'big-key=big,small-key=small')
+        app = create_app('testing')
+        assert app.test_cli_runner().invoke(args=['init-db']).exit_code == 0
+        client = app.test_client()
+        
+        task = json.loads(post(client, '/api/tasks/', {'title': 'Big plan'}, 'big').data)
+        post(client, '/api/comments/', {'content': 'Hi', 'author_name': 'Ann', 'task_id': task['id']}, 'big')
+        post(client, '/api/jobs/', {'kind': 'export-task', 'payload': {'task_id': task['id']}}, 'big')
+        post(client, '/api/tasks/', {'title': 'Small plan'}, 'small')
+        
+        assert json.loads(get(client, f"/api/tasks/{task['id']}", 'big').data)['comments_count'] == 1
+        assert [t['title'] for t in json.loads(get(client, '/api/tasks/', 'small').data)['tasks']] == ['Small plan']
+        
+        primary, big = create_engine(primary_url), create_engine(big_url)
+        with primary.connect() as conn:
+            assert conn.execute(text('SELECT title FROM tasks')).scalars().all() == ['Small plan']
+            assert conn.execute(text('SELECT workspace_id FROM jobs')).scalars().all() == ['big']
+        with big.connect() as conn:
+            assert conn.execute(text('SELECT title FROM tasks')).scalars().all() == ['Big plan']
+            assert conn.execute(text('SELECT count(*) FROM comments')).scalar() == 1
+        assert 'jobs' in inspect(big).get_table_names()
+        primary.dispose()
+        big.dispose()
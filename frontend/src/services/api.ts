@@ -10,6 +10,27 @@ const api = axios.create({
   },
 });
 
+// Read-your-writes with read replicas: the API is cross-origin, so its session
+// cookie never comes back. Echo the time of our last write instead, and the API
+// reads from the primary until the replicas have caught up with it.
+const LAST_WRITE_HEADER = 'X-Last-Write';
+let lastWrite: string | undefined;
+
+api.interceptors.request.use((config) => {
+  if (lastWrite) {
+    config.headers.set(LAST_WRITE_HEADER, lastWrite);
+  }
+  return config;
+});
+
+api.interceptors.response.use((response) => {
+  const header = response.headers[LAST_WRITE_HEADER.toLowerCase()];
+  if (header) {
+    lastWrite = String(header);
+  }
+  return response;
+});
+
 // Task API endpoints
 export const taskApi = {
   getAllTasks: async (): Promise<Task[]> => {